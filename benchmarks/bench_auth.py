@@ -0,0 +1,65 @@
+import argparse
+import time
+
+from toypbx.protocols.sip.headers import Authorization
+from toypbx.server.auth import DigestVerifier, HA1Table, Verdict, parse_authorization
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("-n", type=int, default=100000)
+    args = parser.parse_args()
+
+    table = HA1Table()
+    start = time.perf_counter()
+    for i in range(args.users):
+        table.add(f"{i}", f"password-{i}")
+    print(f"HA1 table       {args.users:>10,} users in {time.perf_counter() - start:.3f}s")
+
+    verifier = DigestVerifier(table)
+    # one challenge and one answer per REGISTER, as phones do
+    requests = []
+    for i in range(args.n):
+        username = f"{i % args.users}"
+        challenge = parse_authorization(verifier.challenge())
+        requests.append(
+            str(
+                Authorization(
+                    username=username,
+                    password=f"password-{username}",
+                    method="REGISTER",
+                    request_uri="sip:un100",
+                    realm=challenge["realm"],
+                    nonce=challenge["nonce"],
+                    algorithm="MD5",
+                    opaque=challenge["opaque"],
+                    qop="auth",
+                )
+            )
+        )
+
+    start = time.perf_counter()
+    for _ in range(args.n):
+        verifier.challenge()
+    elapsed = time.perf_counter() - start
+    print(f"challenge       {args.n / elapsed:>10,.0f} /s, no state kept")
+
+    start = time.perf_counter()
+    verdicts = [verifier.verify("REGISTER", "sip:un100", value) for value in requests]
+    elapsed = time.perf_counter() - start
+    ok = verdicts.count(Verdict.OK)
+    print(f"verify          {args.n / elapsed:>10,.0f} /s ({ok:,} ok)")
+
+    start = time.perf_counter()
+    replays = [verifier.verify("REGISTER", "sip:un100", value) for value in requests[:10000]]
+    elapsed = time.perf_counter() - start
+    print(
+        f"replayed        {len(replays) / elapsed:>10,.0f} /s "
+        f"({replays.count(Verdict.REPLAY):,} refused)"
+    )
+    print(f"replay windows  {len(verifier.replay):>10,} nonces")
+
+
+if __name__ == "__main__":
+    main()
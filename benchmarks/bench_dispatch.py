@@ -0,0 +1,42 @@
+import argparse
+import time
+
+from toypbx.dispatch import Dispatcher
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--dialogs", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=8)
+    # time a handler spends blocked (sending an ACK, a user callback, a lookup)
+    parser.add_argument("--handler-ms", type=float, default=0.5)
+    args = parser.parse_args()
+
+    keys = [b"call-%d" % (i % args.dialogs) for i in range(args.messages)]
+    delay = args.handler_ms / 1000
+
+    def handle(key: bytes) -> None:
+        time.sleep(delay)
+
+    start = time.perf_counter()
+    for key in keys:
+        handle(key)
+    inline = time.perf_counter() - start
+    print(f"receive thread  {args.messages / inline:>10,.0f} msg/s")
+
+    with Dispatcher(workers=args.workers, max_depth=args.messages) as dispatcher:
+        start = time.perf_counter()
+        for key in keys:
+            dispatcher.submit(key, handle, key)
+        dispatcher.join()
+        pooled = time.perf_counter() - start
+        stats = dispatcher.stats()
+    print(
+        f"{args.workers} workers       {args.messages / pooled:>10,.0f} msg/s"
+        f"  high water {stats.high_water}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import argparse
+import time
+
+import numpy as np
+
+from toypbx.media.dtmf import DTMFDetector, generate
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--channels", type=int, default=500)
+    parser.add_argument("--ticks", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    noise = rng.integers(-3000, 3000, size=(args.channels, 160), dtype=np.int16)
+    noise[::10] = generate("7")
+    detector = DTMFDetector(channels=args.channels)
+
+    start = time.perf_counter()
+    for _ in range(args.ticks):
+        detector.detect(noise)
+    elapsed = time.perf_counter() - start
+
+    per_tick = elapsed / args.ticks
+    print(f"channels={args.channels}")
+    print(f"{per_tick * 1000:.3f} ms per 20 ms tick ({per_tick / 0.02:.1%} of one core)")
+
+
+if __name__ == "__main__":
+    main()
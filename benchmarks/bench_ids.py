@@ -0,0 +1,28 @@
+import argparse
+import time
+import uuid
+
+from toypbx.protocols.sip.ids import IDGenerator
+
+
+def rate(func, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        func()
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    generator = IDGenerator()
+    print(f"uuid4 tag     {rate(lambda: str(uuid.uuid4()), args.n):>14,.0f}/s")
+    print(f"pooled tag    {rate(generator.tag, args.n):>14,.0f}/s")
+    print(f"pooled branch {rate(generator.branch, args.n):>14,.0f}/s")
+    print(f"pooled c_seq  {rate(generator.c_seq, args.n):>14,.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
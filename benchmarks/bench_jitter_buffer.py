@@ -0,0 +1,49 @@
+import argparse
+import random
+import time
+
+from toypbx.protocols.rtp.jitter import JitterBuffer, repeat_last
+
+
+def workload(packets: int, reorder: float, loss: float) -> list[tuple[int, int, float]]:
+    rnd = random.Random(0)
+    events = []
+    for seq in range(packets):
+        if rnd.random() < loss:
+            continue
+        arrival = seq * 0.02 + rnd.uniform(0, 0.06 if rnd.random() < reorder else 0.005)
+        events.append((seq % 65536, seq * 160, arrival))
+    events.sort(key=lambda e: e[2])
+    return events
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--streams", type=int, default=1000)
+    parser.add_argument("--packets", type=int, default=500)
+    parser.add_argument("--reorder", type=float, default=0.05)
+    parser.add_argument("--loss", type=float, default=0.01)
+    args = parser.parse_args()
+
+    events = workload(args.packets, args.reorder, args.loss)
+    payload = bytes(160)
+    buffers = [JitterBuffer(concealment=repeat_last) for _ in range(args.streams)]
+
+    start = time.perf_counter()
+    for buffer in buffers:
+        push, pop = buffer.push, buffer.pop
+        for seq, timestamp, arrival in events:
+            push(seq, timestamp, payload, arrival)
+            pop()
+    elapsed = time.perf_counter() - start
+
+    total = len(events) * args.streams
+    stats = buffers[0].stats
+    print(f"streams={args.streams} packets/stream={len(events)}")
+    print(f"{total / elapsed:,.0f} push+pop/s ({elapsed:.2f}s)")
+    print(f"~{total / elapsed / 50:,.0f} concurrent 20ms streams per core")
+    print(stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import argparse
+import multiprocessing
+import time
+
+from toypbx.server.location import LocationTable
+
+
+def rate(lookup, aors: list[str]) -> float:
+    start = time.perf_counter()
+    for aor in aors:
+        lookup(aor)
+    return len(aors) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bindings", type=int, default=10000)
+    parser.add_argument("-n", type=int, default=100000)
+    args = parser.parse_args()
+
+    aors = [f"sip:{i}@un100" for i in range(args.bindings)]
+    queries = [aors[i % len(aors)] for i in range(args.n)]
+
+    with LocationTable.create(
+        capacity=args.bindings * 2
+    ) as table, multiprocessing.Manager() as manager:
+        shared = manager.dict()
+        for i, aor in enumerate(aors):
+            table.register(aor, f"sip:{i}@10.0.0.1:5060", expires=3600)
+            shared[aor] = f"sip:{i}@10.0.0.1:5060"
+
+        print(f"shared memory table {rate(table.lookup, queries):>12,.0f} lookups/s")
+        print(f"Manager().dict()    {rate(shared.get, queries[: args.n // 10]):>12,.0f} lookups/s")
+
+
+if __name__ == "__main__":
+    main()
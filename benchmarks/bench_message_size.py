@@ -0,0 +1,58 @@
+import argparse
+
+from toypbx.protocols.sip.context import Transaction
+from toypbx.protocols.sip.message import (
+    MTU,
+    AckMessage,
+    ByeMessage,
+    InviteMessage,
+    OptionsMessage,
+    RegisterMessage,
+    ResponseMessage,
+)
+
+CHALLENGE = """SIP/2.0 401 Unauthorized
+CSeq: 1 {method}
+WWW-Authenticate: Digest realm="asterisk",nonce="1694335639/87ec12ef29efc8eb6bed816924a8a45e",opaque="456759f668e20830",algorithm=MD5,qop="auth"
+Content-Length: 0
+"""
+
+
+def corpus() -> dict:
+    domain, username = "un100", "6001"
+    register = RegisterMessage.create(domain, username, Transaction())
+    invite = InviteMessage.create("100", domain, username, Transaction())
+    return {
+        "REGISTER": register,
+        "REGISTER+auth": register.digest(
+            username,
+            "secret",
+            ResponseMessage.from_raw(CHALLENGE.format(method="REGISTER")),
+        ),
+        "INVITE": invite,
+        "INVITE+auth": invite.digest(
+            username,
+            "secret",
+            ResponseMessage.from_raw(CHALLENGE.format(method="INVITE")),
+        ),
+        "ACK": AckMessage.create("100", domain, username, Transaction()),
+        "BYE": ByeMessage.create("100", domain, username, Transaction()),
+        "OPTIONS": OptionsMessage.create(domain, username, Transaction()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mtu", type=int, default=MTU)
+    args = parser.parse_args()
+
+    print(f"{'message':<16}{'full':>8}{'compact':>9}{'saved':>8}  sent (mtu {args.mtu})")
+    for name, message in corpus().items():
+        full = len(message.to_message().encode("utf-8"))
+        compact = len(message.to_message(compact=True).encode("utf-8"))
+        sent = len(message.to_datagram(args.mtu).encode("utf-8"))
+        print(f"{name:<16}{full:>8}{compact:>9}{1 - compact / full:>8.0%}  {sent}")
+
+
+if __name__ == "__main__":
+    main()
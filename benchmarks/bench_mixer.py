@@ -0,0 +1,39 @@
+import argparse
+import time
+
+import numpy as np
+
+from toypbx.media.mixer import ConferenceBridge
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--participants", type=int, default=50)
+    parser.add_argument("--ticks", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    bridge = ConferenceBridge()
+    frames = rng.integers(-8000, 8000, size=(args.participants, 160), dtype=np.int16)
+    for r in range(args.rooms):
+        room = bridge.room(str(r))
+        for p in range(args.participants):
+            room.join(p)
+
+    start = time.perf_counter()
+    for _ in range(args.ticks):
+        for room in bridge.rooms.values():
+            for p in range(args.participants):
+                room.put(p, frames[p])
+        bridge.tick()
+    elapsed = time.perf_counter() - start
+
+    per_tick = elapsed / args.ticks
+    print(f"rooms={args.rooms} participants/room={args.participants}")
+    print(f"{per_tick * 1000:.3f} ms per 20 ms tick ({per_tick / 0.02:.1%} of one core)")
+    print(f"~{args.rooms * 0.02 / per_tick:,.0f} rooms per core")
+
+
+if __name__ == "__main__":
+    main()
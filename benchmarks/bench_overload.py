@@ -0,0 +1,94 @@
+import argparse
+import time
+
+from toypbx.protocols.sip.message import ResponseMessage
+from toypbx.server.overload import OverloadControl
+
+REQUEST = b"""REGISTER sip:un100 SIP/2.0\r
+Via: SIP/2.0/UDP 192.168.0.137:60956;rport;branch=z9hG4bKPjhRHw98trjD05PopYbBL6bj34Hci6DmTU\r
+Max-Forwards: 70\r
+From: "6001" <sip:6001@un100>;tag=JRUu-hLceE3P8h2r0RVQKeJRZuviCTLX\r
+To: "6001" <sip:6001@un100>\r
+Call-ID: 6eCTpQmxGa4gAWjUXhufRd-u0D9u.N5F\r
+CSeq: 46544 REGISTER\r
+Contact: "6001" <sip:6001@192.168.0.137:60956;ob>\r
+Expires: 300\r
+Allow: PRACK, INVITE, ACK, BYE, CANCEL, UPDATE, INFO, SUBSCRIBE, NOTIFY, REFER, MESSAGE, OPTIONS\r
+Content-Length: 0\r
+\r
+"""
+
+
+def handle(data: bytes) -> None:
+    # stand-in for the registrar: full parse plus some work per request
+    ResponseMessage.from_raw(data.decode().replace("REGISTER sip:un100 SIP/2.0", "SIP/2.0 200 OK"))
+    sum(range(2000))
+
+
+def simulate(control: OverloadControl | None, offered: float, duration: float, timeout: float):
+    """Single server queue on a virtual clock advanced by the real cost of each step."""
+    source = ("192.168.0.137", 60956)
+    arrivals = int(offered * duration)
+    clock = 0.0
+    good = 0
+    for i in range(arrivals):
+        arrival = i / offered
+        clock = max(clock, arrival)
+        start = time.perf_counter()
+        if control is not None:
+            # requests that have arrived by now and are still waiting
+            queued = min(arrivals, int(clock * offered) + 1) - i
+            control.queue_depth = lambda: queued
+            if control.admit(REQUEST, source, now=clock) is not None:
+                clock += time.perf_counter() - start
+                continue
+        handle(REQUEST)
+        clock += time.perf_counter() - start
+        if clock - arrival <= timeout:
+            good += 1
+    return good / duration, arrivals / duration
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--overload", type=float, default=5.0)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--timeout", type=float, default=0.5)
+    parser.add_argument("--rate-headroom", type=float, default=1.5)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    for _ in range(2000):
+        handle(REQUEST)
+    capacity = 2000 / (time.perf_counter() - start)
+    offered = capacity * args.overload
+    print(f"capacity ~{capacity:,.0f} req/s, offered {offered:,.0f} req/s")
+
+    goodput, _ = simulate(None, offered, args.duration, args.timeout)
+    print(f"no shedding      goodput {goodput:>10,.0f} req/s")
+    control = OverloadControl(rate=capacity * 0.6, burst=capacity * 0.05)
+    goodput, _ = simulate(control, offered, args.duration, args.timeout)
+    rejected = sum(control.rejected.values())
+    print(f"token bucket+503 goodput {goodput:>10,.0f} req/s (rejected {rejected:,})")
+
+    # a rate set above what the server really handles (or requests that got slower):
+    # arrivals stay under the bucket's limit, so only the queue depth notices
+    rate = capacity * args.rate_headroom
+    offered = rate * 0.95
+    # at most half the client timeout's worth of work waiting
+    max_depth = int(capacity * args.timeout / 2)
+    print(f"rate limit {rate:,.0f} req/s, offered {offered:,.0f} req/s")
+    for name, control in [
+        ("token bucket    ", OverloadControl(rate=rate, burst=capacity * 0.05)),
+        (
+            "bucket+depth    ",
+            OverloadControl(rate=rate, burst=capacity * 0.05, max_queue_depth=max_depth),
+        ),
+    ]:
+        goodput, _ = simulate(control, offered, args.duration, args.timeout)
+        rejected = dict(control.rejected)
+        print(f"{name} goodput {goodput:>10,.0f} req/s (rejected {rejected})")
+
+
+if __name__ == "__main__":
+    main()
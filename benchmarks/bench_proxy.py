@@ -0,0 +1,58 @@
+import argparse
+import time
+
+from toypbx.protocols.sip.headers import HeaderFactory
+from toypbx.server.proxy import StatelessProxy
+
+REQUEST = b"""INVITE sip:100@10.0.0.2:5080 SIP/2.0\r
+Via: SIP/2.0/UDP 192.168.0.137:60956;rport;branch=z9hG4bKPjhRHw98trjD05PopYbBL6bj34Hci6DmTU\r
+Max-Forwards: 70\r
+From: "6001" <sip:6001@un100>;tag=JRUu-hLceE3P8h2r0RVQKeJRZuviCTLX\r
+To: <sip:100@un100>\r
+Contact: "6001" <sip:6001@192.168.0.137:60956;ob>\r
+Call-ID: 6eCTpQmxGa4gAWjUXhufRd-u0D9u.N5F\r
+CSeq: 46544 INVITE\r
+Allow: PRACK, INVITE, ACK, BYE, CANCEL, UPDATE, INFO, SUBSCRIBE, NOTIFY, REFER, MESSAGE, OPTIONS\r
+User-Agent: toypbx\r
+Content-Length: 0\r
+\r
+"""
+
+
+def full_parse(data: bytes) -> bytes:
+    # what forwarding costs with the header model used by the client
+    text = data.decode("utf-8")
+    lines = text.splitlines()
+    headers = []
+    for line in lines[1:]:
+        if not line:
+            break
+        key, value = line.split(":", 1)
+        headers.append(HeaderFactory(key, value.strip()))
+    out = [lines[0], "Via: SIP/2.0/UDP 10.0.0.1:5060;branch=z9hG4bK0;rport"]
+    out.extend(f"{header.name}: {header}" for header in headers)
+    return ("\r\n".join(out) + "\r\n\r\n").encode("utf-8")
+
+
+def rate(func, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        func()
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=100_000)
+    args = parser.parse_args()
+
+    proxy = StatelessProxy("10.0.0.1")
+    source = ("192.168.0.137", 60956)
+    full = rate(lambda: full_parse(REQUEST), args.n)
+    fast = rate(lambda: proxy.process(REQUEST, source), args.n)
+    print(f"full parse/re-serialize {full:>12,.0f} req/s")
+    print(f"stateless fast path     {fast:>12,.0f} req/s ({fast / full:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import argparse
+import socket
+import time
+
+from toypbx.media.relay import PortPool, RTPRelay
+from toypbx.protocols.rtp.packet import RTPHeader, build_packet
+from toypbx.protocols.sdp.session import SessionDescription
+
+BURST = 32
+
+
+def endpoint() -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.setblocking(False)
+    return sock
+
+
+def drain(sock: socket.socket) -> int:
+    count = 0
+    while True:
+        try:
+            sock.recv(2048)
+        except BlockingIOError:
+            return count
+        count += 1
+
+
+class NaiveRelay:
+    """recvfrom, parse and rebuild every packet: the allocation-per-packet baseline."""
+
+    def __init__(self, pairs: list[tuple[socket.socket, socket.socket, tuple]]):
+        self.routes = {sock: (peer, remote) for sock, peer, remote in pairs}
+
+    def poll(self) -> int:
+        forwarded = 0
+        for sock, (peer, remote) in self.routes.items():
+            while True:
+                try:
+                    data, _ = sock.recvfrom(2048)
+                except BlockingIOError:
+                    break
+                header = RTPHeader.parse(data)
+                packet = build_packet(
+                    header.payload_type,
+                    header.sequence_number + 1,
+                    header.timestamp,
+                    0x12345678,
+                    bytes(header.payload(data)),
+                    header.marker,
+                )
+                peer.sendto(packet, remote)
+                forwarded += 1
+        return forwarded
+
+
+def run(relay, senders, receivers, packets: int) -> float:
+    """Seconds spent inside the relay for ``packets`` packets per sender."""
+    payload = bytes(160)
+    busy = 0.0
+    for seq in range(0, packets, BURST):
+        for sender, destination in senders:
+            for n in range(BURST):
+                sender.sendto(build_packet(0, seq + n, (seq + n) * 160, 1, payload), destination)
+        start = time.perf_counter()
+        relay.poll()
+        busy += time.perf_counter() - start
+        for receiver in receivers:
+            drain(receiver)
+    return busy
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=8)
+    parser.add_argument("--packets", type=int, default=4096)
+    args = parser.parse_args()
+
+    relay = RTPRelay("127.0.0.1", PortPool("127.0.0.1", 40000, 41000))
+    a_side = [endpoint() for _ in range(args.calls)]
+    b_side = [endpoint() for _ in range(args.calls)]
+    senders, naive_pairs = [], []
+    for a, b in zip(a_side, b_side):
+        session = relay.open()
+        session.rewrite_offer(SessionDescription.offer(*a.getsockname()))
+        answer = session.rewrite_answer(SessionDescription.offer(*b.getsockname()))
+        senders.append((a, answer.rtp_address))
+        naive_pairs.append((session.caller.socket, session.callee.socket, b.getsockname()))
+    # latch the A legs before measuring
+    for a, destination in senders:
+        a.sendto(build_packet(0, 0, 0, 1, bytes(160)), destination)
+    relay.poll(0.1)
+    for b in b_side:
+        drain(b)
+
+    total = args.calls * args.packets
+    busy = run(NaiveRelay(naive_pairs), senders, b_side, args.packets)
+    print(f"recvfrom + rebuild   {total / busy:>12,.0f} pkt/s per core")
+    busy = run(relay, senders, b_side, args.packets)
+    print(f"recvfrom_into relay  {total / busy:>12,.0f} pkt/s per core")
+    print(f"dropped: {relay.dropped}")
+
+
+if __name__ == "__main__":
+    main()
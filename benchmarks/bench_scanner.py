@@ -0,0 +1,76 @@
+import argparse
+import contextlib
+import io
+import os
+import time
+
+from toypbx.client import Client
+from toypbx.protocols.sip.context import Transaction
+
+STRAY = b"""SIP/2.0 200 OK\r
+Via: SIP/2.0/UDP 192.168.0.137:60956;rport=64377;branch=z9hG4bK{n}\r
+Call-ID: stray-{n}\r
+From: "6001" <sip:6001@un100>;tag=JRUu-hLceE3P8h2r0RVQKeJRZuviCTLX\r
+To: "6001" <sip:6001@un100>;tag=as7d9f8a\r
+CSeq: 1 REGISTER\r
+Content-Length: 0\r
+\r
+"""
+SCAN = b"""OPTIONS sip:100@10.0.0.2 SIP/2.0\r
+Via: SIP/2.0/UDP 203.0.113.7:5070;branch=z9hG4bK-{n}\r
+From: "sipvicious" <sip:100@1.1.1.1>;tag=3162396637\r
+To: "sipvicious" <sip:100@1.1.1.1>\r
+Call-ID: {n}\r
+CSeq: 1 OPTIONS\r
+Content-Length: 0\r
+\r
+"""
+
+
+def flood(count: int) -> list[bytes]:
+    """Scanner traffic: stray responses, requests, binary junk and keepalives."""
+    packets = []
+    for n in range(count):
+        kind = n % 4
+        if kind == 0:
+            packets.append(STRAY.replace(b"{n}", b"%d" % n))
+        elif kind == 1:
+            packets.append(SCAN.replace(b"{n}", b"%d" % n))
+        elif kind == 2:
+            packets.append(os.urandom(64))
+        else:
+            packets.append(b"\r\n")
+    return packets
+
+
+def unscanned(client: Client, data: bytes) -> None:
+    """The receive path before the scanner, minus the thread it used to kill."""
+    try:
+        client.on_receive(data.decode("utf-8"))
+    except Exception:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--packets", type=int, default=100_000)
+    args = parser.parse_args()
+
+    packets = flood(args.packets)
+    for name, receive in [("parse everything", unscanned), ("scan first", Client.__call__)]:
+        client = Client(domain="un100", username="6001", password="")
+        client.context.register_transaction = Transaction()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for data in packets:
+                receive(client, data)
+        elapsed = time.perf_counter() - start
+        parsed = len(client.context.register_transaction.response_messages)
+        print(
+            f"{name:<18}{len(packets) / elapsed:>12,.0f} pkt/s"
+            f"  parsed {parsed}  dropped {dict(client.scanner.dropped)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
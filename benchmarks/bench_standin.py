@@ -0,0 +1,50 @@
+import argparse
+import contextlib
+import io
+import statistics
+import time
+
+from toypbx.client import Client
+from toypbx.tests.standin import AsteriskStandIn
+
+
+def percentiles(samples: list[float]) -> str:
+    ms = sorted(sample * 1000 for sample in samples)
+    p99 = ms[min(len(ms) - 1, int(len(ms) * 0.99))]
+    return f"p50 {statistics.median(ms):7.2f}ms  p99 {p99:7.2f}ms  max {ms[-1]:7.2f}ms"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=0.0)
+    args = parser.parse_args()
+
+    calls = []
+    with AsteriskStandIn(password="secret", delay=args.delay) as standin:
+        client = Client(
+            domain="un100",
+            username="6001",
+            password="secret",
+            server=standin.host,
+            port=standin.port,
+        )
+        with contextlib.redirect_stdout(io.StringIO()):
+            # REGISTER/401/REGISTER/200
+            start = time.perf_counter()
+            with client.register():
+                register = time.perf_counter() - start
+                for _ in range(args.calls):
+                    # INVITE/401/INVITE/100/180/200/ACK then BYE/401/BYE/200
+                    start = time.perf_counter()
+                    with client.invite():
+                        pass
+                    calls.append(time.perf_counter() - start)
+
+    print(f"delay {args.delay * 1000:.1f}ms per response, {args.calls} calls")
+    print(f"register  {register * 1000:7.2f}ms")
+    print(f"call      {percentiles(calls)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import argparse
+import subprocess
+import sys
+import time
+
+COMMANDS = {
+    "--help": ["-m", "toypbx", "--help"],
+    "server proxy --help": ["-m", "toypbx", "server", "proxy", "--help"],
+    "client register --help": ["-m", "toypbx", "client", "register", "--help"],
+    "import toypbx.client": ["-c", "import toypbx.client"],
+}
+
+
+def wall_time(args: list[str], runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], check=True, capture_output=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def import_times(args: list[str]) -> list[tuple[int, str]]:
+    """Cumulative microseconds per top-level import, from ``-X importtime``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not name.startswith("  "):
+            times.append((int(cumulative), name.strip()))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    for label, command in COMMANDS.items():
+        times = import_times(command)
+        print(
+            f"{label:<24} wall {wall_time(command, args.runs) * 1e3:6.1f} ms"
+            f"  imports {sum(t for t, _ in times) / 1e3:6.1f} ms"
+        )
+        for cumulative, name in sorted(times, reverse=True)[: args.top]:
+            print(f"    {cumulative / 1e3:6.1f} ms {name}")
+
+
+if __name__ == "__main__":
+    main()
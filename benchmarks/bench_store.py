@@ -0,0 +1,51 @@
+import argparse
+import os
+import tempfile
+import time
+
+from toypbx.server.location import LocationTable
+from toypbx.server.store import UPSERT, BindingStore, connect
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # one commit per REGISTER on the request path
+        connection = connect(os.path.join(directory, "naive.db"))
+        n = args.n // 10
+        start = time.perf_counter()
+        for i in range(n):
+            with connection:
+                connection.execute(UPSERT, (f"sip:{i}@un100", f"sip:{i}@10.0.0.1", 1e10))
+        print(f"commit per REGISTER {n / (time.perf_counter() - start):>12,.0f} REGISTER/s")
+        connection.close()
+
+        path = os.path.join(directory, "bindings.db")
+        with BindingStore(path) as store, LocationTable.create(
+            capacity=args.n * 2, store=store
+        ) as table:
+            start = time.perf_counter()
+            for i in range(args.n):
+                table.register(f"sip:{i}@un100", f"sip:{i}@10.0.0.1", expires=3600)
+            queued = time.perf_counter() - start
+            store.flush()
+            durable = time.perf_counter() - start
+            print(f"batched store       {args.n / queued:>12,.0f} REGISTER/s on the request path")
+            committed = args.n / durable
+            print(f"{'':20}{committed:>12,.0f} REGISTER/s committed ({store.commits} commits)")
+
+        with BindingStore(path) as store, LocationTable.create(
+            capacity=args.n * 2, store=store
+        ) as table:
+            start = time.perf_counter()
+            loaded = table.load()
+            print(
+                f"warm start          {loaded:>12,} bindings in {time.perf_counter() - start:.3f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
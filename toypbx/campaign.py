@@ -0,0 +1,169 @@
+import queue
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TextIO
+
+from toypbx.server.overload import TokenBucket
+
+# outbound calls ring for a while; Asterisk's default dial timeout is far longer
+ANSWER_TIMEOUT = 30.0
+
+
+@dataclass(frozen=True)
+class CallOutcome:
+    target: str
+    status: int | None
+    started: float
+    elapsed: float
+    error: str | None = None
+
+    def __str__(self) -> str:
+        status = self.status if self.status is not None else "-"
+        line = f"{self.target}\t{status}\t{self.elapsed:.3f}s"
+        return f"{line}\t{self.error}" if self.error else line
+
+
+@dataclass
+class CampaignStats:
+    placed: int = 0
+    statuses: Counter = field(default_factory=Counter)
+    errors: int = 0
+    elapsed: float = 0.0
+    peak_concurrency: int = 0
+
+    @property
+    def rate(self) -> float:
+        return self.placed / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self) -> str:
+        lines = [
+            f"placed: {self.placed}",
+            f"elapsed: {self.elapsed:.3f}s",
+            f"rate: {self.rate:,.2f} calls/s",
+            f"peak concurrency: {self.peak_concurrency}",
+            f"errors: {self.errors}",
+        ]
+        lines.extend(f"status {status}: {count}" for status, count in sorted(self.statuses.items()))
+        return "\n".join(lines)
+
+
+def read_targets(source: TextIO) -> Iterator[str]:
+    """Yields one target per non-empty line, skipping ``#`` comments, without reading ahead."""
+    for line in source:
+        target = line.split("#", 1)[0].strip()
+        if target:
+            yield target
+
+
+def open_targets(path: str) -> TextIO:
+    return sys.stdin if path == "-" else open(path)
+
+
+class Campaign:
+    """Places calls to a stream of targets at a steady rate with bounded concurrency.
+
+    A token bucket paces call starts to ``rate`` calls per second and a semaphore keeps
+    at most ``max_concurrent`` calls up; the next target is only read once both allow a
+    new call. ``call`` places one call and returns its final status code.
+    """
+
+    def __init__(
+        self,
+        call: Callable[[str], int | None],
+        rate: float,
+        max_concurrent: int,
+        on_outcome: Callable[[CallOutcome], None] | None = None,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, not {rate}")
+        if max_concurrent <= 0:
+            raise ValueError(f"max_concurrent must be positive, not {max_concurrent}")
+        self.call = call
+        self.bucket = TokenBucket(rate, burst=1.0)
+        self.max_concurrent = max_concurrent
+        self.on_outcome = on_outcome
+        self.stats = CampaignStats()
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def run(self, targets: Iterable[str]) -> CampaignStats:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_concurrent) as executor:
+            for target in targets:
+                self._slots.acquire()
+                self._wait_for_token()
+                with self._lock:
+                    self._active += 1
+                    self.stats.placed += 1
+                    self.stats.peak_concurrency = max(self.stats.peak_concurrency, self._active)
+                executor.submit(self._place, target)
+        self.stats.elapsed = time.perf_counter() - start
+        return self.stats
+
+    def _wait_for_token(self) -> None:
+        while not self.bucket.take(time.monotonic()):
+            time.sleep((1.0 - self.bucket.tokens) / self.bucket.rate)
+
+    def _place(self, target: str) -> None:
+        started = time.perf_counter()
+        status = error = None
+        try:
+            status = self.call(target)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+        outcome = CallOutcome(
+            target=target,
+            status=status,
+            started=started,
+            elapsed=time.perf_counter() - started,
+            error=error,
+        )
+        try:
+            with self._lock:
+                self._active -= 1
+                if status is not None:
+                    self.stats.statuses[status] += 1
+                if error is not None:
+                    self.stats.errors += 1
+                if self.on_outcome:
+                    self.on_outcome(outcome)
+        finally:
+            # a failing callback must not leak the slot and stall the campaign
+            self._slots.release()
+
+
+class ClientPool:
+    """Hands out registered clients so that each concurrent call has its own dialog state.
+
+    A client places one call at a time, so once a call is over its dialog is forgotten
+    and a client's state stays the same size however long the campaign runs. Calls not
+    answered within ``answer_timeout`` are CANCELled by the client.
+    """
+
+    def __init__(self, clients: Iterable, answer_timeout: float = ANSWER_TIMEOUT) -> None:
+        self.answer_timeout = answer_timeout
+        self._clients: queue.Queue = queue.Queue()
+        for client in clients:
+            self._clients.put(client)
+
+    def call(self, target: str, hold: float) -> int | None:
+        client = self._clients.get()
+        try:
+            try:
+                with client.invite(target, answer_timeout=self.answer_timeout):
+                    time.sleep(hold)
+            except ValueError:
+                # a final failure status is an outcome, no answer at all is an error
+                if client.context.dialogs[-1].status is None:
+                    raise
+            return client.context.dialogs[-1].status
+        finally:
+            if client.context.dialogs:
+                client.context.remove_dialog(client.context.dialogs[-1])
+            self._clients.put(client)
@@ -0,0 +1,168 @@
+import csv
+import dataclasses
+import io
+import json
+import os
+import queue
+import threading
+from dataclasses import dataclass
+from enum import StrEnum
+from pathlib import Path
+from typing import Self
+
+from toypbx.protocols.sip.context import Dialog
+
+MAX_FILE_SIZE = 64 * 1024 * 1024
+BATCH_SIZE = 512
+MAX_PENDING = 65536
+
+
+class Format(StrEnum):
+    CSV = "csv"
+    JSONL = "jsonl"
+
+
+@dataclass(frozen=True)
+class CallDetailRecord:
+    call_id: str
+    caller: str
+    callee: str
+    invite_time: float
+    answer_time: float | None
+    end_time: float
+    status: int
+
+    @property
+    def duration(self) -> float:
+        """Billable seconds, from answer to hang-up."""
+        return self.end_time - self.answer_time if self.answer_time is not None else 0.0
+
+    @classmethod
+    def from_dialog(cls, dialog: Dialog) -> Self:
+        invite = dialog.transactions[0].request_messages[0]
+        return cls(
+            call_id=invite.headers["Call-ID"].call_id,
+            caller=invite.headers["From"].from_,
+            callee=invite.headers["To"].to,
+            invite_time=dialog.invite_time,
+            answer_time=dialog.answer_time,
+            end_time=dialog.end_time,
+            status=dialog.status,
+        )
+
+    def as_row(self) -> dict:
+        return dataclasses.asdict(self) | {"duration": round(self.duration, 3)}
+
+
+FIELDS = [field.name for field in dataclasses.fields(CallDetailRecord)] + ["duration"]
+
+
+class CDRWriter:
+    """Appends call detail records to rotating CSV or JSONL files from a background thread.
+
+    ``write`` only enqueues. The writer thread serializes whatever is queued (up to
+    ``batch_size`` records) into one buffered write and moves to a new file once the
+    current one reaches ``max_file_size``. Nothing is fsync'ed; when the queue is full
+    records are dropped and counted rather than blocking the signaling thread.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        format: Format = Format.CSV,
+        max_file_size: int = MAX_FILE_SIZE,
+        batch_size: int = BATCH_SIZE,
+        max_pending: int = MAX_PENDING,
+    ) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.format = Format(format)
+        self.max_file_size = max_file_size
+        self.batch_size = batch_size
+        self.written = 0
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._file = None
+        self._size = 0
+        self._index = max((int(p.stem) for p in self.files(self.directory, self.format)), default=0)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "CDRWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    @staticmethod
+    def files(directory: str | os.PathLike, format: Format = Format.CSV) -> list[Path]:
+        return sorted(Path(directory).glob("[0-9]" * 8 + f".{format}"))
+
+    def write(self, record: CallDetailRecord) -> bool:
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def flush(self) -> None:
+        """Blocks until every queued record is written to the OS."""
+        self._queue.join()
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _run(self) -> None:
+        running = True
+        while running:
+            records = [self._queue.get()]
+            while len(records) < self.batch_size:
+                try:
+                    records.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if records[-1] is None:
+                running = False
+            try:
+                self._write([record for record in records if record is not None])
+            except OSError as e:
+                print(f"CDR FAILURE: {e}")
+            finally:
+                for _ in records:
+                    self._queue.task_done()
+        if self._file:
+            self._file.close()
+
+    def _write(self, records: list[CallDetailRecord]) -> None:
+        if not records:
+            return
+        if self._file is None or self._size >= self.max_file_size:
+            self._rotate()
+        buffer = io.StringIO()
+        if self.format == Format.CSV:
+            csv.DictWriter(buffer, FIELDS, lineterminator="\n").writerows(
+                record.as_row() for record in records
+            )
+        else:
+            for record in records:
+                buffer.write(json.dumps(record.as_row(), separators=(",", ":")))
+                buffer.write("\n")
+        data = buffer.getvalue().encode("utf-8")
+        self._file.write(data)
+        self._file.flush()
+        self._size += len(data)
+        self.written += len(records)
+
+    def _rotate(self) -> None:
+        if self._file:
+            self._file.close()
+        self._index += 1
+        self._file = open(self.directory / f"{self._index:08}.{self.format}", "wb")
+        self._size = 0
+        if self.format == Format.CSV:
+            header = (",".join(FIELDS) + "\n").encode("utf-8")
+            self._file.write(header)
+            self._size = len(header)
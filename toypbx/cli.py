@@ -1,34 +1,235 @@
 import argparse
+import sys
 import time
+from contextlib import ExitStack, nullcontext
 
-from toypbx.client import Client
+# Handlers import their modules when selected so that ``--help`` and short scripted
+# invocations do not pay for the SIP stack.
 
 
-def register(domain: str, username: str, password: str, expires: int, **kwargs) -> None:
-    client = Client(
-        domain=domain,
-        username=username,
-        password=password,
-    )
-    with client.register(expires=expires):
-        time.sleep(expires - 1)
+def positive(convert):
+    def parse(raw: str):
+        value = convert(raw)
+        if value <= 0:
+            raise argparse.ArgumentTypeError(f"must be positive: {raw}")
+        return value
+
+    parse.__name__ = convert.__name__
+    return parse
+
+
+def register(
+    domain: str,
+    username: str,
+    password: str,
+    expires: int,
+    journal: str | None = None,
+    duration: float | None = None,
+    keepalive: str | None = None,
+    timer=None,
+    dispatcher=None,
+    **kwargs,
+) -> None:
+    from toypbx.client import Client
+    from toypbx.keepalive import KeepaliveService
+    from toypbx.refresh import RefreshScheduler
+    from toypbx.trace.journal import Journal
+
+    with (
+        Journal(journal) if journal else nullcontext() as journal,
+        RefreshScheduler() as scheduler,
+        KeepaliveService(mode=keepalive) if keepalive else nullcontext() as keepalive,
+    ):
+        client = Client(
+            domain=domain,
+            username=username,
+            password=password,
+            journal=journal,
+            scheduler=scheduler,
+            keepalive=keepalive,
+            timer=timer,
+            dispatcher=dispatcher,
+        )
+        with client.register(expires=expires):
+            time.sleep(expires - 1 if duration is None else duration)
+
+
+def invite(
+    domain: str,
+    username: str,
+    password: str,
+    expires: int,
+    journal: str | None = None,
+    cdr: str | None = None,
+    cdr_format: str = "csv",
+    timer=None,
+    dispatcher=None,
+    **kwargs,
+) -> None:
+    from toypbx.cdr import CDRWriter
+    from toypbx.client import Client
+    from toypbx.trace.journal import Journal
+
+    with (
+        Journal(journal) if journal else nullcontext() as journal,
+        CDRWriter(cdr, format=cdr_format) if cdr else nullcontext() as cdr,
+    ):
+        client = Client(
+            domain=domain,
+            username=username,
+            password=password,
+            journal=journal,
+            cdr=cdr,
+            timer=timer,
+            dispatcher=dispatcher,
+        )
+        with client.register(expires=expires):
+            with client.invite() as dialog:
+                time.sleep(expires - 1)
+
+
+def campaign(
+    targets: str,
+    domain: str,
+    username: str,
+    password: str,
+    expires: int,
+    rate: float,
+    max_concurrent: int,
+    hold: float,
+    answer_timeout: float,
+    cdr: str | None = None,
+    timer=None,
+    dispatcher=None,
+    **kwargs,
+) -> None:
+    from toypbx.campaign import Campaign, ClientPool, open_targets, read_targets
+    from toypbx.cdr import CDRWriter
+    from toypbx.client import Client
+    from toypbx.refresh import RefreshScheduler
+
+    with ExitStack() as stack:
+        writer = stack.enter_context(CDRWriter(cdr)) if cdr else None
+        scheduler = stack.enter_context(RefreshScheduler())
+        clients = [
+            Client(
+                domain=domain,
+                username=username,
+                password=password,
+                scheduler=scheduler,
+                cdr=writer,
+                timer=timer,
+                dispatcher=dispatcher,
+            )
+            for _ in range(max_concurrent)
+        ]
+        for client in clients:
+            stack.enter_context(client.register(expires=expires))
+        pool = ClientPool(clients, answer_timeout=answer_timeout)
+
+        source = open_targets(targets)
+        if source is not sys.stdin:
+            stack.enter_context(source)
+        runner = Campaign(
+            lambda target: pool.call(target, hold),
+            rate=rate,
+            max_concurrent=max_concurrent,
+            on_outcome=print,
+        )
+        print(runner.run(read_targets(source)))
+
+
+def command_replay(
+    path: str,
+    target: str,
+    realtime: bool,
+    speed: float,
+    domain: str,
+    username: str,
+    timer=None,
+    dispatcher=None,
+    **kwargs,
+) -> None:
+    from collections import Counter
 
+    from toypbx.trace import pcap
+    from toypbx.trace.replay import replay
 
-def invite(domain: str, username: str, password: str, expires: int, **kwargs) -> None:
-    client = Client(
-        domain=domain,
-        username=username,
-        password=password,
+    if target == "client":
+        from toypbx.client import Client
+        from toypbx.trace.replay import client_handler
+
+        handler = client_handler(
+            Client(
+                domain=domain,
+                username=username,
+                password="",
+                timer=timer,
+                dispatcher=dispatcher,
+            )
+        )
+    else:
+        from toypbx.protocols.sip.message import ResponseMessage
+
+        handler = ResponseMessage.from_raw
+    read_stats = Counter()
+    stats = replay(
+        pcap.read(path, stats=read_stats), handler=handler, realtime=realtime, speed=speed
     )
-    with client.register(expires=expires):
-        with client.invite() as dialog:
-            time.sleep(expires - 1)
+    print(stats)
+    if read_stats["truncated"]:
+        print(f"truncated frames: {read_stats['truncated']}")
+
+
+def command_journal(directory: str, call_id: str | None, **kwargs) -> None:
+    from toypbx.trace.journal import JournalReader
+
+    with JournalReader(directory) as reader:
+        records = reader.find(call_id) if call_id else reader
+        for record in records:
+            print(f"--- {record.timestamp:.6f} {record.direction.name} {record.call_id}")
+            print(record.message.decode("utf-8", "replace"))
 
 
 def command_server(*args, **kwargs):
     print(locals())
 
 
+def command_proxy(
+    host: str,
+    port: int,
+    advertise: str | None,
+    upstream: str | None,
+    rate: float | None,
+    per_source_rate: float | None,
+    max_backlog: int | None,
+    **kwargs,
+) -> None:
+    from toypbx.server.overload import OverloadControl
+    from toypbx.server.proxy import StatelessProxy
+
+    route = None
+    if upstream:
+        upstream_host, _, upstream_port = upstream.partition(":")
+        destination = (upstream_host, int(upstream_port or 5060))
+
+        def route(request_uri: bytes) -> tuple[str, int]:
+            return destination
+
+    overload = None
+    if rate or per_source_rate or max_backlog:
+        overload = OverloadControl(
+            rate=rate, per_source_rate=per_source_rate, max_queue_depth=max_backlog
+        )
+    proxy = StatelessProxy(
+        host=host, port=port, route=route, advertise=advertise, overload=overload
+    )
+    try:
+        proxy.serve_forever()
+    except KeyboardInterrupt:
+        print(f"forwarded: {proxy.forwarded} dropped: {proxy.dropped}")
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument(
@@ -37,6 +238,21 @@ def main():
         action="store_true",
         default=False,
     )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        default=None,
+    )
+    parser.add_argument(
+        "--sample-rate",
+        type=float,
+        default=0.0,
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+    )
 
     subparsers = parser.add_subparsers()
     client_parser = subparsers.add_parser("client")
@@ -65,6 +281,21 @@ def main():
         type=int,
         default=5,
     )
+    register_parser.add_argument(
+        "--journal",
+        type=str,
+        default=None,
+    )
+    register_parser.add_argument(
+        "--duration",
+        type=float,
+        default=None,
+    )
+    register_parser.add_argument(
+        "--keepalive",
+        choices=["crlf", "options"],
+        default=None,
+    )
 
     # INVITE
     invite_parser = client_subparsers.add_parser("invite")
@@ -89,14 +320,186 @@ def main():
         type=int,
         default=5,
     )
+    invite_parser.add_argument(
+        "--journal",
+        type=str,
+        default=None,
+    )
+    invite_parser.add_argument(
+        "--cdr",
+        type=str,
+        default=None,
+    )
+    invite_parser.add_argument(
+        "--cdr-format",
+        choices=["csv", "jsonl"],
+        default="csv",
+    )
+
+    # CAMPAIGN
+    campaign_parser = client_subparsers.add_parser("campaign")
+    campaign_parser.set_defaults(handler=campaign)
+    campaign_parser.add_argument(
+        "targets",
+        type=str,
+    )
+    campaign_parser.add_argument(
+        "--domain",
+        type=str,
+        default="un100",
+    )
+    campaign_parser.add_argument(
+        "--username",
+        type=str,
+        default="6001",
+    )
+    campaign_parser.add_argument(
+        "--password",
+        type=str,
+        default="",
+    )
+    campaign_parser.add_argument(
+        "--expires",
+        type=int,
+        default=300,
+    )
+    campaign_parser.add_argument(
+        "--rate",
+        type=positive(float),
+        default=1.0,
+    )
+    campaign_parser.add_argument(
+        "--max-concurrent",
+        type=positive(int),
+        default=10,
+    )
+    campaign_parser.add_argument(
+        "--hold",
+        type=float,
+        default=5.0,
+    )
+    campaign_parser.add_argument(
+        "--answer-timeout",
+        type=positive(float),
+        default=30.0,
+    )
+    campaign_parser.add_argument(
+        "--cdr",
+        type=str,
+        default=None,
+    )
+
+    # REPLAY
+    replay_parser = subparsers.add_parser("replay")
+    replay_parser.set_defaults(handler=command_replay)
+    replay_parser.add_argument(
+        "path",
+        type=str,
+    )
+    replay_parser.add_argument(
+        "--target",
+        choices=["parse", "client"],
+        default="parse",
+    )
+    replay_parser.add_argument(
+        "--realtime",
+        action="store_true",
+        default=False,
+    )
+    replay_parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+    )
+    replay_parser.add_argument(
+        "--domain",
+        type=str,
+        default="un100",
+    )
+    replay_parser.add_argument(
+        "--username",
+        type=str,
+        default="6001",
+    )
+
+    # JOURNAL
+    journal_parser = subparsers.add_parser("journal")
+    journal_parser.set_defaults(handler=command_journal)
+    journal_parser.add_argument(
+        "directory",
+        type=str,
+    )
+    journal_parser.add_argument(
+        "--call-id",
+        type=str,
+        default=None,
+    )
 
     # SERVER
     server_parser = subparsers.add_parser("server")
     server_parser.set_defaults(handler=command_server)
+    server_subparsers = server_parser.add_subparsers()
+
+    # PROXY
+    proxy_parser = server_subparsers.add_parser("proxy")
+    proxy_parser.set_defaults(handler=command_proxy)
+    proxy_parser.add_argument(
+        "--host",
+        type=str,
+        default="0.0.0.0",
+    )
+    proxy_parser.add_argument(
+        "--port",
+        type=int,
+        default=5060,
+    )
+    proxy_parser.add_argument(
+        "--advertise",
+        type=str,
+        default=None,
+    )
+    proxy_parser.add_argument(
+        "--upstream",
+        type=str,
+        default=None,
+    )
+    proxy_parser.add_argument(
+        "--rate",
+        type=float,
+        default=None,
+    )
+    proxy_parser.add_argument(
+        "--per-source-rate",
+        type=float,
+        default=None,
+    )
+    # bytes waiting on the proxy's socket, kernel overhead included
+    proxy_parser.add_argument(
+        "--max-backlog",
+        type=int,
+        default=None,
+    )
 
     known, unknown = parser.parse_known_args()
     if handler := getattr(known, "handler", None):
-        handler(**vars(known))
+        with ExitStack() as stack:
+            options = vars(known)
+            if known.profile:
+                from toypbx.trace.profile import Profiler
+
+                stack.enter_context(Profiler(known.profile))
+            if known.sample_rate:
+                from toypbx.trace.profile import StageTimer
+
+                options["timer"] = timer = StageTimer(known.sample_rate)
+                stack.callback(lambda: print(timer))
+            if known.workers:
+                from toypbx.dispatch import Dispatcher
+
+                options["dispatcher"] = dispatcher = Dispatcher(known.workers)
+                stack.callback(lambda: print(dispatcher.stats()))
+                stack.enter_context(dispatcher)
+            handler(**options)
 
 
 if __name__ == "__main__":
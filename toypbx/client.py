@@ -1,18 +1,38 @@
+import threading
 import time
 from contextlib import contextmanager
 from enum import StrEnum
+from typing import TYPE_CHECKING
 
+from toypbx.cdr import CallDetailRecord, CDRWriter
+from toypbx.keepalive import KeepaliveService
 from toypbx.net import UDPClient
 from toypbx.protocols.sip.context import Context, Dialog, Transaction
+from toypbx.protocols.sip.headers import Via
 from toypbx.protocols.sip.message import (
+    MTU,
     AckMessage,
     ByeMessage,
+    CancelMessage,
     ClientMethod,
     InviteMessage,
+    OptionsMessage,
     RegisterMessage,
     RequestMessage,
     ResponseMessage,
 )
+from toypbx.protocols.sip.scanner import Scanner, is_keepalive
+from toypbx.refresh import RefreshScheduler, granted_expires
+from toypbx.trace.journal import Direction, Journal
+
+if TYPE_CHECKING:
+    from toypbx.dispatch import Dispatcher
+    from toypbx.trace.profile import StageTimer, Timing
+
+
+ANSWER_TIMEOUT = 2.0
+# how long a CANCELled INVITE may take to get its final response
+CANCEL_TIMEOUT = 2.0
 
 
 class Status(StrEnum):
@@ -32,24 +52,112 @@ class Client:
         password: str,
         server: str | None = None,
         port: int = 5060,
+        journal: Journal | None = None,
+        scheduler: RefreshScheduler | None = None,
+        keepalive: KeepaliveService | None = None,
+        cdr: CDRWriter | None = None,
+        mtu: int = MTU,
+        timer: "StageTimer | None" = None,
+        dispatcher: "Dispatcher | None" = None,
     ) -> None:
         self.domain = domain
         self.username = username
         self.password = password
         self.udp_client = UDPClient(server or domain, port=port, callback=self)
-        self.status = Status.UNAVAILABLE
+        self._status = Status.UNAVAILABLE
+        self._status_changed = threading.Condition()
+        self.journal = journal
+        self.scheduler = scheduler
+        self.keepalive = keepalive
+        self.cdr = cdr
+        self.mtu = mtu
+        self.timer = timer
+        self.dispatcher = dispatcher
+        self.last_pong: float | None = None
+        self.expires: int | None = None
+        self.scanner = Scanner(is_known=self.is_known_call_id)
         self.context = Context(
             domain=domain,
             username=username,
             password=password,
         )
 
-    def __call__(self, response: str):
-        self.on_receive(response)
+    def __call__(self, data: bytes):
+        if is_keepalive(data):
+            self.last_pong = time.monotonic()
+            return
+        timing = self.timer.sample() if self.timer else None
+        # scanner floods and stray responses are dropped before the full parse
+        scan = self.scanner.accept(data)
+        if scan is None:
+            return
+        if timing:
+            timing.mark("scan")
+        # resolved here, since workers handle other dialogs while new ones are added
+        dialog = self.context.calls.get(scan.call_id.decode("utf-8", "replace"))
+        if self.dispatcher:
+            # off the receive thread, in order per dialog
+            self.dispatcher.submit(scan.call_id, self.handle, data, timing, dialog)
+        else:
+            self.handle(data, timing, dialog)
+
+    def handle(self, data: bytes, timing: "Timing | None" = None, dialog: Dialog | None = None):
+        if timing and self.dispatcher:
+            timing.mark("queue")
+        try:
+            response = data.decode("utf-8")
+        except UnicodeDecodeError:
+            self.scanner.dropped["malformed"] += 1
+            return
+        if timing:
+            timing.mark("decode")
+        self.on_receive(response, timing, dialog)
+
+    def is_known_call_id(self, call_id: bytes) -> bool:
+        try:
+            value = call_id.decode("utf-8")
+        except UnicodeDecodeError:
+            return False
+        transaction = self.context.register_transaction
+        if transaction is not None and transaction.call_id == value:
+            return True
+        return value in self.context.calls
+
+    @property
+    def status(self) -> Status:
+        return self._status
+
+    @status.setter
+    def status(self, status: Status) -> None:
+        with self._status_changed:
+            self._status = status
+            self._status_changed.notify_all()
 
-    def on_receive(self, response: str):
+    @property
+    def flow(self):
+        return self.udp_client.flow
+
+    def on_receive(
+        self, response: str, timing: "Timing | None" = None, dialog: Dialog | None = None
+    ):
+        if not response.strip():
+            # keepalive pong
+            self.last_pong = time.monotonic()
+            return
+        if self.journal:
+            self.journal.append(Direction.RECEIVED, response)
+            if timing:
+                timing.mark("journal")
         response = ResponseMessage.from_raw(response)
-        self.context.add_response(response)
+        if timing:
+            timing.mark("parse")
+        dialog = self.context.add_response(response, dialog)
+        if timing:
+            timing.mark("context")
+        if dialog is None and response.method not in (ClientMethod.REGISTER, ClientMethod.OPTIONS):
+            # the dialog ended while this response was queued
+            print("UNKNOWN DIALOG")
+            return
 
         print(response.start_line.status_code, response.method)
         match (response.start_line.status_code, response.method):
@@ -57,18 +165,34 @@ class Client:
                 pass
 
             case (200, ClientMethod.REGISTER):
-                if response.method == ClientMethod.REGISTER:
-                    if response.headers["Expires"].expires == 0:
-                        self.status = Status.UNAVAILABLE
-                    else:
-                        self.status = Status.AVAILABLE
+                request = self.context.register_transaction.last_request
+                self.expires = granted_expires(response, request)
+                if self.expires == 0:
+                    self.status = Status.UNAVAILABLE
+                    if self.scheduler:
+                        self.scheduler.cancel(self)
+                    if self.keepalive:
+                        self.keepalive.remove(self)
+                else:
+                    self.status = Status.AVAILABLE
+                    if self.scheduler:
+                        self.scheduler.schedule(self, self.expires)
+                    if self.keepalive:
+                        self.keepalive.add(self)
             case (200, ClientMethod.INVITE):
+                if dialog.answer_time is None:
+                    dialog.answer_time = time.time()
+                    dialog.status = 200
                 self.status = Status.CALLING
-                self.ack(response)
+                self.ack(response, dialog)
 
             case (200, ClientMethod.BYE):
+                self.end_dialog(dialog)
                 self.status = Status.AVAILABLE
 
+            case (_, ClientMethod.OPTIONS) | (_, ClientMethod.CANCEL):
+                pass
+
             case (401, ClientMethod.REGISTER):
                 request = self.context.register_transaction.last_request
                 digest_request = request.digest(self.username, self.password, response)
@@ -78,29 +202,40 @@ class Client:
                     print("FAILURE")
 
             case (401, _):
-                request = self.context.dialogs[-1].transactions[-1].last_request
+                request = dialog.transactions[-1].last_request
                 digest_request = request.digest(self.username, self.password, response)
                 if digest_request:
-                    self.send(digest_request)
+                    self.send(digest_request, dialog)
                 else:
                     print("FAILURE")
 
+            case (status_code, ClientMethod.INVITE) if status_code >= 300:
+                with self._status_changed:
+                    dialog.status = status_code
+                    self._status_changed.notify_all()
+                self.end_dialog(dialog)
+
             case _:
                 print("UNEXPECTED RESPONSE")
                 print(response)
+        if timing:
+            timing.mark("dispatch")
 
-    def send(self, request: RequestMessage) -> None:
+    def send(self, request: RequestMessage, dialog: Dialog | None = None) -> None:
         print(request.start_line.method)
-        self.context.add_request(request)
-        self.udp_client.send(request.to_message())
+        self.context.add_request(request, dialog)
+        message = request.to_datagram(self.mtu)
+        if self.journal:
+            self.journal.append(Direction.SENT, message, call_id=request.headers["Call-ID"].call_id)
+        self.udp_client.send(message)
 
     def expect(self, status: Status, duration: float = 0.2, attempt: int = 10):
-        for _ in range(attempt):
-            if self.status == status:
-                break
-            time.sleep(duration)
-        else:
-            raise ValueError()
+        # wakes up as soon as the receive thread sets the status
+        with self._status_changed:
+            if not self._status_changed.wait_for(
+                lambda: self._status == status, timeout=duration * attempt
+            ):
+                raise ValueError()
 
     @contextmanager
     def register(
@@ -121,6 +256,10 @@ class Client:
                 self.expect(Status.AVAILABLE)
                 yield self
             finally:
+                if self.scheduler:
+                    self.scheduler.cancel(self)
+                if self.keepalive:
+                    self.keepalive.remove(self)
                 if self.status == Status.AVAILABLE:
                     request = RegisterMessage.create(
                         domain=self.domain,
@@ -132,42 +271,94 @@ class Client:
                     self.send(request)
             self.expect(Status.UNAVAILABLE)
 
+    def wait_for_final(self, dialog: Dialog, timeout: float) -> bool:
+        """Waits until the INVITE of ``dialog`` has a final response."""
+        with self._status_changed:
+            return self._status_changed.wait_for(lambda: dialog.status is not None, timeout)
+
     @contextmanager
-    def invite(
-        self,
-    ) -> ResponseMessage:
+    def invite(self, target: str = "100", answer_timeout: float = ANSWER_TIMEOUT) -> Dialog:
+        """Calls ``target`` and hangs up with a BYE on exit.
+
+        A call not answered within ``answer_timeout`` is CANCELled, and one that fails
+        raises ValueError with the final status left in ``dialog.status``.
+        """
         transaction = Transaction()
-        dialog = Dialog(transactions=[transaction])
-        self.context.dialogs.append(dialog)
+        dialog = Dialog(transactions=[transaction], target=target)
+        self.context.add_dialog(dialog)
         request = InviteMessage.create(
-            target="100",
+            target=target,
             domain=self.domain,
             username=self.username,
             transaction=transaction,
         )
+        dialog.invite_time = time.time()
+        self.send(request, dialog)
+        if not self.wait_for_final(dialog, answer_timeout):
+            request = CancelMessage.create(
+                target=target,
+                domain=self.domain,
+                username=self.username,
+                transaction=transaction,
+            )
+            self.send(request, dialog)
+            # usually a 487, but a 200 may have crossed the CANCEL and must be hung up
+            self.wait_for_final(dialog, CANCEL_TIMEOUT)
+        if dialog.status != 200:
+            raise ValueError(dialog.status)
         try:
-            self.send(request)
             self.expect(Status.CALLING)
-            yield self.context.dialogs[-1]
+            yield dialog
         finally:
             # transaction = Transaction()
             # dialog.transactions.append(transaction)
             request = ByeMessage.create(
-                target="100",
+                target=target,
                 domain=self.domain,
                 username=self.username,
                 transaction=transaction,
             )
-            self.send(request)
+            self.send(request, dialog)
             self.expect(Status.AVAILABLE)
 
-    def ack(self, response: ResponseMessage) -> None:
-        transaction = self.context.dialogs[-1].transactions[-1]
+    def end_dialog(self, dialog: Dialog) -> None:
+        if dialog.end_time is not None:
+            return
+        dialog.end_time = time.time()
+        if self.cdr and dialog.invite_time is not None:
+            self.cdr.write(CallDetailRecord.from_dialog(dialog))
+
+    def refresh(self) -> None:
+        """Re-sends the REGISTER in the same Call-ID with the next CSeq."""
+        transaction = self.context.register_transaction
+        request = transaction.last_request
+        transaction.branch = Via.gen_branch()
+        self.send(
+            RegisterMessage.create(
+                domain=self.domain,
+                username=self.username,
+                expires=request.headers["Expires"].expires,
+                transaction=transaction,
+            )
+        )
+
+    def ping(self) -> None:
+        self.udp_client.ping()
+
+    def options(self) -> None:
+        self.send(
+            OptionsMessage.create(
+                domain=self.domain, username=self.username, transaction=Transaction()
+            )
+        )
+
+    def ack(self, response: ResponseMessage, dialog: Dialog) -> None:
+        transaction = dialog.transactions[-1]
         request = AckMessage.create(
-            target="100",
+            target=dialog.target,
             domain=self.domain,
             username=self.username,
             transaction=transaction,
         )
-        self.send(request)
+        self.send(request, dialog)
         self.expect(Status.CALLING)
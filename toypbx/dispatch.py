@@ -0,0 +1,125 @@
+import queue
+import threading
+import zlib
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+WORKERS = 4
+MAX_DEPTH = 1024
+
+
+@dataclass
+class DispatchStats:
+    submitted: int = 0
+    processed: int = 0
+    dropped: int = 0
+    errors: int = 0
+    depths: list[int] = field(default_factory=list)
+    high_water: list[int] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        return "\n".join(
+            [
+                f"submitted: {self.submitted}",
+                f"processed: {self.processed}",
+                f"dropped: {self.dropped}",
+                f"errors: {self.errors}",
+                f"queue depths: {self.depths}",
+                f"high water: {self.high_water}",
+            ]
+        )
+
+
+class Dispatcher:
+    """Runs message handlers on a fixed pool of worker threads, in order per key.
+
+    Each worker owns a queue and a key (the Call-ID) always hashes to the same one, so
+    the messages of a dialog are handled one at a time in arrival order while other
+    dialogs proceed on the other workers. ``submit`` never blocks the receive thread: a
+    full queue drops the message and counts it, as a lost datagram would be.
+    """
+
+    def __init__(self, workers: int = WORKERS, max_depth: int = MAX_DEPTH) -> None:
+        self.workers = workers
+        self.submitted = 0
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+        self._queues: list[queue.Queue] = [queue.Queue(maxsize=max_depth) for _ in range(workers)]
+        self._high_water = [0] * workers
+        self._lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+
+    def __enter__(self) -> "Dispatcher":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def worker(self, key: bytes) -> int:
+        return zlib.crc32(key) % self.workers
+
+    def submit(self, key: bytes, handler: Callable[..., object], *args) -> bool:
+        index = self.worker(key)
+        work = self._queues[index]
+        try:
+            work.put_nowait((handler, args))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        depth = work.qsize()
+        with self._lock:
+            self.submitted += 1
+            if depth > self._high_water[index]:
+                self._high_water[index] = depth
+        return True
+
+    def join(self) -> None:
+        """Blocks until every submitted message has been handled."""
+        for work in self._queues:
+            work.join()
+
+    def stats(self) -> DispatchStats:
+        with self._lock:
+            return DispatchStats(
+                submitted=self.submitted,
+                processed=self.processed,
+                dropped=self.dropped,
+                errors=self.errors,
+                depths=[work.qsize() for work in self._queues],
+                high_water=list(self._high_water),
+            )
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._threads = [
+            threading.Thread(target=self._run, args=(work,), daemon=True) for work in self._queues
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        """Handles what is already queued, then stops the workers."""
+        for work in self._queues:
+            work.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _run(self, work: queue.Queue) -> None:
+        while (item := work.get()) is not None:
+            handler, args = item
+            failed = False
+            try:
+                handler(*args)
+            except Exception as e:
+                failed = True
+                print(f"DISPATCH FAILURE: {type(e).__name__}: {e}")
+            with self._lock:
+                self.processed += 1
+                self.errors += failed
+            work.task_done()
+        work.task_done()
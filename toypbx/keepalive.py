@@ -0,0 +1,136 @@
+import itertools
+import threading
+import time
+from collections.abc import Hashable
+from enum import StrEnum
+from typing import Protocol
+
+INTERVAL = 25.0
+TICK = 0.5
+
+
+class Mode(StrEnum):
+    CRLF = "crlf"
+    OPTIONS = "options"
+
+
+class Pingable(Protocol):
+    @property
+    def flow(self) -> Hashable | None: ...
+
+    def ping(self) -> None: ...
+
+    def options(self) -> None: ...
+
+
+class KeepaliveService:
+    """Keeps the NAT bindings of registered accounts open from one thread.
+
+    Flows (local socket and server address) are spread round robin over the slots of a
+    timing wheel with ``interval / tick`` slots; every tick sends one keepalive per flow
+    in the current slot, so the cost per tick stays flat however many accounts there are.
+    Accounts sharing a flow are pinged once (RFC 5626 3.5.1 double CRLF, or OPTIONS).
+    """
+
+    def __init__(
+        self,
+        interval: float = INTERVAL,
+        tick: float = TICK,
+        mode: Mode = Mode.CRLF,
+    ) -> None:
+        self.interval = interval
+        self.tick = tick
+        self.mode = Mode(mode)
+        self.sent = 0
+        self.failed = 0
+        self._slots: list[dict[Hashable, list[Pingable]]] = [
+            {} for _ in range(max(1, round(interval / tick)))
+        ]
+        self._flows: dict[Hashable, int] = {}
+        self._accounts: dict[Pingable, Hashable] = {}
+        self._next_slot = itertools.cycle(range(len(self._slots)))
+        self._position = 0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> "KeepaliveService":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def __len__(self) -> int:
+        return len(self._accounts)
+
+    @property
+    def flows(self) -> int:
+        return len(self._flows)
+
+    def add(self, account: Pingable) -> None:
+        flow = account.flow
+        if flow is None:
+            return
+        with self._lock:
+            if self._accounts.get(account) == flow:
+                return
+            self._remove(account)
+            self._accounts[account] = flow
+            if flow not in self._flows:
+                self._flows[flow] = next(self._next_slot)
+            self._slots[self._flows[flow]].setdefault(flow, []).append(account)
+
+    def remove(self, account: Pingable) -> None:
+        with self._lock:
+            self._remove(account)
+
+    def run_tick(self) -> int:
+        """Sends the keepalives of the current slot, moves to the next and returns the count."""
+        with self._lock:
+            slot = self._slots[self._position]
+            self._position = (self._position + 1) % len(self._slots)
+            senders = [accounts[0] for accounts in slot.values()]
+        for account in senders:
+            try:
+                if self.mode == Mode.CRLF:
+                    account.ping()
+                else:
+                    account.options()
+            except OSError:
+                self.failed += 1
+            except Exception as e:
+                # one broken account must not stop the keepalives of all the others
+                self.failed += 1
+                print(f"KEEPALIVE FAILURE: {type(e).__name__}: {e}")
+        self.sent += len(senders)
+        return len(senders)
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stopped.set()
+            self._thread.join()
+            self._thread = None
+
+    def _remove(self, account: Pingable) -> None:
+        flow = self._accounts.pop(account, None)
+        if flow is None:
+            return
+        slot = self._slots[self._flows[flow]]
+        slot[flow].remove(account)
+        if not slot[flow]:
+            del slot[flow]
+            del self._flows[flow]
+
+    def _run(self) -> None:
+        next_tick = time.monotonic()
+        while not self._stopped.is_set():
+            self.run_tick()
+            next_tick += self.tick
+            self._stopped.wait(max(0.0, next_tick - time.monotonic()))
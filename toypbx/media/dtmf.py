@@ -0,0 +1,98 @@
+import numpy as np
+
+ROW_FREQUENCIES = (697, 770, 852, 941)
+COLUMN_FREQUENCIES = (1209, 1336, 1477, 1633)
+KEYPAD = ("123A", "456B", "789C", "*0#D")
+NO_DIGIT = -1
+
+
+class GoertzelBank:
+    """Evaluates the eight DTMF Goertzel filters for many channels at once.
+
+    A Goertzel filter run over a whole frame yields the single DFT bin at its target
+    frequency, so the bank is precomputed as cosine/sine basis vectors and a batch of
+    frames is filtered with one matrix product instead of a per-sample recurrence.
+    """
+
+    def __init__(self, sample_rate: int = 8000, frame_size: int = 160) -> None:
+        self.sample_rate = sample_rate
+        self.frame_size = frame_size
+        frequencies = np.array(ROW_FREQUENCIES + COLUMN_FREQUENCIES, dtype=np.float64)
+        phase = 2 * np.pi * np.outer(np.arange(frame_size), frequencies) / sample_rate
+        # (frame_size, 16): cosine bases followed by sine bases
+        self._basis = np.hstack([np.cos(phase), np.sin(phase)]).astype(np.float32)
+
+    def power(self, frames: np.ndarray) -> np.ndarray:
+        """Returns each filter's share of frame energy as a ``(channels, 8)`` array."""
+        projected = np.asarray(frames, dtype=np.float32) @ self._basis
+        return (projected[:, :8] ** 2 + projected[:, 8:] ** 2) * (2 / self.frame_size)
+
+
+class DTMFDetector:
+    """Detects in-band DTMF digits over a batch of channels per 20 ms tick.
+
+    ``detect`` takes a ``(channels, frame_size)`` array and returns ``(channel, digit)``
+    pairs for key presses that were stable for ``min_frames`` consecutive frames. A digit
+    is reported once and must be released before it can be reported again.
+    """
+
+    def __init__(
+        self,
+        channels: int,
+        sample_rate: int = 8000,
+        frame_size: int = 160,
+        min_energy: float = 1e4,
+        min_ratio: float = 0.6,
+        max_twist_db: float = 8.0,
+        min_frames: int = 2,
+    ) -> None:
+        self.bank = GoertzelBank(sample_rate=sample_rate, frame_size=frame_size)
+        self.min_energy = min_energy
+        self.min_ratio = min_ratio
+        self.max_twist = 10 ** (max_twist_db / 10)
+        self.min_frames = min_frames
+        self._candidate = np.full(channels, NO_DIGIT, dtype=np.int8)
+        self._frames = np.zeros(channels, dtype=np.int32)
+        self._reported = np.zeros(channels, dtype=bool)
+
+    def classify(self, frames: np.ndarray) -> np.ndarray:
+        """Returns the keypad index (row * 4 + column) per channel, or -1."""
+        frames = np.asarray(frames, dtype=np.float32)
+        energy = np.einsum("ij,ij->i", frames, frames)
+        power = self.bank.power(frames)
+        rows, columns = power[:, :4], power[:, 4:]
+        row = rows.argmax(axis=1)
+        column = columns.argmax(axis=1)
+        index = np.arange(len(frames))
+        row_power = rows[index, row]
+        column_power = columns[index, column]
+
+        valid = energy / frames.shape[1] >= self.min_energy
+        valid &= row_power + column_power >= self.min_ratio * energy
+        valid &= row_power * self.max_twist >= column_power
+        valid &= column_power * self.max_twist >= row_power
+        return np.where(valid, row * 4 + column, NO_DIGIT)
+
+    def detect(self, frames: np.ndarray) -> list[tuple[int, str]]:
+        keys = self.classify(frames)
+        same = keys == self._candidate
+        self._frames = np.where(same, self._frames + 1, 1)
+        self._reported &= same
+        self._candidate[:] = keys
+
+        fire = (keys != NO_DIGIT) & ~self._reported & (self._frames >= self.min_frames)
+        self._reported |= fire
+        return [
+            (int(channel), KEYPAD[keys[channel] // 4][keys[channel] % 4])
+            for channel in np.flatnonzero(fire)
+        ]
+
+
+def generate(
+    digit: str, sample_rate: int = 8000, samples: int = 160, amplitude: int = 8000
+) -> np.ndarray:
+    row, column = next((r, line.index(digit)) for r, line in enumerate(KEYPAD) if digit in line)
+    t = np.arange(samples) / sample_rate
+    tone = np.sin(2 * np.pi * ROW_FREQUENCIES[row] * t)
+    tone += np.sin(2 * np.pi * COLUMN_FREQUENCIES[column] * t)
+    return (tone * amplitude / 2).astype(np.int16)
@@ -0,0 +1,113 @@
+from collections.abc import Hashable, Iterator
+
+import numpy as np
+
+FRAME_SIZE = 160  # 20 ms of 8 kHz audio
+INT16_MIN = np.iinfo(np.int16).min
+INT16_MAX = np.iinfo(np.int16).max
+
+
+class ConferenceRoom:
+    """Mixes the decoded PCM frames of every participant once per tick.
+
+    Participants occupy the first rows of preallocated matrices so a tick is a handful of
+    vectorized operations over ``frames[:n]``: everybody hears the gain-weighted sum of
+    the room minus their own contribution (N-minus-one), clipped to int16.
+    """
+
+    def __init__(self, frame_size: int = FRAME_SIZE, capacity: int = 64) -> None:
+        self.frame_size = frame_size
+        self.capacity = capacity
+        self._participants: list[Hashable] = []
+        self._rows: dict[Hashable, int] = {}
+        self._frames = np.zeros((capacity, frame_size), dtype=np.int16)
+        self._gains = np.ones((capacity, 1), dtype=np.float32)
+        self._weighted = np.zeros((capacity, frame_size), dtype=np.float32)
+        self._total = np.zeros(frame_size, dtype=np.float32)
+        self._mixed = np.zeros((capacity, frame_size), dtype=np.int16)
+
+    def __len__(self) -> int:
+        return len(self._participants)
+
+    def __contains__(self, participant: Hashable) -> bool:
+        return participant in self._rows
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._participants)
+
+    def join(self, participant: Hashable, gain: float = 1.0) -> None:
+        if participant in self._rows:
+            raise ValueError(f"{participant!r} already joined")
+        row = len(self._participants)
+        if row == self.capacity:
+            self._grow()
+        self._participants.append(participant)
+        self._rows[participant] = row
+        self._frames[row] = 0
+        self._gains[row] = gain
+
+    def leave(self, participant: Hashable) -> None:
+        row = self._rows.pop(participant)
+        last = len(self._participants) - 1
+        moved = self._participants.pop()
+        if row != last:
+            # keep rows packed: the last participant takes over the freed row
+            self._participants[row] = moved
+            self._rows[moved] = row
+            self._frames[row] = self._frames[last]
+            self._gains[row] = self._gains[last]
+
+    def set_gain(self, participant: Hashable, gain: float) -> None:
+        self._gains[self._rows[participant]] = gain
+
+    def put(self, participant: Hashable, frame: bytes | np.ndarray) -> None:
+        if isinstance(frame, (bytes, bytearray, memoryview)):
+            frame = np.frombuffer(frame, dtype="<i2")
+        self._frames[self._rows[participant], : len(frame)] = frame
+
+    def mix(self) -> np.ndarray:
+        """Returns the N-minus-one mix for each participant, in row order.
+
+        Row order is the order of iterating over the room. It starts out as join order, but
+        ``leave`` moves the last participant into the freed row, so use ``frame`` to look up a
+        given participant's mix. The returned rows are reused by the next tick; copy them if they must outlive it.
+        Input frames are consumed: a participant that sends nothing next tick is silent.
+        """
+        n = len(self._participants)
+        frames, weighted, mixed = self._frames[:n], self._weighted[:n], self._mixed[:n]
+        np.multiply(frames, self._gains[:n], out=weighted)
+        weighted.sum(axis=0, out=self._total)
+        np.subtract(self._total, weighted, out=weighted)
+        np.clip(weighted, INT16_MIN, INT16_MAX, out=weighted)
+        np.rint(weighted, out=weighted)
+        mixed[...] = weighted
+        frames[...] = 0
+        return mixed
+
+    def frame(self, participant: Hashable) -> np.ndarray:
+        return self._mixed[self._rows[participant]]
+
+    def _grow(self) -> None:
+        self.capacity *= 2
+        for name in ("_frames", "_gains", "_weighted", "_mixed"):
+            old = getattr(self, name)
+            new = np.zeros((self.capacity, old.shape[1]), dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, name, new)
+
+
+class ConferenceBridge:
+    def __init__(self, frame_size: int = FRAME_SIZE) -> None:
+        self.frame_size = frame_size
+        self.rooms: dict[str, ConferenceRoom] = {}
+
+    def room(self, name: str) -> ConferenceRoom:
+        if (room := self.rooms.get(name)) is None:
+            room = self.rooms[name] = ConferenceRoom(frame_size=self.frame_size)
+        return room
+
+    def close(self, name: str) -> None:
+        self.rooms.pop(name, None)
+
+    def tick(self) -> dict[str, np.ndarray]:
+        return {name: room.mix() for name, room in self.rooms.items() if len(room)}
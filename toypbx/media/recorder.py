@@ -0,0 +1,156 @@
+import os
+import queue
+import struct
+import threading
+from typing import BinaryIO
+
+WAV_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")
+CHUNK_SIZE = 64 * 1024
+
+
+class Recording:
+    """One WAV file fed from the media loop.
+
+    Frames are appended to a small in-memory chunk which is handed over to the writer
+    thread once it reaches ``chunk_size`` bytes, so the caller never touches the disk and
+    never holds more than one chunk of a call in memory.
+    """
+
+    def __init__(
+        self,
+        writer: "RecordingWriter",
+        path: str | os.PathLike,
+        sample_rate: int = 8000,
+        channels: int = 1,
+        sample_width: int = 2,
+        chunk_size: int = CHUNK_SIZE,
+    ) -> None:
+        self.writer = writer
+        self.path = path
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.chunk_size = chunk_size
+        self.closed = False
+        self.finished = threading.Event()
+        self.data_size = 0
+        self.dropped = 0
+        self._chunk = bytearray()
+        self._file: BinaryIO | None = None
+
+    def __enter__(self) -> "Recording":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def write(self, frame: bytes | bytearray | memoryview) -> None:
+        if self.closed:
+            raise ValueError("write to closed recording")
+        self._chunk += frame
+        if len(self._chunk) >= self.chunk_size:
+            self._flush()
+
+    def close(self) -> None:
+        """Hands the last chunk and the header rewrite to the writer without waiting."""
+        if self.closed:
+            return
+        self.closed = True
+        self._flush()
+        self.writer.submit(self._finish, force=True)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Blocks until the file is complete on disk; False if ``timeout`` ran out."""
+        return self.finished.wait(timeout)
+
+    def header(self) -> bytes:
+        block_align = self.channels * self.sample_width
+        return WAV_HEADER.pack(
+            b"RIFF",
+            36 + self.data_size,
+            b"WAVE",
+            b"fmt ",
+            16,
+            1,  # PCM
+            self.channels,
+            self.sample_rate,
+            self.sample_rate * block_align,
+            block_align,
+            self.sample_width * 8,
+            b"data",
+            self.data_size,
+        )
+
+    def _flush(self) -> None:
+        if not self._chunk:
+            return
+        chunk, self._chunk = bytes(self._chunk), bytearray()
+        if not self.writer.submit(lambda: self._append(chunk)):
+            self.dropped += len(chunk)
+
+    def _append(self, chunk: bytes) -> None:
+        if self._file is None:
+            self._file = open(self.path, "wb")
+            self._file.write(self.header())
+        self._file.write(chunk)
+        self.data_size += len(chunk)
+
+    def _finish(self) -> None:
+        try:
+            if self._file is None:
+                self._file = open(self.path, "wb")
+            self._file.seek(0)
+            self._file.write(self.header())
+            self._file.close()
+        finally:
+            self.finished.set()
+
+
+class RecordingWriter:
+    """Background thread doing the file I/O for any number of recordings.
+
+    The queue is bounded: when the disk cannot keep up, chunks are dropped (and counted on
+    their recording) instead of blocking the media loop or growing without limit. Closing
+    a recording is never dropped, so every file gets its final header.
+    """
+
+    def __init__(self, max_pending: int = 1024) -> None:
+        self.max_pending = max_pending
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> "RecordingWriter":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def open(self, path: str | os.PathLike, **kwargs) -> Recording:
+        self.start()
+        return Recording(self, path, **kwargs)
+
+    def submit(self, task, force: bool = False) -> bool:
+        """Queues ``task`` for the writer thread; drops it when full unless ``force``."""
+        if not force and self._queue.qsize() >= self.max_pending:
+            return False
+        self._queue.put(task)
+        return True
+
+    def _run(self) -> None:
+        while (task := self._queue.get()) is not None:
+            try:
+                task()
+            except Exception as e:
+                print(f"RECORDING FAILURE: {type(e).__name__}: {e}")
@@ -0,0 +1,287 @@
+import random
+import selectors
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from dataclasses import replace
+
+from toypbx.protocols.rtp.packet import HEADER, RTP_VERSION, SEQ_MOD
+from toypbx.protocols.sdp.session import SessionDescription
+
+PORT_MIN = 10000
+PORT_MAX = 20000
+BUF_SIZE = 2048
+# packets taken from one socket before moving on, so a flood cannot starve the others
+MAX_BATCH = 64
+# a latched source silent this long may be replaced by another one (a NAT rebinding)
+LATCH_TIMEOUT = 2.0
+SEQUENCE = struct.Struct("!H")
+TIMESTAMP = struct.Struct("!I")
+SSRC = struct.Struct("!I")
+TIMESTAMP_MOD = 1 << 32
+MARKER = 0x80
+
+Address = tuple[str, int]
+
+
+class PortPool:
+    """Even RTP ports (the odd one above is left for RTCP) handed out round robin."""
+
+    def __init__(self, host: str = "0.0.0.0", start: int = PORT_MIN, end: int = PORT_MAX) -> None:
+        self.host = host
+        self._free = deque(range(start + start % 2, end, 2))
+
+    def __len__(self) -> int:
+        return len(self._free)
+
+    def allocate(self) -> socket.socket:
+        """A non-blocking UDP socket bound to the next free port; skips ports in use."""
+        for _ in range(len(self._free)):
+            port = self._free.popleft()
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            try:
+                sock.bind((self.host, port))
+            except OSError:
+                sock.close()
+                self._free.append(port)
+                continue
+            sock.setblocking(False)
+            return sock
+        raise OSError("no free RTP port")
+
+    def release(self, sock: socket.socket) -> None:
+        port = sock.getsockname()[1]
+        sock.close()
+        self._free.append(port)
+
+
+class Leg:
+    """One side of a relayed call: our socket facing an endpoint and what it sends us.
+
+    The endpoint's address starts as the one in its SDP and is replaced by the source
+    of the first valid RTP packet (symmetric RTP), which is what gets through its NAT.
+    After that, packets from anywhere else are dropped, except from the SDP address
+    itself or once the latched source has been silent for ``LATCH_TIMEOUT``; both
+    latch again. Packets going out of this leg carry our own SSRC, and their sequence
+    number and timestamp carry on across upstream SSRC changes (re-INVITEs, transfers)
+    with the marker bit set on the first packet of the new stream, so the endpoint
+    sees one stream that resumes after a talkspurt gap.
+    """
+
+    def __init__(self, sock: socket.socket, rng: random.Random) -> None:
+        self.socket = sock
+        self.port = sock.getsockname()[1]
+        self.remote: Address | None = None
+        self.advertised: Address | None = None
+        self.latched = False
+        self.last_seen = 0.0
+        self.peer: "Leg | None" = None
+        self.ssrc = rng.getrandbits(32)
+        self.received = 0
+        self.sent = 0
+        self.dropped = 0
+        self._source_ssrc: int | None = None
+        self._seq_offset = 0
+        self._last_seq = rng.getrandbits(16)
+        self._timestamp_offset = 0
+        self._last_timestamp = rng.getrandbits(32)
+        self._timestamp_step = 0
+
+    def expect(self, address: Address) -> None:
+        """The address from the endpoint's SDP; sent to until a packet is latched on."""
+        self.advertised = address
+        if not self.latched:
+            self.remote = address
+
+    def latch(self, source: Address, now: float) -> bool:
+        """Whether a valid RTP packet from ``source`` is from the endpoint, latching on it."""
+        if self.latched and source != self.remote:
+            if source != self.advertised and now - self.last_seen < LATCH_TIMEOUT:
+                return False
+        self.remote = source
+        self.latched = True
+        self.last_seen = now
+        return True
+
+    def rewrite(self, buf: bytearray) -> None:
+        """Sets our SSRC, sequence number and timestamp on the packet in ``buf``, in place."""
+        (source_ssrc,) = SSRC.unpack_from(buf, 8)
+        (seq,) = SEQUENCE.unpack_from(buf, 2)
+        (timestamp,) = TIMESTAMP.unpack_from(buf, 4)
+        if source_ssrc != self._source_ssrc:
+            # a new upstream stream continues right after the last packet we sent,
+            # marked so the far end's jitter buffer resynchronises
+            if self._source_ssrc is not None:
+                buf[1] |= MARKER
+            self._source_ssrc = source_ssrc
+            self._seq_offset = (self._last_seq + 1 - seq) % SEQ_MOD
+            self._timestamp_offset = (
+                self._last_timestamp + self._timestamp_step - timestamp
+            ) % TIMESTAMP_MOD
+        self._last_seq = (seq + self._seq_offset) % SEQ_MOD
+        timestamp = (timestamp + self._timestamp_offset) % TIMESTAMP_MOD
+        step = (timestamp - self._last_timestamp) % TIMESTAMP_MOD
+        if 0 < step < TIMESTAMP_MOD // 2:
+            self._timestamp_step = step
+        self._last_timestamp = timestamp
+        SEQUENCE.pack_into(buf, 2, self._last_seq)
+        TIMESTAMP.pack_into(buf, 4, timestamp)
+        SSRC.pack_into(buf, 8, self.ssrc)
+
+
+class RelaySession:
+    """A caller leg facing A and a callee leg facing B, forwarding into each other."""
+
+    def __init__(self, caller: Leg, callee: Leg, advertise: str) -> None:
+        self.caller = caller
+        self.callee = callee
+        self.advertise = advertise
+        caller.peer = callee
+        callee.peer = caller
+
+    def rewrite_offer(self, sdp: SessionDescription) -> SessionDescription:
+        """A's offer as sent to B: B is to send its media to the callee leg."""
+        self.caller.expect(sdp.rtp_address)
+        return rewrite_sdp(sdp, self.advertise, self.callee.port)
+
+    def rewrite_answer(self, sdp: SessionDescription) -> SessionDescription:
+        """B's answer as sent to A: A is to send its media to the caller leg."""
+        self.callee.expect(sdp.rtp_address)
+        return rewrite_sdp(sdp, self.advertise, self.caller.port)
+
+
+def rewrite_sdp(sdp: SessionDescription, address: str, port: int) -> SessionDescription:
+    """Points the first stream at ``address:port``; other streams are declined (port 0).
+
+    The origin moves to ``address`` too, so no endpoint address leaks to the other leg.
+    """
+    media = []
+    for index, description in enumerate(sdp.media):
+        if index or not description.port:
+            media.append(replace(description, port=0))
+            continue
+        attributes = tuple(
+            (f"rtcp:{port + 1} IN IP4 {address}" if attribute.startswith("rtcp:") else attribute)
+            for attribute in description.attributes
+        )
+        media.append(replace(description, port=port, connection=address, attributes=attributes))
+    connection = address if sdp.connection else None
+    return replace(sdp, address=address, connection=connection).with_media(*media)
+
+
+class RTPRelay:
+    """Anchors RTP between call legs on one thread.
+
+    Each readable socket is drained into a single preallocated buffer with
+    ``recvfrom_into``; the RTP header fields are rewritten in place and the
+    packet goes out of the peer leg through a memoryview of the buffer, precomputed
+    for every length, so forwarding copies no payload and allocates no buffers.
+    Only RTP is relayed; the RTCP port of each pair is reserved but not served.
+    """
+
+    def __init__(
+        self, advertise: str, ports: PortPool | None = None, rng: random.Random | None = None
+    ) -> None:
+        self.advertise = advertise
+        self.ports = ports or PortPool()
+        self.rng = rng or random.Random()
+        self.forwarded = 0
+        self.dropped = 0
+        self._buf = bytearray(BUF_SIZE)
+        view = memoryview(self._buf)
+        self._views = [view[:length] for length in range(BUF_SIZE + 1)]
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> "RTPRelay":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def open(self) -> RelaySession:
+        caller = Leg(self.ports.allocate(), self.rng)
+        try:
+            callee = Leg(self.ports.allocate(), self.rng)
+        except OSError:
+            self.ports.release(caller.socket)
+            raise
+        with self._lock:
+            self._selector.register(caller.socket, selectors.EVENT_READ, caller)
+            self._selector.register(callee.socket, selectors.EVENT_READ, callee)
+        return RelaySession(caller, callee, self.advertise)
+
+    def close(self, session: RelaySession) -> None:
+        with self._lock:
+            for leg in (session.caller, session.callee):
+                self._selector.unregister(leg.socket)
+                self.ports.release(leg.socket)
+
+    def poll(self, timeout: float | None = 0.0) -> int:
+        """Forwards what is waiting and returns the number of packets forwarded."""
+        # legs closed while selecting are skipped; their sockets are already closed
+        events = self._selector.select(timeout)
+        forwarded = 0
+        with self._lock:
+            for key, _ in events:
+                if key.fileobj.fileno() >= 0:
+                    forwarded += self._drain(key.data)
+        return forwarded
+
+    def _drain(self, leg: Leg) -> int:
+        buf = self._buf
+        views = self._views
+        peer = leg.peer
+        forwarded = 0
+        now = time.monotonic()
+        for _ in range(MAX_BATCH):
+            try:
+                length, source = leg.socket.recvfrom_into(buf)
+            except (BlockingIOError, InterruptedError):
+                break
+            except ConnectionRefusedError:
+                # ICMP port unreachable for an earlier send from this socket
+                continue
+            leg.received += 1
+            # only a valid RTP packet may latch, so junk cannot hijack the leg
+            if (
+                length < HEADER.size
+                or buf[0] >> 6 != RTP_VERSION
+                or not leg.latch(source, now)
+                or peer.remote is None
+            ):
+                leg.dropped += 1
+                self.dropped += 1
+                continue
+            peer.rewrite(buf)
+            try:
+                peer.socket.sendto(views[length], peer.remote)
+            except OSError:
+                leg.dropped += 1
+                self.dropped += 1
+                continue
+            peer.sent += 1
+            forwarded += 1
+        self.forwarded += forwarded
+        return forwarded
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._running = False
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while self._running:
+            self.poll(0.05)
@@ -9,11 +9,13 @@ SOCKET_TIMEOUT = 1
 
 
 class UDPClient:
-    def __init__(self, domain: str, port: int, callback: Callable[[str], None]) -> None:
+    def __init__(self, domain: str, port: int, callback: Callable[[bytes], None]) -> None:
         self.domain = domain
         self.port = port
         self.socket: socket.socket | None = None
         self.callback = ref(callback)
+        self.received = 0
+        self.errors = 0
 
     @contextmanager
     def connect(self):
@@ -28,16 +30,31 @@ class UDPClient:
                 self.socket = None
                 recv_thread.join(SOCKET_TIMEOUT * 2)
 
+    @property
+    def flow(self) -> tuple[socket.socket, str, int] | None:
+        return (self.socket, self.domain, self.port) if self.socket else None
+
     def send(self, message: str) -> None:
         if self.socket:
             self.socket.sendto(message.encode("utf-8"), (self.domain, self.port))
 
+    def ping(self) -> None:
+        # RFC 5626 3.5.1 keepalive; the server answers with a single CRLF
+        if self.socket:
+            self.socket.sendto(b"\r\n\r\n", (self.domain, self.port))
+
     def receive_forever(self) -> None:
         while self.socket:
             try:
                 data = self.socket.recv(BUF_SIZE)
-                response = data.decode("utf-8")
-                if callback := self.callback():
-                    callback(response)
-            except TimeoutError:
-                pass
+            except OSError:
+                # timeouts, and ICMP errors from earlier sends surfacing on recv
+                continue
+            self.received += 1
+            if callback := self.callback():
+                try:
+                    callback(data)
+                except Exception as e:
+                    # one bad datagram must not take the receive thread down
+                    self.errors += 1
+                    print(f"RECEIVE FAILURE: {type(e).__name__}: {e}")
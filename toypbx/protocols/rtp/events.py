@@ -0,0 +1,74 @@
+import struct
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from typing import Self
+
+from .packet import RTPHeader
+
+EVENT = struct.Struct("!BBH")
+EVENT_CODES = "0123456789*#ABCD"
+FLASH = 16
+
+
+@dataclass(frozen=True)
+class TelephoneEvent:
+    event: int
+    end: bool = False
+    volume: int = 10
+    duration: int = 0
+
+    @property
+    def digit(self) -> str | None:
+        return EVENT_CODES[self.event] if self.event < len(EVENT_CODES) else None
+
+    @classmethod
+    def parse(cls, payload: bytes | bytearray | memoryview) -> Self:
+        if len(payload) < EVENT.size:
+            raise ValueError("telephone-event payload too short")
+        event, flags, duration = EVENT.unpack_from(payload)
+        return cls(event=event, end=bool(flags & 0x80), volume=flags & 0x3F, duration=duration)
+
+    def to_bytes(self) -> bytes:
+        flags = (0x80 if self.end else 0) | self.volume & 0x3F
+        return EVENT.pack(self.event, flags, self.duration)
+
+    @classmethod
+    def from_digit(cls, digit: str, end: bool = False, volume: int = 10, duration: int = 0) -> Self:
+        return cls(
+            event=EVENT_CODES.index(digit.upper()), end=end, volume=volume, duration=duration
+        )
+
+
+class TelephoneEventReceiver:
+    """Turns RFC 4733 telephone-event packets into one callback per key press.
+
+    An event is identified by its RTP timestamp: the start packet, the duration updates and
+    the (usually tripled) end packets of one key press all share it, so only the first
+    packet carrying a new timestamp is reported.
+    """
+
+    def __init__(
+        self,
+        payload_types: Iterable[int] = (101, 102),
+        on_event: Callable[[TelephoneEvent], None] | None = None,
+    ) -> None:
+        self.payload_types = frozenset(payload_types)
+        self.on_event = on_event
+        self._timestamp: int | None = None
+
+    def feed_packet(self, data: bytes | bytearray | memoryview) -> TelephoneEvent | None:
+        header = RTPHeader.parse(data)
+        if header.payload_type not in self.payload_types:
+            return None
+        return self.feed(header.timestamp, header.payload(data))
+
+    def feed(
+        self, timestamp: int, payload: bytes | bytearray | memoryview
+    ) -> TelephoneEvent | None:
+        if timestamp == self._timestamp:
+            return None
+        self._timestamp = timestamp
+        event = TelephoneEvent.parse(payload)
+        if self.on_event:
+            self.on_event(event)
+        return event
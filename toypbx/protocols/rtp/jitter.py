@@ -0,0 +1,202 @@
+import math
+from array import array
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from .packet import SEQ_MOD, RTPHeader
+
+EMPTY = -1
+
+# (missing sequence number, last played payload) -> substitute payload
+Concealment = Callable[[int, memoryview | None], bytes | None]
+
+
+def repeat_last(sequence_number: int, last: memoryview | None) -> bytes | None:
+    return bytes(last) if last is not None else None
+
+
+@dataclass
+class JitterStats:
+    received: int = 0
+    played: int = 0
+    late: int = 0
+    lost: int = 0
+    duplicate: int = 0
+    concealed: int = 0
+    dropped: int = 0
+    underruns: int = 0
+    # RFC 3550 interarrival jitter in timestamp units
+    jitter: float = 0.0
+
+
+class JitterBuffer:
+    """Reorders RTP payloads by sequence number and smooths their playout.
+
+    Payloads live in one preallocated slab indexed by ``sequence % capacity``, so
+    ``push`` and ``pop`` never allocate per packet. Views returned by ``pop`` stay
+    valid until ``capacity`` newer packets have been pushed.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 64,
+        max_payload: int = 320,
+        clock_rate: int = 8000,
+        frame_size: int = 160,
+        min_depth: int = 2,
+        max_depth: int | None = None,
+        concealment: Concealment | None = None,
+    ) -> None:
+        if capacity <= 0 or capacity & (capacity - 1):
+            raise ValueError("capacity must be a power of two")
+        self.capacity = capacity
+        self.max_payload = max_payload
+        self.clock_rate = clock_rate
+        self.frame_size = frame_size
+        self.min_depth = min_depth
+        self.max_depth = max_depth or capacity // 2
+        self.concealment = concealment
+        self.stats = JitterStats()
+
+        self._mask = capacity - 1
+        self._slab = memoryview(bytearray(capacity * max_payload))
+        self._sequences = array("q", [EMPTY]) * capacity
+        self._timestamps = array("I", [0]) * capacity
+        self._lengths = array("H", [0]) * capacity
+        self._next: int | None = None
+        self._highest: int | None = None
+        self._playing = False
+        # once anything has played, packets behind the playout point are late for good
+        self._started = False
+        self._last_transit: float | None = None
+        self._last: memoryview | None = None
+
+    def __len__(self) -> int:
+        return self.depth
+
+    @property
+    def depth(self) -> int:
+        if self._next is None or self._highest < self._next:
+            return 0
+        return self._highest - self._next + 1
+
+    @property
+    def target_depth(self) -> int:
+        depth = self.min_depth + math.ceil(4 * self.stats.jitter / self.frame_size)
+        return min(depth, self.max_depth)
+
+    def reset(self) -> None:
+        self._sequences[:] = array("q", [EMPTY]) * self.capacity
+        self._next = None
+        self._highest = None
+        self._playing = False
+        self._started = False
+        self._last_transit = None
+        self._last = None
+        self.stats = JitterStats()
+
+    def push_packet(
+        self, data: bytes | bytearray | memoryview, arrival: float | None = None
+    ) -> bool:
+        header = RTPHeader.parse(data)
+        return self.push(
+            header.sequence_number, header.timestamp, header.payload(data), arrival=arrival
+        )
+
+    def push(
+        self,
+        sequence_number: int,
+        timestamp: int,
+        payload: bytes | bytearray | memoryview,
+        arrival: float | None = None,
+    ) -> bool:
+        stats = self.stats
+        stats.received += 1
+        length = len(payload)
+        if length > self.max_payload:
+            raise ValueError(f"payload larger than {self.max_payload} bytes")
+
+        extended = self._extend(sequence_number)
+        if self._next is None:
+            self._next = extended
+        elif extended < self._next:
+            if self._started:
+                stats.late += 1
+                return False
+            # still filling for the first playout: an earlier packet arrived late
+            self._next = extended
+        elif extended - self._next >= self.capacity:
+            self._skip_to(extended - self.capacity + 1)
+        if self._highest is None or extended > self._highest:
+            self._highest = extended
+
+        slot = extended & self._mask
+        if self._sequences[slot] == extended:
+            stats.duplicate += 1
+            return False
+        self._sequences[slot] = extended
+        self._timestamps[slot] = timestamp
+        self._lengths[slot] = length
+        offset = slot * self.max_payload
+        self._slab[offset : offset + length] = payload
+
+        if arrival is not None:
+            transit = arrival * self.clock_rate - timestamp
+            if self._last_transit is not None:
+                stats.jitter += (abs(transit - self._last_transit) - stats.jitter) / 16
+            self._last_transit = transit
+        return True
+
+    def pop(self) -> memoryview | bytes | None:
+        if self._next is None:
+            return None
+        if not self._playing:
+            if self.depth < self.target_depth:
+                return None
+            self._playing = True
+            self._started = True
+        elif self._next > self._highest:
+            # underrun: stop and rebuffer up to the (possibly grown) target depth
+            self._playing = False
+            self.stats.underruns += 1
+            return None
+        elif self.depth > self.max_depth:
+            # too much latency piled up: catch up to the target depth
+            self._skip_to(self._highest - self.target_depth + 1)
+
+        extended = self._next
+        self._next += 1
+        slot = extended & self._mask
+        if self._sequences[slot] == extended:
+            self._sequences[slot] = EMPTY
+            self.stats.played += 1
+            offset = slot * self.max_payload
+            self._last = self._slab[offset : offset + self._lengths[slot]]
+            return self._last
+
+        self.stats.lost += 1
+        if self.concealment is not None:
+            substitute = self.concealment(extended % SEQ_MOD, self._last)
+            if substitute is not None:
+                self.stats.concealed += 1
+                return substitute
+        return None
+
+    def _extend(self, sequence_number: int) -> int:
+        if self._highest is None:
+            # start one cycle in so that early wrap-around never goes negative
+            return sequence_number + SEQ_MOD
+        extended = (self._highest & ~0xFFFF) | sequence_number
+        if extended - self._highest > SEQ_MOD // 2:
+            extended -= SEQ_MOD
+        elif self._highest - extended > SEQ_MOD // 2:
+            extended += SEQ_MOD
+        return extended
+
+    def _skip_to(self, extended: int) -> None:
+        for skipped in range(max(self._next, extended - self.capacity), extended):
+            slot = skipped & self._mask
+            if self._sequences[slot] == skipped:
+                self._sequences[slot] = EMPTY
+                self.stats.dropped += 1
+        self._next = extended
@@ -0,0 +1,67 @@
+import struct
+from dataclasses import dataclass
+from typing import Self
+
+RTP_VERSION = 2
+SEQ_MOD = 1 << 16
+HEADER = struct.Struct("!BBHII")
+
+
+@dataclass(frozen=True)
+class RTPHeader:
+    payload_type: int
+    sequence_number: int
+    timestamp: int
+    ssrc: int
+    marker: bool = False
+    payload_offset: int = HEADER.size
+    payload_length: int = 0
+
+    @classmethod
+    def parse(cls, data: bytes | bytearray | memoryview) -> Self:
+        if len(data) < HEADER.size:
+            raise ValueError("RTP packet too short")
+        first, second, seq, timestamp, ssrc = HEADER.unpack_from(data)
+        if first >> 6 != RTP_VERSION:
+            raise ValueError("unsupported RTP version")
+
+        offset = HEADER.size + (first & 0x0F) * 4
+        if first & 0x10:
+            # header extension: 16-bit profile, 16-bit length in 32-bit words
+            if len(data) < offset + 4:
+                raise ValueError("RTP header extension truncated")
+            (length,) = struct.unpack_from("!H", data, offset + 2)
+            offset += 4 + length * 4
+        end = len(data)
+        if first & 0x20:
+            end -= data[-1]
+        if end < offset:
+            raise ValueError("RTP payload truncated")
+
+        return cls(
+            payload_type=second & 0x7F,
+            sequence_number=seq,
+            timestamp=timestamp,
+            ssrc=ssrc,
+            marker=bool(second & 0x80),
+            payload_offset=offset,
+            payload_length=end - offset,
+        )
+
+    def payload(self, data: bytes | bytearray | memoryview) -> memoryview:
+        return memoryview(data)[self.payload_offset : self.payload_offset + self.payload_length]
+
+
+def build_packet(
+    payload_type: int,
+    sequence_number: int,
+    timestamp: int,
+    ssrc: int,
+    payload: bytes,
+    marker: bool = False,
+) -> bytes:
+    second = payload_type & 0x7F | (0x80 if marker else 0)
+    header = HEADER.pack(
+        RTP_VERSION << 6, second, sequence_number % SEQ_MOD, timestamp & 0xFFFFFFFF, ssrc
+    )
+    return header + payload
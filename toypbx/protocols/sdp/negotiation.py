@@ -0,0 +1,46 @@
+from dataclasses import replace
+from functools import lru_cache
+
+from .session import DEFAULT_CODECS, Codec, MediaDescription, SessionDescription
+
+
+@lru_cache(maxsize=4096)
+def select_codecs(offered: tuple[Codec, ...], local: tuple[Codec, ...]) -> tuple[Codec, ...]:
+    """Returns the offered codecs we also support, in the offerer's order.
+
+    The answer keeps the offerer's payload types (RFC 3264 section 6.1) and our own fmtp.
+    Calls repeat with identical arguments at high call rates, hence the memoization.
+    """
+    supported = {codec.key: codec for codec in local}
+    selected = []
+    for codec in offered:
+        if (ours := supported.get(codec.key)) is not None:
+            selected.append(replace(codec, fmtp=ours.fmtp))
+    return tuple(selected)
+
+
+def answer(
+    offer: SessionDescription,
+    address: str,
+    port: int,
+    local: tuple[Codec, ...] = DEFAULT_CODECS,
+    session_id: int | None = None,
+) -> SessionDescription:
+    media = []
+    for offered in offer.media:
+        codecs = select_codecs(offered.codecs, local) if offered.port else ()
+        if not any(codec.encoding.lower() != "telephone-event" for codec in codecs):
+            # rejected stream: port zero with the offered formats (RFC 3264 section 6)
+            media.append(MediaDescription(port=0, codecs=offered.codecs[:1], media=offered.media))
+            continue
+        media.append(
+            MediaDescription(
+                port=port,
+                codecs=codecs,
+                media=offered.media,
+                protocol=offered.protocol,
+                connection=address,
+                attributes=(f"rtcp:{port + 1} IN IP4 {address}", "sendrecv"),
+            )
+        )
+    return SessionDescription.offer(address, port, local, session_id=session_id).with_media(*media)
@@ -0,0 +1,269 @@
+import time
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import Self
+
+# NTP timestamps start in 1900, as used by pjmedia for o= session ids
+NTP_EPOCH_OFFSET = 2208988800
+
+STATIC_PAYLOAD_TYPES = {
+    0: ("PCMU", 8000, None),
+    3: ("GSM", 8000, None),
+    4: ("G723", 8000, None),
+    8: ("PCMA", 8000, None),
+    9: ("G722", 8000, None),
+    18: ("G729", 8000, None),
+}
+
+
+@dataclass(frozen=True)
+class Codec:
+    payload_type: int
+    encoding: str
+    clock_rate: int
+    channels: int | None = None
+    fmtp: str | None = None
+
+    def __str__(self) -> str:
+        if self.channels:
+            return f"{self.encoding}/{self.clock_rate}/{self.channels}"
+        else:
+            return f"{self.encoding}/{self.clock_rate}"
+
+    @property
+    def key(self) -> tuple[str, int, int]:
+        return self.encoding.lower(), self.clock_rate, self.channels or 1
+
+    @classmethod
+    def parse(cls, payload_type: int, raw: str, fmtp: str | None = None) -> Self:
+        encoding, clock_rate, *channels = raw.split("/")
+        return cls(
+            payload_type=payload_type,
+            encoding=encoding,
+            clock_rate=int(clock_rate),
+            channels=int(channels[0]) if channels else None,
+            fmtp=fmtp,
+        )
+
+    @classmethod
+    def static(cls, payload_type: int) -> Self:
+        encoding, clock_rate, channels = STATIC_PAYLOAD_TYPES[payload_type]
+        return cls(
+            payload_type=payload_type, encoding=encoding, clock_rate=clock_rate, channels=channels
+        )
+
+
+OPUS = Codec(96, "opus", 48000, 2, fmtp="useinbandfec=1")
+G722 = Codec.static(9)
+PCMA = Codec.static(8)
+PCMU = Codec.static(0)
+TELEPHONE_EVENT_48000 = Codec(101, "telephone-event", 48000, fmtp="0-16")
+TELEPHONE_EVENT_8000 = Codec(102, "telephone-event", 8000, fmtp="0-16")
+DEFAULT_CODECS = (OPUS, G722, PCMA, PCMU, TELEPHONE_EVENT_48000, TELEPHONE_EVENT_8000)
+
+
+@dataclass(frozen=True)
+class MediaDescription:
+    port: int
+    codecs: tuple[Codec, ...]
+    media: str = "audio"
+    protocol: str = "RTP/AVP"
+    connection: str | None = None
+    bandwidths: tuple[str, ...] = ()
+    attributes: tuple[str, ...] = ()
+
+    def to_lines(self, compact: bool = False) -> list[str]:
+        """With ``compact``, drops bandwidths, defaults (``sendrecv``, RTCP on port + 1)
+        and the rtpmap of static payload types, which RFC 3551 already defines."""
+        payload_types = " ".join(str(codec.payload_type) for codec in self.codecs)
+        lines = [f"m={self.media} {self.port} {self.protocol} {payload_types}"]
+        if self.connection:
+            lines.append(f"c=IN IP4 {self.connection}")
+        if compact:
+            default_rtcp = f"rtcp:{self.port + 1}"
+            lines.extend(
+                f"a={attribute}"
+                for attribute in self.attributes
+                if attribute != "sendrecv" and attribute.split(" ")[0] != default_rtcp
+            )
+        else:
+            lines.extend(f"b={bandwidth}" for bandwidth in self.bandwidths)
+            lines.extend(f"a={attribute}" for attribute in self.attributes)
+        for codec in self.codecs:
+            if (
+                not compact
+                or codec.payload_type not in STATIC_PAYLOAD_TYPES
+                or codec != Codec.static(codec.payload_type)
+            ):
+                lines.append(f"a=rtpmap:{codec.payload_type} {codec}")
+            if codec.fmtp:
+                lines.append(f"a=fmtp:{codec.payload_type} {codec.fmtp}")
+        return lines
+
+
+@dataclass(frozen=True)
+class SessionDescription:
+    address: str
+    session_id: int
+    media: tuple[MediaDescription, ...]
+    session_version: int | None = None
+    username: str = "-"
+    session_name: str = "pjmedia"
+    connection: str | None = None
+    bandwidths: tuple[str, ...] = ()
+    attributes: tuple[str, ...] = ()
+
+    def __str__(self) -> str:
+        return "\r\n".join(self.to_lines()) + "\r\n"
+
+    def to_lines(self, compact: bool = False) -> list[str]:
+        """With ``compact``, also drops session bandwidths and ``X-`` attributes."""
+        version = self.session_id if self.session_version is None else self.session_version
+        lines = [
+            "v=0",
+            f"o={self.username} {self.session_id} {version} IN IP4 {self.address}",
+            f"s={'-' if compact else self.session_name}",
+        ]
+        if self.connection:
+            lines.append(f"c=IN IP4 {self.connection}")
+        if not compact:
+            lines.extend(f"b={bandwidth}" for bandwidth in self.bandwidths)
+        lines.append("t=0 0")
+        lines.extend(
+            f"a={attribute}"
+            for attribute in self.attributes
+            if not compact or not attribute.startswith("X-")
+        )
+        for media in self.media:
+            lines.extend(media.to_lines(compact))
+        return lines
+
+    def to_bytes(self) -> bytes:
+        return str(self).encode("utf-8")
+
+    @property
+    def codecs(self) -> tuple[Codec, ...]:
+        return self.media[0].codecs if self.media else ()
+
+    @property
+    def rtp_address(self) -> tuple[str, int] | None:
+        if not self.media:
+            return None
+        return self.media[0].connection or self.connection or self.address, self.media[0].port
+
+    def with_media(self, *media: MediaDescription) -> Self:
+        return replace(self, media=media)
+
+    @classmethod
+    def parse(cls, raw: str | bytes) -> Self:
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8")
+        return _parse(raw)
+
+    @classmethod
+    def offer(
+        cls,
+        address: str,
+        port: int,
+        codecs: tuple[Codec, ...] = DEFAULT_CODECS,
+        session_id: int | None = None,
+    ) -> Self:
+        session_id = session_id or int(time.time()) + NTP_EPOCH_OFFSET
+        return cls(
+            address=address,
+            session_id=session_id,
+            session_version=session_id,
+            bandwidths=("AS:117",),
+            attributes=("X-nat:0",),
+            media=(
+                MediaDescription(
+                    port=port,
+                    codecs=codecs,
+                    connection=address,
+                    bandwidths=("TIAS:96000",),
+                    attributes=(f"rtcp:{port + 1} IN IP4 {address}", "sendrecv"),
+                ),
+            ),
+        )
+
+
+@lru_cache(maxsize=1024)
+def _parse(raw: str) -> SessionDescription:
+    session: dict = {"bandwidths": [], "attributes": []}
+    media: list[dict] = []
+    current = session
+    for line in raw.splitlines():
+        if len(line) < 2 or line[1] != "=":
+            continue
+        kind, value = line[0], line[2:].strip()
+        match kind:
+            case "o":
+                username, session_id, version, _, _, address = value.split(" ", 5)
+                session.update(
+                    username=username,
+                    session_id=int(session_id),
+                    session_version=int(version),
+                    address=address,
+                )
+            case "s":
+                session["session_name"] = value
+            case "c":
+                current["connection"] = value.rsplit(" ", 1)[-1]
+            case "b":
+                current["bandwidths"].append(value)
+            case "m":
+                media_type, port, protocol, *payload_types = value.split()
+                current = {
+                    "media": media_type,
+                    "port": int(port),
+                    "protocol": protocol,
+                    "payload_types": [int(pt) for pt in payload_types],
+                    "rtpmap": {},
+                    "fmtp": {},
+                    "bandwidths": [],
+                    "attributes": [],
+                }
+                media.append(current)
+            case "a" if current is not session and value.startswith(("rtpmap:", "fmtp:")):
+                name, rest = value.split(":", 1)
+                payload_type, parameters = rest.split(" ", 1)
+                current[name][int(payload_type)] = parameters
+            case "a":
+                current["attributes"].append(value)
+
+    if "address" not in session:
+        raise ValueError("SDP without o= line")
+
+    descriptions = []
+    for m in media:
+        codecs = []
+        for payload_type in m["payload_types"]:
+            if rtpmap := m["rtpmap"].get(payload_type):
+                codec = Codec.parse(payload_type, rtpmap, fmtp=m["fmtp"].get(payload_type))
+            elif payload_type in STATIC_PAYLOAD_TYPES:
+                codec = Codec.static(payload_type)
+            else:
+                continue
+            codecs.append(codec)
+        descriptions.append(
+            MediaDescription(
+                port=m["port"],
+                codecs=tuple(codecs),
+                media=m["media"],
+                protocol=m["protocol"],
+                connection=m.get("connection"),
+                bandwidths=tuple(m["bandwidths"]),
+                attributes=tuple(m["attributes"]),
+            )
+        )
+    return SessionDescription(
+        address=session["address"],
+        session_id=session["session_id"],
+        session_version=session["session_version"],
+        username=session["username"],
+        session_name=session.get("session_name", "-"),
+        connection=session.get("connection"),
+        bandwidths=tuple(session["bandwidths"]),
+        attributes=tuple(session["attributes"]),
+        media=tuple(descriptions),
+    )
@@ -44,11 +44,20 @@ class Transaction:
 @dataclass
 class Dialog:
     transactions: list[Transaction] = field(default_factory=list)
+    target: str = "100"
+    # wall clock times and final INVITE status, for call detail records
+    invite_time: float | None = None
+    answer_time: float | None = None
+    end_time: float | None = None
+    status: int | None = None
+
+    @property
+    def call_id(self) -> str | None:
+        return self.transactions[0].call_id if self.transactions else None
 
 
 @dataclass
-class MultiMediaSession:
-    ...
+class MultiMediaSession: ...
 
 
 @dataclass
@@ -58,15 +67,44 @@ class Context:
     password: str
     register_transaction: Transaction = None
     dialogs: list[Dialog] = field(default_factory=list)
+    # the same dialogs by Call-ID
+    calls: dict[str, Dialog] = field(default_factory=dict)
 
-    def add_request(self, request: RequestMessage) -> None:
+    def add_dialog(self, dialog: Dialog) -> None:
+        self.dialogs.append(dialog)
+        self.calls[dialog.call_id] = dialog
+
+    def remove_dialog(self, dialog: Dialog) -> None:
+        """Forgets a finished dialog; later messages in its Call-ID are unknown."""
+        self.dialogs.remove(dialog)
+        if self.calls.get(dialog.call_id) is dialog:
+            del self.calls[dialog.call_id]
+
+    def add_request(self, request: RequestMessage, dialog: Dialog | None = None) -> None:
         if request.start_line.method == ClientMethod.REGISTER:
             self.register_transaction.add_request(request)
+        elif request.start_line.method == ClientMethod.OPTIONS:
+            # keepalives are fire and forget
+            pass
         else:
-            self.dialogs[-1].transactions[-1].add_request(request)
+            dialog = dialog or self.calls[request.headers["Call-ID"].call_id]
+            dialog.transactions[-1].add_request(request)
 
-    def add_response(self, response: ResponseMessage) -> None:
+    def add_response(
+        self, response: ResponseMessage, dialog: Dialog | None = None
+    ) -> Dialog | None:
+        """Records a response in its dialog, found by Call-ID unless given, and returns it.
+
+        Other dialogs may be handled concurrently, so the latest dialog is never assumed.
+        Returns None for REGISTER and OPTIONS responses and for unknown Call-IDs.
+        """
         if response.method == ClientMethod.REGISTER:
             self.register_transaction.response_messages.append(response)
+        elif response.method == ClientMethod.OPTIONS:
+            pass
         else:
-            self.dialogs[-1].transactions[-1].add_response(response)
+            dialog = dialog or self.calls.get(response.headers["Call-ID"].call_id)
+            if dialog is not None:
+                dialog.transactions[-1].add_response(response)
+            return dialog
+        return None
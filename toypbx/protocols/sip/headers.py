@@ -1,13 +1,13 @@
-import uuid
 from dataclasses import dataclass, field
 from hashlib import md5
-from random import randint
 from typing import Self
 
+from . import ids
 from .methods import ClientMethod
 
 __all__ = [
     "Authorization",
+    "COMPACT_NAMES",
     "CSeq",
     "CallID",
     "Contact",
@@ -18,12 +18,33 @@ __all__ = [
     "Header",
     "Headers",
     "HeaderFactory",
+    "MULTI_VALUE_HEADERS",
     "MaxForward",
     "To",
     "Via",
     "WWWAuthenticate",
+    "long_name",
+    "split_values",
 ]
 
+# RFC 3261 7.3.3 compact forms
+COMPACT_NAMES = {
+    "Call-ID": "i",
+    "Contact": "m",
+    "Content-Encoding": "e",
+    "Content-Length": "l",
+    "Content-Type": "c",
+    "From": "f",
+    "Subject": "s",
+    "Supported": "k",
+    "To": "t",
+    "Via": "v",
+}
+LONG_NAMES = {compact: name for name, compact in COMPACT_NAMES.items()}
+
+# headers whose comma separated values are split into one Header each (RFC 3261 7.3.1)
+MULTI_VALUE_HEADERS = frozenset(["via", "contact", "route", "record-route"])
+
 
 class Header:
     name: str
@@ -34,8 +55,18 @@ class Header:
 
 
 class Headers(dict[str, Header]):
-    def __init__(self, *args, **kwargs) -> None:
+    """Maps a header name to its first value; repeated headers keep every value in order.
+
+    Indexing returns the first value as before. ``add`` appends another value under the
+    same name and ``get_all``/``last`` reach the rest without re-parsing. Every ``dict``
+    mutator is overridden so the first values and the full lists never disagree.
+    """
+
+    def __init__(self, *headers: Header, **kwargs) -> None:
         super().__init__()
+        self._values: dict[str, list[Header]] = {}
+        for header in headers:
+            self.add(header)
         for key, value in kwargs.items():
             if isinstance(value, Header):
                 self[value.name] = value
@@ -43,6 +74,117 @@ class Headers(dict[str, Header]):
                 header = HeaderFactory(key, str(value).strip())
                 self[header.name] = header
 
+    def __setitem__(self, name: str, header: Header) -> None:
+        super().__setitem__(name, header)
+        self._values[name] = [header]
+
+    def __delitem__(self, name: str) -> None:
+        super().__delitem__(name)
+        del self._values[name]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Headers):
+            return self._values == other._values
+        return super().__eq__(other)
+
+    def __ne__(self, other) -> bool:
+        return not self == other
+
+    __hash__ = None
+
+    def __or__(self, other) -> "Headers":
+        if not isinstance(other, dict):
+            return NotImplemented
+        headers = self.copy()
+        headers.update(other)
+        return headers
+
+    def __ior__(self, other) -> "Headers":
+        self.update(other)
+        return self
+
+    def pop(self, name: str, *default):
+        self._values.pop(name, None)
+        return super().pop(name, *default)
+
+    def popitem(self) -> tuple[str, Header]:
+        name, header = super().popitem()
+        del self._values[name]
+        return name, header
+
+    def clear(self) -> None:
+        super().clear()
+        self._values.clear()
+
+    def setdefault(self, name: str, default: Header) -> Header:
+        if name not in self:
+            self[name] = default
+        return self[name]
+
+    def update(self, *args, **kwargs) -> None:
+        """Replaces each given name, taking every value of another ``Headers``."""
+        for other in (*args, kwargs):
+            if isinstance(other, Headers):
+                for name, values in other._values.items():
+                    dict.__setitem__(self, name, values[0])
+                    self._values[name] = list(values)
+                continue
+            for name, header in other.items() if hasattr(other, "keys") else other:
+                self[name] = header
+
+    def add(self, header: Header) -> None:
+        if header.name in self:
+            self._values[header.name].append(header)
+        else:
+            self[header.name] = header
+
+    def get_all(self, name: str) -> list[Header]:
+        return self._values.get(name, [])
+
+    def first(self, name: str) -> Header | None:
+        return self.get(name)
+
+    def last(self, name: str) -> Header | None:
+        values = self._values.get(name)
+        return values[-1] if values else None
+
+    def fields(self):
+        """Yields every value, repeated headers grouped under their first occurrence."""
+        for values in self._values.values():
+            yield from values
+
+    def copy(self) -> "Headers":
+        headers = Headers()
+        for name, values in self._values.items():
+            dict.__setitem__(headers, name, values[0])
+            headers._values[name] = list(values)
+        return headers
+
+
+def long_name(name: str) -> str:
+    return LONG_NAMES.get(name.lower(), name) if len(name) == 1 else name
+
+
+def split_values(raw: str) -> list[str]:
+    """Splits a header value on commas outside quotes and ``<...>``."""
+    values = []
+    start = 0
+    quoted = bracketed = False
+    for i, char in enumerate(raw):
+        if char == '"':
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif char == "<":
+            bracketed = True
+        elif char == ">":
+            bracketed = False
+        elif char == "," and not bracketed:
+            values.append(raw[start:i].strip())
+            start = i + 1
+    values.append(raw[start:].strip())
+    return [value for value in values if value]
+
 
 @dataclass(frozen=True)
 class MaxForward(Header):
@@ -75,7 +217,7 @@ class ContentLength(Header):
 @dataclass(frozen=True)
 class From(Header):
     from_: str
-    tag: str = field(default_factory=lambda: str(uuid.uuid4()))
+    tag: str = field(default_factory=ids.gen_tag)
     display_name: str | None = None
     name: str = "From"
     lower_name: str = "from"
@@ -102,7 +244,7 @@ class From(Header):
 
     @classmethod
     def gen_tag(cls) -> str:
-        return str(uuid.uuid4())
+        return ids.gen_tag()
 
 
 @dataclass(frozen=True)
@@ -145,14 +287,19 @@ class To(Header):
 class Contact(Header):
     contact: str
     display_name: str | None = None
+    expires: int | None = None
     name: str = "Contact"
     lower_name: str = "contact"
 
     def __str__(self) -> str:
         if self.display_name:
-            return f'"{self.display_name}" <{self.contact}>'
+            v = f'"{self.display_name}" <{self.contact}>'
+        else:
+            v = f"<{self.contact}>"
+        if self.expires is not None:
+            return f"{v};expires={self.expires}"
         else:
-            return f"<{self.contact}>"
+            return v
 
     @classmethod
     def parse(cls, raw, name: str | None = None) -> Self:
@@ -161,16 +308,23 @@ class Contact(Header):
             display_name = raw_display_name.replace("'", "").replace('"', "")
         else:
             display_name = None
-        value = raw
+        value, _, params = raw.rpartition(">")
+        if not value:
+            value, params = raw, ""
+        expires = None
+        for p in params.split(";"):
+            if p.strip().startswith("expires="):
+                expires = int(p.split("=", 1)[1])
         return cls(
             display_name=display_name,
             contact=value.replace("<", "").replace(">", ""),
+            expires=expires,
         )
 
 
 @dataclass(frozen=True)
 class CallID(Header):
-    call_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    call_id: str = field(default_factory=ids.gen_call_id)
     name: str = "Call-ID"
     lower_name: str = "call_id"
 
@@ -183,13 +337,13 @@ class CallID(Header):
 
     @classmethod
     def gen_call_id(cls) -> str:
-        return str(uuid.uuid4())
+        return ids.gen_call_id()
 
 
 @dataclass(frozen=True)
 class CSeq(Header):
     method: ClientMethod
-    c_seq: int = field(default_factory=lambda: randint(1, 2 ^ 31 - 1))
+    c_seq: int = field(default_factory=ids.gen_c_seq)
     name: str = "CSeq"
     lower_name: str = "cseq"
 
@@ -209,13 +363,13 @@ class CSeq(Header):
 
     @classmethod
     def gen_c_seq(cls) -> int:
-        return randint(1, 2 ^ 31 - 1)
+        return ids.gen_c_seq()
 
 
 @dataclass(frozen=True)
 class Via(Header):
     via: str
-    branch: str = field(default_factory=lambda: "z9hG4bK" + uuid.uuid4().hex)
+    branch: str = field(default_factory=ids.gen_branch)
     rport: str | None = None
     name: str = "Via"
     lower_name: str = "via"
@@ -242,7 +396,7 @@ class Via(Header):
 
     @classmethod
     def gen_branch(cls) -> str:
-        return "z9hG4bK" + uuid.uuid4().hex
+        return ids.gen_branch()
 
 
 @dataclass(frozen=True)
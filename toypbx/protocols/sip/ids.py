@@ -0,0 +1,73 @@
+import base64
+import os
+import threading
+
+POOL_SIZE = 48 * 1024
+# RFC 3261 requires CSeq to be less than 2**31; initial values stay in the lower half so
+# a dialog can keep incrementing
+MAX_C_SEQ = 2**30
+
+
+class IDGenerator:
+    """Tags, branches and Call-IDs drawn from a batched ``os.urandom`` pool.
+
+    One ``os.urandom`` call is base64url-encoded up front (``-`` and ``_`` are both valid
+    in SIP tokens), so each identifier is a slice of a pre-encoded string carrying six
+    random bits per character. A forked child must not hand out its parent's pooled
+    identifiers, so the module generator is reset after every fork.
+    """
+
+    def __init__(self, pool_size: int = POOL_SIZE) -> None:
+        self.pool_size = pool_size
+        self.reset()
+
+    def reset(self) -> None:
+        """Discards the pools (and a lock another thread may have held at fork time)."""
+        self._lock = threading.Lock()
+        self._chars = ""
+        self._char_pos = 0
+        self._bytes = b""
+        self._byte_pos = 0
+
+    def token(self, length: int = 16) -> str:
+        with self._lock:
+            start = self._char_pos
+            end = start + length
+            if end > len(self._chars):
+                self._chars = base64.urlsafe_b64encode(os.urandom(self.pool_size)).decode()
+                start, end = 0, length
+            self._char_pos = end
+            return self._chars[start:end]
+
+    def integer(self, nbytes: int = 4) -> int:
+        with self._lock:
+            start = self._byte_pos
+            end = start + nbytes
+            if end > len(self._bytes):
+                self._bytes = os.urandom(self.pool_size)
+                start, end = 0, nbytes
+            self._byte_pos = end
+            return int.from_bytes(self._bytes[start:end])
+
+    def tag(self) -> str:
+        # 96 bits
+        return self.token(16)
+
+    def branch(self) -> str:
+        return "z9hG4bK" + self.token(22)
+
+    def call_id(self) -> str:
+        # 132 bits
+        return self.token(22)
+
+    def c_seq(self) -> int:
+        return self.integer(4) % MAX_C_SEQ + 1
+
+
+generator = IDGenerator()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=generator.reset)
+gen_tag = generator.tag
+gen_branch = generator.branch
+gen_call_id = generator.call_id
+gen_c_seq = generator.c_seq
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Self, cast
 
+from ..sdp.session import SessionDescription
 from .headers import *
 from .methods import ClientMethod
 
@@ -22,6 +23,16 @@ class ResponseStartLine:
     reason_phrase: str
 
 
+# RFC 3261 18.1.1: above this a request should go over a congestion controlled transport
+MTU = 1300
+# headers a request may leave out when it has to shrink
+OPTIONAL_HEADERS = frozenset(["Allow", "User-Agent", "Supported"])
+
+
+def _content_length(body: list[str]) -> int:
+    return len("\n".join(body).encode("utf-8"))
+
+
 @dataclass()
 class ResponseMessage:
     start_line: ResponseStartLine
@@ -33,13 +44,19 @@ class ResponseMessage:
         headers = Headers()
         lines = raw_message.splitlines()
         sip_version, status_code, reason_phrase = lines[0].split(" ", 2)
-        for line in lines[1:]:
+        body = []
+        for i, line in enumerate(lines[1:], start=2):
             if not line:
+                body = lines[i:]
                 break
 
             key, value = line.split(":", 1)
-            header = HeaderFactory(key, value.strip())
-            headers[header.name] = header
+            key = long_name(key.strip())
+            if key.lower() in MULTI_VALUE_HEADERS:
+                for raw in split_values(value):
+                    headers.add(HeaderFactory(key, raw))
+            else:
+                headers.add(HeaderFactory(key, value.strip()))
 
         return ResponseMessage(
             start_line=ResponseStartLine(
@@ -48,7 +65,7 @@ class ResponseMessage:
                 reason_phrase=reason_phrase,
             ),
             headers=headers,
-            body=[],
+            body=body,
         )
 
     @property
@@ -58,6 +75,12 @@ class ResponseMessage:
         except KeyError:
             return None
 
+    @property
+    def sdp(self) -> SessionDescription | None:
+        if not self.body:
+            return None
+        return SessionDescription.parse("\n".join(self.body))
+
 
 @dataclass()
 class RequestMessage:
@@ -65,22 +88,43 @@ class RequestMessage:
     headers: Headers
     body: list[str]
 
-    def to_message(self) -> str:
+    def to_message(self, compact: bool = False) -> str:
+        """With ``compact``, uses short header names, leaves out optional headers and
+        trims the SDP body."""
         lines = [
             f"{self.start_line.method} {self.start_line.request_uri} {self.start_line.sip_version}"
         ]
-        for value in self.headers.values():
-            lines.append(f"{value.name}: {value}")
+        body = self.body
+        if not compact:
+            for value in self.headers.fields():
+                lines.append(f"{value.name}: {value}")
+        else:
+            content_type = self.headers.get("Content-Type")
+            if body and content_type and str(content_type) == "application/sdp":
+                body = SessionDescription.parse("\n".join(body)).to_lines(compact=True)
+            for value in self.headers.fields():
+                if value.name in OPTIONAL_HEADERS:
+                    continue
+                if value.name == ContentLength.name:
+                    value = ContentLength(content_length=_content_length(body))
+                lines.append(f"{COMPACT_NAMES.get(value.name, value.name)}:{value}")
 
         lines.append("")
-        for body_line in self.body:
+        for body_line in body:
             lines.append(body_line)
         return "\n".join(lines)
 
+    def to_datagram(self, mtu: int = MTU) -> str:
+        """The full message, or its compact form when the full one is larger than ``mtu``."""
+        message = self.to_message()
+        if len(message.encode("utf-8")) > mtu:
+            return self.to_message(compact=True)
+        return message
+
     def digest(self, username: str, password: str, response: ResponseMessage) -> Self | None:
         www_authenticate = cast(WWWAuthenticate, response.headers.pop(WWWAuthenticate.name))
 
-        headers = Headers(**self.headers)
+        headers = self.headers.copy()
         headers[CSeq.name] = cast(CSeq, headers[CSeq.name]).next()
         headers[Authorization.name] = Authorization(
             username=username,
@@ -94,7 +138,7 @@ class RequestMessage:
             qop=www_authenticate.qop,
             nc=1,
         )
-        req = RequestMessage(start_line=self.start_line, headers=headers, body=[])
+        req = RequestMessage(start_line=self.start_line, headers=headers, body=self.body)
         return req
 
 
@@ -173,7 +217,11 @@ class InviteMessage(RequestMessage):
         domain: str,
         username: str,
         transaction: "Transaction",
+        sdp: SessionDescription | None = None,
     ) -> Self:
+        if sdp is None:
+            sdp = SessionDescription.offer(address="192.168.0.137", port=4000)
+        body = sdp.to_lines()
         call_id = CallID(transaction.call_id)
         c_seq = CSeq(method=ClientMethod.INVITE, c_seq=transaction.next_local_c_seq)
         from_ = From(
@@ -202,33 +250,12 @@ class InviteMessage(RequestMessage):
                     display_name=username,
                     contact=f"sip:{username}@192.168.0.137:60956;ob",
                 ),
-                Content_Length=ContentLength(content_length=479),
+                Content_Type=General(value="application/sdp", name="Content-Type"),
+                Content_Length=ContentLength(content_length=_content_length(body)),
                 Via=via,
                 Allow="PRACK, INVITE, ACK, BYE, CANCEL, UPDATE, INFO, SUBSCRIBE, NOTIFY, REFER, MESSAGE, OPTIONS",
             ),
-            body=[
-                "v=0",
-                "o=- 3910726507 3910726507 IN IP4 192.168.0.137",
-                "s=pjmedia",
-                "b=AS:117",
-                "t=0 0",
-                "a=X-nat:0",
-                "m=audio 4000 RTP/AVP 96 9 8 0 101 102",
-                "c=IN IP4 192.168.0.137",
-                "b=TIAS:96000",
-                "a=rtcp:4001 IN IP4 192.168.0.137",
-                "a=sendrecv",
-                "a=rtpmap:96 opus/48000/2",
-                "a=fmtp:96 useinbandfec=1",
-                "a=rtpmap:9 G722/8000",
-                "a=rtpmap:8 PCMA/8000",
-                "a=rtpmap:0 PCMU/8000",
-                "a=rtpmap:101 telephone-event/48000",
-                "a=fmtp:101 0-16",
-                "a=rtpmap:102 telephone-event/8000",
-                "a=fmtp:102 0-16",
-                "a=ssrc:402436570 cname:7791e39e0af6d766",
-            ],
+            body=body,
         )
         return request
 
@@ -315,3 +342,81 @@ class ByeMessage(RequestMessage):
             body=[],
         )
         return request
+
+
+@dataclass()
+class CancelMessage(RequestMessage):
+    @classmethod
+    def create(
+        cls,
+        target: str,
+        domain: str,
+        username: str,
+        transaction: "Transaction",
+    ) -> Self:
+        # same branch, CSeq number and To (without a tag) as the INVITE (RFC 3261 9.1)
+        call_id = CallID(transaction.call_id)
+        c_seq = CSeq(method=ClientMethod.CANCEL, c_seq=transaction.local_c_seq)
+        from_ = From(
+            display_name=username,
+            from_=f"sip:{username}@{domain}",
+            tag=transaction.local_tag,
+        )
+        to = To(to=f"sip:{target}@{domain}")
+        via = Via("SIP/2.0/UDP 192.168.0.137:60956", branch=transaction.branch)
+
+        request = cls(
+            start_line=RequestStartLine(
+                method=ClientMethod.CANCEL,
+                request_uri=f"sip:{target}@{domain}",
+            ),
+            headers=Headers(
+                Max_Forwards=MaxForward(max_forward=70),
+                From=from_,
+                To=to,
+                Call_ID=call_id,
+                CSeq=c_seq,
+                Content_Length=ContentLength(content_length=0),
+                Via=via,
+            ),
+            body=[],
+        )
+        return request
+
+
+@dataclass()
+class OptionsMessage(RequestMessage):
+    @classmethod
+    def create(
+        cls,
+        domain: str,
+        username: str,
+        transaction: "Transaction",
+    ) -> Self:
+        call_id = CallID(transaction.call_id)
+        c_seq = CSeq(method=ClientMethod.OPTIONS, c_seq=transaction.next_local_c_seq)
+        from_ = From(
+            display_name=username,
+            from_=f"sip:{username}@{domain}",
+            tag=transaction.local_tag,
+        )
+        to = To(to=f"sip:{domain}")
+        via = Via("SIP/2.0/UDP 192.168.0.137:60956", branch=transaction.branch)
+
+        request = cls(
+            start_line=RequestStartLine(
+                method=ClientMethod.OPTIONS,
+                request_uri=f"sip:{domain}",
+            ),
+            headers=Headers(
+                Max_Forwards=MaxForward(max_forward=70),
+                From=from_,
+                To=to,
+                Call_ID=call_id,
+                CSeq=c_seq,
+                Content_Length=ContentLength(content_length=0),
+                Via=via,
+            ),
+            body=[],
+        )
+        return request
@@ -0,0 +1,149 @@
+from collections import Counter
+from collections.abc import Callable
+from typing import NamedTuple
+
+VIA_NAMES = (b"\nvia:", b"\nv:")
+CALL_ID_NAMES = (b"\ncall-id:", b"\ni:")
+CSEQ_NAMES = (b"\ncseq:",)
+SIP_VERSION = b"SIP/2.0"
+
+
+class Scan(NamedTuple):
+    """What the receive path needs to know about a datagram before parsing it."""
+
+    status_code: int | None
+    method: bytes | None
+    call_id: bytes
+    c_seq: int
+    c_seq_method: bytes
+    branch: bytes
+
+    @property
+    def is_response(self) -> bool:
+        return self.status_code is not None
+
+
+def find_header(head: bytes, patterns: tuple[bytes, ...]) -> tuple[int, int, int] | None:
+    """Locates the first header matching ``patterns`` (``b"\\nname:"``) in a lowercased block.
+
+    Returns ``(line_start, value_start, line_end)`` where ``line_end`` excludes the line
+    break. ``head`` must start at the line break that ends the start line.
+    """
+    start = -1
+    for pattern in patterns:
+        found = head.find(pattern)
+        if found >= 0 and (start < 0 or found < start):
+            start, length = found, len(pattern)
+    if start < 0:
+        return None
+    end = head.find(b"\n", start + 1)
+    if end < 0:
+        end = len(head)
+    if head[end - 1] == 13:  # \r
+        end -= 1
+    return start + 1, start + length, end
+
+
+def head_end(data: bytes) -> int:
+    """Index of the line break ending the last header line (or the end of ``data``)."""
+    crlf = data.find(b"\n\r\n")
+    lf = data.find(b"\n\n")
+    if crlf < 0:
+        return lf if lf >= 0 else len(data)
+    return crlf if lf < 0 else min(crlf, lf)
+
+
+def is_keepalive(data: bytes) -> bool:
+    """RFC 5626 3.5.1 keepalives are bare CRLFs."""
+    return not data.strip(b"\r\n")
+
+
+def scan(data: bytes) -> Scan | None:
+    """Validates the start line and pulls out Call-ID, CSeq and the top Via branch.
+
+    Only a handful of byte searches, no decoding; returns None for anything that is
+    not a well-formed SIP message, so junk never reaches the full parser.
+    """
+    line_end = data.find(b"\n")
+    if line_end < 0:
+        return None
+    start_line = data[:line_end].rstrip(b"\r")
+    status_code = method = None
+    if start_line.startswith(b"SIP/2.0 "):
+        code = start_line[8:11]
+        if not (code.isdigit() and start_line[11:12] in (b" ", b"")):
+            return None
+        status_code = int(code)
+        if not 100 <= status_code < 700:
+            return None
+    else:
+        parts = start_line.split(b" ")
+        if (
+            len(parts) != 3
+            or parts[2] != SIP_VERSION
+            or not (parts[0].isalpha() and parts[0].isupper())
+        ):
+            return None
+        method = parts[0]
+
+    head = data[line_end : head_end(data)].lower()
+    call_id = find_header(head, CALL_ID_NAMES)
+    c_seq = find_header(head, CSEQ_NAMES)
+    via = find_header(head, VIA_NAMES)
+    if call_id is None or c_seq is None or via is None:
+        return None
+    call_id_value = data[line_end + call_id[1] : line_end + call_id[2]].strip()
+    number, _, c_seq_method = (
+        data[line_end + c_seq[1] : line_end + c_seq[2]].strip().partition(b" ")
+    )
+    if not call_id_value or not number.isdigit() or not c_seq_method:
+        return None
+
+    branch = b""
+    param = head.find(b";branch=", via[1], via[2])
+    if param >= 0:
+        start = param + len(b";branch=")
+        end = start
+        while end < via[2] and head[end] not in b";, \t":
+            end += 1
+        branch = data[line_end + start : line_end + end]
+    return Scan(
+        status_code=status_code,
+        method=method,
+        call_id=call_id_value,
+        c_seq=int(number),
+        c_seq_method=c_seq_method.strip(),
+        branch=branch,
+    )
+
+
+class Scanner:
+    """First stage of the receive path: counts and drops what should not be parsed.
+
+    ``accept`` returns the scan of a datagram worth parsing, or None after counting
+    why it was dropped: ``malformed``, ``request`` (with ``accept_requests`` off) or
+    ``unknown_dialog`` (responses whose Call-ID ``is_known`` rejects).
+    """
+
+    def __init__(
+        self, is_known: Callable[[bytes], bool] | None = None, accept_requests: bool = False
+    ) -> None:
+        self.is_known = is_known
+        self.accept_requests = accept_requests
+        self.accepted = 0
+        self.dropped: Counter = Counter()
+
+    def accept(self, data: bytes) -> Scan | None:
+        result = scan(data)
+        if result is None:
+            self.dropped["malformed"] += 1
+            return None
+        if not result.is_response:
+            if not self.accept_requests:
+                self.dropped["request"] += 1
+                return None
+        elif self.is_known and not self.is_known(result.call_id):
+            self.dropped["unknown_dialog"] += 1
+            return None
+        self.accepted += 1
+        return result
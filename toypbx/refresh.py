@@ -0,0 +1,167 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections.abc import Callable
+from typing import Protocol
+
+from toypbx.protocols.sip.message import RequestMessage, ResponseMessage
+
+RETRY_INTERVAL = 10.0
+
+
+class Refreshable(Protocol):
+    def refresh(self) -> None: ...
+
+
+def granted_expires(response: ResponseMessage, request: RequestMessage | None = None) -> int:
+    """Expiry the registrar granted in a 200 to REGISTER (RFC 3261 10.2.4).
+
+    The ``expires`` parameter of our own Contact wins, then the Expires header, then
+    whatever the request asked for.
+    """
+    contact = expires = None
+    if request is not None:
+        if "Contact" in request.headers:
+            contact = request.headers["Contact"].contact
+        if "Expires" in request.headers:
+            expires = request.headers["Expires"].expires
+    for binding in response.headers.get_all("Contact"):
+        if binding.expires is not None and binding.contact == contact:
+            return binding.expires
+    if "Expires" in response.headers:
+        return response.headers["Expires"].expires
+    if expires is None:
+        raise ValueError("no expiry in response or request")
+    return expires
+
+
+class RefreshScheduler:
+    """Re-REGISTERs any number of clients from one thread.
+
+    Each registration is refreshed at a random fraction of its granted expiry, between
+    ``min_fraction`` and ``max_fraction``, so accounts registered together drift apart
+    instead of refreshing in bursts. A refreshed client is retried after
+    ``retry_interval`` unless its 200 reschedules it first, which is also how a refresh
+    that raised is retried.
+    """
+
+    def __init__(
+        self,
+        min_fraction: float = 0.5,
+        max_fraction: float = 0.85,
+        margin: float = 2.0,
+        retry_interval: float = RETRY_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+        rng: random.Random | None = None,
+    ) -> None:
+        if not 0 < min_fraction <= max_fraction < 1:
+            raise ValueError("fractions must satisfy 0 < min_fraction <= max_fraction < 1")
+        self.min_fraction = min_fraction
+        self.max_fraction = max_fraction
+        self.margin = margin
+        self.retry_interval = retry_interval
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.refreshed = 0
+        self.failures = 0
+        self._heap: list[tuple[float, int, Refreshable]] = []
+        self._entries: dict[Refreshable, int] = {}
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._running = False
+
+    def __enter__(self) -> "RefreshScheduler":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def delay(self, expires: float) -> float:
+        delay = expires * self.rng.uniform(self.min_fraction, self.max_fraction)
+        if expires - self.margin > 0:
+            delay = min(delay, expires - self.margin)
+        return delay
+
+    def schedule(self, client: Refreshable, expires: float, now: float | None = None) -> float:
+        """Plans the next refresh of ``client`` and returns when it is due."""
+        due = (self.clock() if now is None else now) + self.delay(expires)
+        self._push(client, due)
+        return due
+
+    def cancel(self, client: Refreshable) -> None:
+        with self._condition:
+            # the heap entry is skipped when popped
+            self._entries.pop(client, None)
+
+    def next_due(self) -> float | None:
+        with self._condition:
+            self._discard_cancelled()
+            return self._heap[0][0] if self._heap else None
+
+    def run_pending(self, now: float | None = None) -> int:
+        """Refreshes every client that is due and returns how many were refreshed."""
+        if now is None:
+            now = self.clock()
+        due = []
+        with self._condition:
+            self._discard_cancelled()
+            while self._heap and self._heap[0][0] <= now:
+                _, _, client = heapq.heappop(self._heap)
+                del self._entries[client]
+                due.append(client)
+                self._discard_cancelled()
+        for client in due:
+            self._push(client, now + self.retry_interval)
+            try:
+                client.refresh()
+            except Exception as e:
+                # the thread serves every registration; this one is retried
+                self.failures += 1
+                print(f"REFRESH FAILURE: {type(e).__name__}: {e}")
+        self.refreshed += len(due)
+        return len(due)
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            with self._condition:
+                self._running = False
+                self._condition.notify()
+            self._thread.join()
+            self._thread = None
+
+    def _push(self, client: Refreshable, due: float) -> None:
+        with self._condition:
+            sequence = next(self._counter)
+            self._entries[client] = sequence
+            heapq.heappush(self._heap, (due, sequence, client))
+            if self._heap[0][1] == sequence:
+                self._condition.notify()
+
+    def _discard_cancelled(self) -> None:
+        while self._heap and self._entries.get(self._heap[0][2]) != self._heap[0][1]:
+            heapq.heappop(self._heap)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if not self._running:
+                    return
+                self._discard_cancelled()
+                timeout = self._heap[0][0] - self.clock() if self._heap else None
+                if timeout is None or timeout > 0:
+                    self._condition.wait(timeout)
+                    continue
+            self.run_pending()
@@ -0,0 +1,236 @@
+import multiprocessing
+import struct
+import time
+import zlib
+from multiprocessing import shared_memory
+from multiprocessing.synchronize import Lock
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .store import BindingStore
+
+MAGIC = b"TPBXLOC1"
+HEADER = struct.Struct("<8sII")  # magic, capacity, slot size
+# seqlock counter, state, AOR length, Contact length, expiry (epoch seconds)
+SLOT_HEADER = struct.Struct("<IBBHd")
+SEQ = struct.Struct("<I")
+# the slot header after the counter
+SLOT_FIELDS = struct.Struct("<BBHd")
+# lock-free read attempts before a reader falls back to the writers' lock
+READ_SPINS = 1000
+LOCK_TIMEOUT = 1.0
+MAX_AOR = 64
+MAX_CONTACT = 176
+SLOT_SIZE = SLOT_HEADER.size + MAX_AOR + MAX_CONTACT
+CAPACITY = 65536
+
+EMPTY = 0
+USED = 1
+DELETED = 2
+
+
+class LocationTable:
+    """AOR to Contact bindings in shared memory, visible to every worker process.
+
+    A fixed-size open-addressing table with linear probing. Writers serialize on a
+    ``multiprocessing`` lock; readers take no lock and instead use a per-slot seqlock:
+    the counter is odd while a slot is being written, so a reader retries when it sees
+    an odd counter or the counter changed under it. The even counter is stored alone,
+    after everything else. A reader that keeps failing, e.g. because a writer died
+    mid-write, falls back to the lock. Expired bindings read as missing and their slots
+    are reused by later registrations.
+
+    With a ``store``, every change is also queued to it and ``load`` warms a fresh table
+    from the bindings that survived a restart.
+    """
+
+    def __init__(
+        self,
+        memory: shared_memory.SharedMemory,
+        lock: Lock,
+        owner: bool = False,
+        store: "BindingStore | None" = None,
+    ) -> None:
+        magic, capacity, slot_size = HEADER.unpack_from(memory.buf)
+        if magic != MAGIC or slot_size != SLOT_SIZE:
+            raise ValueError(f"{memory.name} is not a location table")
+        self.memory = memory
+        self.lock = lock
+        self.capacity = capacity
+        self.owner = owner
+        self.store = store
+        self._buf = memory.buf
+
+    @classmethod
+    def create(
+        cls,
+        name: str | None = None,
+        capacity: int = CAPACITY,
+        lock: Lock | None = None,
+        store: "BindingStore | None" = None,
+    ) -> "LocationTable":
+        memory = shared_memory.SharedMemory(
+            name=name, create=True, size=HEADER.size + capacity * SLOT_SIZE
+        )
+        HEADER.pack_into(memory.buf, 0, MAGIC, capacity, SLOT_SIZE)
+        return cls(memory, lock or multiprocessing.Lock(), owner=True, store=store)
+
+    @classmethod
+    def attach(cls, name: str, lock: Lock, store: "BindingStore | None" = None) -> "LocationTable":
+        return cls(shared_memory.SharedMemory(name=name), lock, store=store)
+
+    def __reduce__(self):
+        # workers re-attach by name; the lock is inherited when the process is started
+        # and each worker opens its own store
+        return self.attach, (self.name, self.lock)
+
+    def __enter__(self) -> "LocationTable":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+        if self.owner:
+            self.unlink()
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    def close(self) -> None:
+        self._buf = None
+        self.memory.close()
+
+    def unlink(self) -> None:
+        self.memory.unlink()
+
+    def register(self, aor: str, contact: str, expires: float, now: float | None = None) -> None:
+        """Binds ``contact`` to ``aor`` for ``expires`` seconds; 0 removes the binding."""
+        if expires <= 0:
+            self.remove(aor)
+            return
+        raw_aor = aor.encode("utf-8")
+        raw_contact = contact.encode("utf-8")
+        if len(raw_aor) > MAX_AOR or len(raw_contact) > MAX_CONTACT:
+            raise ValueError("AOR or Contact too long for a location slot")
+        now = time.time() if now is None else now
+        self._put(raw_aor, raw_contact, now + expires, now)
+        if self.store:
+            self.store.put(aor, contact, now + expires)
+
+    def load(self, now: float | None = None) -> int:
+        """Copies the live bindings of ``store`` into the table; returns how many."""
+        now = time.time() if now is None else now
+        count = 0
+        for aor, contact, expires_at in self.store.load(now):
+            self._put(aor.encode("utf-8"), contact.encode("utf-8"), expires_at, now)
+            count += 1
+        return count
+
+    def _put(self, raw_aor: bytes, raw_contact: bytes, expires_at: float, now: float) -> None:
+        with self.lock:
+            free = None
+            for offset in self._probe(raw_aor):
+                _, state, aor_length, _, slot_expires_at = SLOT_HEADER.unpack_from(
+                    self._buf, offset
+                )
+                if state == EMPTY:
+                    if free is None:
+                        free = offset
+                    break
+                start = offset + SLOT_HEADER.size
+                if state == USED and self._buf[start : start + aor_length] == raw_aor:
+                    free = offset
+                    break
+                if free is None and (state == DELETED or slot_expires_at <= now):
+                    free = offset
+            if free is None:
+                raise ValueError("location table full")
+            self._write(free, USED, raw_aor, raw_contact, expires_at)
+
+    def remove(self, aor: str) -> bool:
+        raw_aor = aor.encode("utf-8")
+        if self.store:
+            self.store.remove(aor)
+        with self.lock:
+            for offset in self._probe(raw_aor):
+                _, state, aor_length, _, _ = SLOT_HEADER.unpack_from(self._buf, offset)
+                if state == EMPTY:
+                    return False
+                start = offset + SLOT_HEADER.size
+                if state == USED and self._buf[start : start + aor_length] == raw_aor:
+                    self._write(offset, DELETED, b"", b"", 0.0)
+                    return True
+        return False
+
+    def lookup(self, aor: str, now: float | None = None) -> str | None:
+        """Returns the live Contact bound to ``aor`` without taking the lock."""
+        raw_aor = aor.encode("utf-8")
+        now = time.time() if now is None else now
+        for offset in self._probe(raw_aor):
+            state, found, contact, expires_at = self._read(offset, raw_aor)
+            if state == EMPTY:
+                return None
+            if found:
+                return contact.decode("utf-8") if expires_at > now else None
+        return None
+
+    def __len__(self) -> int:
+        now = time.time()
+        count = 0
+        for index in range(self.capacity):
+            offset = HEADER.size + index * SLOT_SIZE
+            _, state, _, _, expires_at = SLOT_HEADER.unpack_from(self._buf, offset)
+            count += state == USED and expires_at > now
+        return count
+
+    def _probe(self, raw_aor: bytes):
+        index = zlib.crc32(raw_aor) % self.capacity
+        for _ in range(self.capacity):
+            yield HEADER.size + index * SLOT_SIZE
+            index = index + 1 if index + 1 < self.capacity else 0
+
+    def _read(self, offset: int, raw_aor: bytes) -> tuple[int, bool, bytes, float]:
+        buf = self._buf
+        for _ in range(READ_SPINS):
+            (seq,) = SEQ.unpack_from(buf, offset)
+            if seq & 1:
+                time.sleep(0)
+                continue
+            slot = self._slot(offset, raw_aor)
+            if SEQ.unpack_from(buf, offset)[0] == seq:
+                return slot
+        if not self.lock.acquire(timeout=LOCK_TIMEOUT):
+            raise TimeoutError("location table writer is stuck")
+        try:
+            if SEQ.unpack_from(buf, offset)[0] & 1:
+                # left torn by a writer that died mid-write
+                return DELETED, False, b"", 0.0
+            return self._slot(offset, raw_aor)
+        finally:
+            self.lock.release()
+
+    def _slot(self, offset: int, raw_aor: bytes) -> tuple[int, bool, bytes, float]:
+        buf = self._buf
+        state, aor_length, contact_length, expires_at = SLOT_FIELDS.unpack_from(
+            buf, offset + SEQ.size
+        )
+        start = offset + SLOT_HEADER.size
+        found = state == USED and buf[start : start + aor_length] == raw_aor
+        contact = bytes(buf[start + MAX_AOR : start + MAX_AOR + contact_length]) if found else b""
+        return state, found, contact, expires_at
+
+    def _write(
+        self, offset: int, state: int, raw_aor: bytes, raw_contact: bytes, expires_at: float
+    ) -> None:
+        buf = self._buf
+        # odd while writing, also over a slot a dead writer left odd
+        seq = (SEQ.unpack_from(buf, offset)[0] + 1) | 1
+        SEQ.pack_into(buf, offset, seq & 0xFFFFFFFF)
+        start = offset + SLOT_HEADER.size
+        buf[start : start + len(raw_aor)] = raw_aor
+        buf[start + MAX_AOR : start + MAX_AOR + len(raw_contact)] = raw_contact
+        SLOT_FIELDS.pack_into(
+            buf, offset + SEQ.size, state, len(raw_aor), len(raw_contact), expires_at
+        )
+        # the even counter publishes the slot, so it must be the last store
+        SEQ.pack_into(buf, offset, (seq + 1) & 0xFFFFFFFF)
@@ -0,0 +1,103 @@
+import re
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Callable
+
+from .proxy import Address, head_end
+
+MAX_SOURCES = 10000
+REPLY_HEADERS = re.compile(
+    rb"\n((?:via|v|from|f|to|t|call-id|i|cseq)[ \t]*:[^\r\n]*)", re.IGNORECASE
+)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float | None = None, now: float | None = None) -> None:
+        self.rate = rate
+        self.burst = burst if burst is not None else rate
+        self.tokens = self.burst
+        self.updated = time.monotonic() if now is None else now
+
+    def take(self, now: float, tokens: float = 1.0) -> bool:
+        self.tokens = min(self.burst, self.tokens + max(0.0, now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < tokens:
+            return False
+        self.tokens -= tokens
+        return True
+
+
+class OverloadControl:
+    """Decides per datagram whether to process it or shed it with a 503 (RFC 3261 21.5.4).
+
+    Requests pass a queue depth check, a per-source-IP token bucket and a global one; any
+    of them may be left out. The depth check sheds as soon as work piles up, even when
+    arrivals stay under the configured rates because each request got slower to handle;
+    ``queue_depth`` reports the backlog in whatever unit ``max_queue_depth`` uses (the
+    proxy feeds it the bytes waiting on its socket). Responses are always admitted: they
+    finish work already paid for. Rejections are built from a pre-serialized 503 template
+    by copying the five headers a response needs, without parsing the request.
+    """
+
+    def __init__(
+        self,
+        rate: float | None = None,
+        burst: float | None = None,
+        per_source_rate: float | None = None,
+        per_source_burst: float | None = None,
+        max_queue_depth: int | None = None,
+        queue_depth: Callable[[], int] | None = None,
+        retry_after: int = 5,
+        max_sources: int = MAX_SOURCES,
+    ) -> None:
+        self.bucket = TokenBucket(rate, burst) if rate is not None else None
+        self.per_source_rate = per_source_rate
+        self.per_source_burst = per_source_burst
+        self.max_queue_depth = max_queue_depth
+        self.queue_depth = queue_depth
+        self.max_sources = max_sources
+        self.sources: OrderedDict[str, TokenBucket] = OrderedDict()
+        self.admitted = 0
+        self.rejected: Counter = Counter()
+        self._start_line = b"SIP/2.0 503 Service Unavailable\r\n"
+        self._tail = b"Retry-After: %d\r\nContent-Length: 0\r\n\r\n" % retry_after
+
+    def admit(self, data: bytes, source: Address, now: float | None = None) -> bytes | None:
+        """Returns ``None`` to process ``data``, otherwise the 503 to send back.
+
+        ``b""`` means drop without answering, for ACKs and junk.
+        """
+        if data.startswith(b"SIP/2.0 "):
+            self.admitted += 1
+            return None
+        if now is None:
+            now = time.monotonic()
+
+        if self.max_queue_depth is not None and self.queue_depth is not None:
+            if self.queue_depth() >= self.max_queue_depth:
+                return self._reject(data, "queue")
+        if self.per_source_rate is not None and not self._source_bucket(source[0], now).take(now):
+            return self._reject(data, "source")
+        if self.bucket is not None and not self.bucket.take(now):
+            return self._reject(data, "global")
+        self.admitted += 1
+        return None
+
+    def _source_bucket(self, host: str, now: float) -> TokenBucket:
+        bucket = self.sources.get(host)
+        if bucket is None:
+            if len(self.sources) >= self.max_sources:
+                self.sources.popitem(last=False)
+            bucket = self.sources[host] = TokenBucket(
+                self.per_source_rate, self.per_source_burst, now=now
+            )
+        else:
+            self.sources.move_to_end(host)
+        return bucket
+
+    def _reject(self, data: bytes, reason: str) -> bytes:
+        self.rejected[reason] += 1
+        if data.startswith(b"ACK ") or data.find(b" SIP/2.0", 0, data.find(b"\n")) < 0:
+            return b""
+        headers = REPLY_HEADERS.findall(data, 0, head_end(data))
+        return b"".join((self._start_line, b"\r\n".join(headers), b"\r\n", self._tail))
@@ -0,0 +1,297 @@
+import fcntl
+import hashlib
+import socket
+import struct
+import sys
+import termios
+from array import array
+from collections.abc import Callable
+from functools import lru_cache
+from typing import TYPE_CHECKING, NamedTuple
+
+from toypbx.protocols.sip.scanner import VIA_NAMES, find_header, head_end
+
+if TYPE_CHECKING:
+    from .overload import OverloadControl
+
+BUF_SIZE = 65535
+SOCKET_TIMEOUT = 1
+MAX_FORWARDS = 70
+# Linux's SO_MEMINFO, not exported by the socket module; the first field is the
+# receive queue's allocated bytes
+SO_MEMINFO = getattr(socket, "SO_MEMINFO", 55)
+MEMINFO = struct.Struct("9I")
+MAX_FORWARDS_NAMES = (b"\nmax-forwards:",)
+REPLY_NAMES = (b"via", b"v", b"from", b"f", b"to", b"t", b"call-id", b"i", b"cseq")
+
+Address = tuple[str, int]
+
+
+class Forward(NamedTuple):
+    data: bytes
+    destination: Address
+
+
+def port_number(raw: bytes) -> int:
+    """A port from its digits, 5060 when empty; ValueError for anything but 1-65535."""
+    if not raw:
+        return 5060
+    if not raw.isdigit() or not 0 < int(raw) < 65536:
+        raise ValueError(f"bad port {raw!r}")
+    return int(raw)
+
+
+def receive_backlog(sock: socket.socket) -> int:
+    """Bytes waiting in a UDP socket's receive queue.
+
+    Linux's FIONREAD only reports the next datagram, so there the queue's memory use,
+    kernel overhead included, comes from SO_MEMINFO instead.
+    """
+    if sys.platform == "linux":
+        return MEMINFO.unpack(sock.getsockopt(socket.SOL_SOCKET, SO_MEMINFO, MEMINFO.size))[0]
+    pending = array("i", [0])
+    fcntl.ioctl(sock, termios.FIONREAD, pending)
+    return pending[0]
+
+
+@lru_cache(maxsize=4096)
+def uri_destination(request_uri: bytes) -> Address:
+    host = request_uri.split(b":", 1)[-1].split(b";", 1)[0].split(b"?", 1)[0]
+    host = host.rsplit(b"@", 1)[-1]
+    if host.startswith(b"["):
+        name, _, port = host[1:].partition(b"]:")
+        return name.rstrip(b"]").decode(), port_number(port)
+    name, _, port = host.partition(b":")
+    return name.decode(), port_number(port)
+
+
+def via_destination(value: bytes) -> Address | None:
+    """Where a response for this Via value goes (RFC 3261 18.2.2 and RFC 3581)."""
+    parts = value.split(b";")
+    try:
+        _, sent_by = parts[0].split(None, 1)
+    except ValueError:
+        return None
+    host, _, port = sent_by.strip().partition(b":")
+    try:
+        destination = [host.decode(), port_number(port)]
+        for param in parts[1:]:
+            key, _, raw = param.strip().partition(b"=")
+            if key == b"received" and raw:
+                destination[0] = raw.decode()
+            elif key == b"rport" and raw:
+                destination[1] = port_number(raw)
+    except ValueError:
+        return None
+    return destination[0], destination[1]
+
+
+def stamp_via(value: bytes, source: Address) -> bytes:
+    """A request's top Via value with where it really came from (RFC 3261 18.2.1, RFC 3581).
+
+    ``received`` is set when the source address differs from sent-by, or whenever the
+    client asked for ``rport``, which then gets the source port as its value.
+    """
+    host, port = source
+    parts = value.split(b";")
+    sent_by = parts[0].split(None, 1)[-1].strip()
+    if sent_by.startswith(b"["):
+        sent_by_host = sent_by[1:].partition(b"]")[0]
+    else:
+        sent_by_host = sent_by.partition(b":")[0]
+    params = [
+        param for param in parts[1:] if param.strip().partition(b"=")[0].lower() != b"received"
+    ]
+    keys = [param.strip().partition(b"=")[0].lower() for param in params]
+    received = b"received=" + host.encode()
+    if b"rport" in keys:
+        index = keys.index(b"rport")
+        params[index : index + 1] = [b"rport=%d" % port, received]
+    elif sent_by_host != host.encode():
+        params.append(received)
+    return b";".join([parts[0], *params])
+
+
+def splice(data: bytes, edits: list[tuple[int, int, bytes]]) -> bytes:
+    """``data`` with each ``(start, end, replacement)`` applied; equal starts keep list order."""
+    parts = []
+    position = 0
+    for start, end, replacement in sorted(edits, key=lambda edit: edit[0]):
+        parts.append(data[position:start])
+        parts.append(replacement)
+        position = end
+    parts.append(data[position:])
+    return b"".join(parts)
+
+
+def reply(data: bytes, status: int, reason: str, extra: bytes = b"") -> bytes:
+    """Builds a minimal stateless response echoing the dialog headers of a request."""
+    lines = [f"SIP/2.0 {status} {reason}".encode()]
+    for line in data.split(b"\n")[1:]:
+        line = line.rstrip(b"\r")
+        if not line:
+            break
+        name = line.split(b":", 1)[0].strip().lower()
+        if name in REPLY_NAMES:
+            lines.append(line)
+    if extra:
+        lines.append(extra)
+    lines.append(b"Content-Length: 0")
+    return b"\r\n".join(lines) + b"\r\n\r\n"
+
+
+class StatelessProxy:
+    """Forwards SIP over UDP touching only the top Via and Max-Forwards (RFC 3261 16.11).
+
+    Requests get our Via on top, ``received``/``rport`` stamped into the sender's Via and
+    Max-Forwards decremented; responses lose our Via and go to the address of the next
+    one. Everything else is spliced through as bytes.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 5060,
+        route: Callable[[bytes], Address] | None = None,
+        advertise: str | None = None,
+        overload: "OverloadControl | None" = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.route = route or uri_destination
+        self.sent_by = f"SIP/2.0/UDP {advertise or host}:{port}".encode()
+        self.overload = overload
+        self.forwarded = 0
+        self.dropped = 0
+        self.errors = 0
+        self.socket: socket.socket | None = None
+
+    def process(self, data: bytes, source: Address) -> Forward | None:
+        if self.overload and (rejection := self.overload.admit(data, source)) is not None:
+            self.dropped += 1
+            return Forward(rejection, source) if rejection else None
+        if data.startswith(b"SIP/2.0 "):
+            forward = self.forward_response(data)
+        else:
+            forward = self.forward_request(data, source)
+        if forward is None:
+            self.dropped += 1
+        else:
+            self.forwarded += 1
+        return forward
+
+    def forward_request(self, data: bytes, source: Address) -> Forward | None:
+        line_end = data.find(b"\n")
+        if line_end < 0:
+            return None
+        try:
+            method, request_uri, version = data[:line_end].rstrip(b"\r").split(b" ")
+        except ValueError:
+            return None
+        if version != b"SIP/2.0":
+            return None
+        eol = b"\r\n" if data[line_end - 1 : line_end] == b"\r" else b"\n"
+        head = data[line_end : head_end(data)].lower()
+
+        via = find_header(head, VIA_NAMES)
+        if via is None:
+            return None
+        value_start, value_end = line_end + via[1], line_end + via[2]
+        via_value = data[value_start:value_end]
+        top_via = via_value.strip()
+        branch = hashlib.blake2b(top_via + request_uri, digest_size=8).hexdigest()
+        new_via = self.sent_by + b";branch=z9hG4bK" + branch.encode() + b";rport"
+
+        max_forwards = find_header(head, MAX_FORWARDS_NAMES)
+        if max_forwards is None:
+            value, mf_start, mf_end = MAX_FORWARDS, line_end + 1, line_end + 1
+            mf_line = b"Max-Forwards: %d" % (MAX_FORWARDS - 1) + eol
+        else:
+            mf_start = line_end + max_forwards[1]
+            mf_end = line_end + max_forwards[2]
+            try:
+                value = int(data[mf_start:mf_end])
+            except ValueError:
+                return None
+            mf_line = b" %d" % (value - 1)
+        if value <= 0:
+            if method == b"ACK":
+                return None
+            return Forward(reply(data, 483, "Too Many Hops"), source)
+
+        try:
+            destination = self.route(request_uri)
+        except ValueError:
+            return None
+        # several Vias may be folded into one line; only the first is the sender's
+        first, comma, rest = via_value.partition(b",")
+        indent = first[: len(first) - len(first.lstrip())]
+        stamped = indent + stamp_via(first.strip(), source) + comma + rest
+        via_start = line_end + via[0]
+        # a missing Max-Forwards goes first, so it is listed before our Via
+        edits = [
+            (mf_start, mf_end, mf_line),
+            (via_start, via_start, b"Via: " + new_via + eol),
+            (value_start, value_end, stamped),
+        ]
+        return Forward(splice(data, edits), destination)
+
+    def forward_response(self, data: bytes) -> Forward | None:
+        line_end = data.find(b"\n")
+        if line_end < 0:
+            return None
+        head = data[line_end : head_end(data)].lower()
+
+        via = find_header(head, VIA_NAMES)
+        if via is None:
+            return None
+        line_start, value_start, value_end = (line_end + i for i in via)
+        value = data[value_start:value_end]
+        ours, comma, rest = value.partition(b",")
+        if not ours.strip().startswith(self.sent_by):
+            return None
+
+        if comma:
+            # several Vias folded into one line: drop only the first value
+            data = data[:value_start] + b" " + rest.lstrip() + data[value_end:]
+            next_via = rest
+        else:
+            next_line = data.find(b"\n", value_end) + 1
+            data = data[:line_start] + data[next_line:]
+            head = data[line_end : head_end(data)].lower()
+            via = find_header(head, VIA_NAMES)
+            if via is None:
+                return None
+            next_via = data[line_end + via[1] : line_end + via[2]]
+
+        destination = via_destination(next_via.split(b",", 1)[0].strip())
+        if destination is None:
+            return None
+        return Forward(data, destination)
+
+    def serve_forever(self) -> None:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            s.bind((self.host, self.port))
+            s.settimeout(SOCKET_TIMEOUT)
+            self.socket = s
+            if self.overload and self.overload.queue_depth is None:
+                # the receive backlog is this proxy's work queue
+                self.overload.queue_depth = lambda: receive_backlog(s)
+            buffer = bytearray(BUF_SIZE)
+            view = memoryview(buffer)
+            while self.socket:
+                try:
+                    size, source = s.recvfrom_into(buffer)
+                except OSError:
+                    # timeouts, and ICMP errors from earlier sends surfacing on recv
+                    continue
+                try:
+                    if forward := self.process(bytes(view[:size]), source):
+                        s.sendto(forward.data, forward.destination)
+                except (ValueError, OSError) as e:
+                    # one malformed datagram or unresolvable host must not stop the proxy
+                    self.errors += 1
+                    print(f"PROXY FAILURE: {type(e).__name__}: {e}")
+
+    def shutdown(self) -> None:
+        self.socket = None
@@ -0,0 +1,157 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator
+
+BATCH_SIZE = 1000
+FLUSH_INTERVAL = 0.05
+SWEEP_INTERVAL = 60.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bindings (
+    aor TEXT PRIMARY KEY,
+    contact TEXT NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS bindings_expires_at ON bindings (expires_at);
+"""
+UPSERT = """
+INSERT INTO bindings (aor, contact, expires_at) VALUES (?, ?, ?)
+ON CONFLICT (aor) DO UPDATE SET contact = excluded.contact, expires_at = excluded.expires_at
+"""
+DELETE = "DELETE FROM bindings WHERE aor = ?"
+SWEEP = "DELETE FROM bindings WHERE expires_at <= ?"
+LIVE = "SELECT aor, contact, expires_at FROM bindings WHERE expires_at > ?"
+
+Binding = tuple[str, str, float]
+
+
+def connect(path: str | os.PathLike) -> sqlite3.Connection:
+    connection = sqlite3.connect(path, isolation_level=None)
+    connection.execute("PRAGMA journal_mode=WAL")
+    # WAL with synchronous=NORMAL survives process crashes; only a power cut can lose
+    # the last commits, which phones re-register anyway
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+class BindingStore:
+    """Persists registrar bindings to SQLite so a restart does not lose them.
+
+    ``put`` and ``remove`` only queue the change. A writer thread commits whatever is
+    queued in one transaction (up to ``batch_size`` changes, at least every
+    ``flush_interval`` seconds), keeping only the last change per AOR, and sweeps
+    expired rows through the ``expires_at`` index every ``sweep_interval``.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        batch_size: int = BATCH_SIZE,
+        flush_interval: float = FLUSH_INTERVAL,
+        sweep_interval: float = SWEEP_INTERVAL,
+    ) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sweep_interval = sweep_interval
+        self.commits = 0
+        self.written = 0
+        self._queue: queue.Queue = queue.Queue()
+        # create the schema before the first load, independently of the writer
+        connect(path).close()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "BindingStore":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def put(self, aor: str, contact: str, expires_at: float) -> None:
+        self._queue.put((aor, contact, expires_at))
+
+    def remove(self, aor: str) -> None:
+        self._queue.put((aor, None, 0.0))
+
+    def flush(self) -> None:
+        """Blocks until every queued change is committed."""
+        self._queue.join()
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def load(self, now: float | None = None) -> Iterator[Binding]:
+        """Yields the live bindings, for a warm start."""
+        connection = connect(self.path)
+        try:
+            yield from connection.execute(LIVE, (time.time() if now is None else now,))
+        finally:
+            connection.close()
+
+    def sweep(self, now: float | None = None) -> int:
+        connection = connect(self.path)
+        try:
+            return connection.execute(SWEEP, (time.time() if now is None else now,)).rowcount
+        finally:
+            connection.close()
+
+    def _run(self) -> None:
+        connection = connect(self.path)
+        next_sweep = time.monotonic() + self.sweep_interval
+        running = True
+        while running:
+            changes: dict[str, tuple[str | None, float]] = {}
+            taken = 0
+            item = self._queue.get()
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                taken += 1
+                if item is None:
+                    running = False
+                    break
+                aor, contact, expires_at = item
+                changes[aor] = (contact, expires_at)
+                if taken >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+
+            try:
+                self._commit(connection, changes)
+                if time.monotonic() >= next_sweep:
+                    next_sweep = time.monotonic() + self.sweep_interval
+                    connection.execute(SWEEP, (time.time(),))
+            except sqlite3.Error as e:
+                # a locked or full database must not end the writer, or flush() never returns
+                print(f"BINDING STORE FAILURE: {e}")
+            finally:
+                for _ in range(taken):
+                    self._queue.task_done()
+        connection.close()
+
+    def _commit(
+        self, connection: sqlite3.Connection, changes: dict[str, tuple[str | None, float]]
+    ) -> None:
+        if not changes:
+            return
+        upserts = [
+            (aor, contact, expires_at)
+            for aor, (contact, expires_at) in changes.items()
+            if contact is not None
+        ]
+        deletes = [(aor,) for aor, (contact, _) in changes.items() if contact is None]
+        with connection:
+            connection.execute("BEGIN")
+            connection.executemany(UPSERT, upserts)
+            connection.executemany(DELETE, deletes)
+        self.commits += 1
+        self.written += len(changes)
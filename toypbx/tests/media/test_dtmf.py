@@ -0,0 +1,37 @@
+import importlib.util
+import unittest
+
+
+@unittest.skipUnless(importlib.util.find_spec("numpy"), "numpy")
+class TestDTMFDetector(unittest.TestCase):
+    def test_classify(self):
+        import numpy as np
+
+        from toypbx.media.dtmf import DTMFDetector, generate
+
+        digits = "0123456789*#ABCD"
+        frames = np.stack([generate(digit) for digit in digits] + [np.zeros(160, np.int16)])
+        detector = DTMFDetector(channels=len(frames))
+
+        actual = detector.classify(frames)
+        expected = ["123A456B789C*0#D".index(digit) for digit in digits] + [-1]
+        self.assertEqual(expected, actual.tolist())
+
+    def test_detect(self):
+        import numpy as np
+
+        from toypbx.media.dtmf import DTMFDetector, generate
+
+        silence = np.zeros(160, np.int16)
+        detector = DTMFDetector(channels=2)
+        ticks = [
+            [generate("5"), silence],
+            [generate("5"), generate("9")],
+            [generate("5"), generate("9")],
+            [silence, generate("9")],
+            [generate("5"), silence],
+            [generate("5"), silence],
+        ]
+
+        actual = [detector.detect(np.stack(tick)) for tick in ticks]
+        self.assertEqual([[], [(0, "5")], [(1, "9")], [], [], [(0, "5")]], actual)
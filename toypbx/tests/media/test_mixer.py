@@ -0,0 +1,65 @@
+import importlib.util
+import unittest
+
+
+@unittest.skipUnless(importlib.util.find_spec("numpy"), "numpy")
+class TestConferenceRoom(unittest.TestCase):
+    def test_n_minus_one(self):
+        import numpy as np
+
+        from toypbx.media.mixer import ConferenceRoom
+
+        room = ConferenceRoom(frame_size=4)
+        for name, value in [("a", 100), ("b", 20), ("c", 3)]:
+            room.join(name)
+            room.put(name, np.full(4, value, dtype=np.int16))
+
+        actual = room.mix()
+        self.assertEqual([23, 103, 120], actual[:, 0].tolist())
+        self.assertEqual([120] * 4, room.frame("c").tolist())
+
+    def test_gain_and_clipping(self):
+        import numpy as np
+
+        from toypbx.media.mixer import ConferenceRoom
+
+        room = ConferenceRoom(frame_size=2)
+        room.join("a", gain=0.5)
+        room.join("b")
+        room.join("c")
+        room.put("a", np.array([1000, -1000], dtype=np.int16))
+        room.put("b", np.array([30000, -30000], dtype=np.int16))
+        room.put("c", np.array([30000, -30000], dtype=np.int16).tobytes())
+
+        room.mix()
+        self.assertEqual([32767, -32768], room.frame("a").tolist())
+        self.assertEqual([30500, -30500], room.frame("b").tolist())
+
+    def test_leave_and_silence(self):
+        import numpy as np
+
+        from toypbx.media.mixer import ConferenceRoom
+
+        room = ConferenceRoom(frame_size=2, capacity=2)
+        for name in ["a", "b", "c"]:
+            room.join(name)
+            room.put(name, np.ones(2, dtype=np.int16))
+        room.leave("a")
+
+        self.assertEqual(["c", "b"], list(room))
+        room.mix()
+        self.assertEqual([1, 1], room.frame("c").tolist())
+        self.assertEqual([[0, 0], [0, 0]], room.mix().tolist())
+
+
+@unittest.skipUnless(importlib.util.find_spec("numpy"), "numpy")
+class TestConferenceBridge(unittest.TestCase):
+    def test_tick(self):
+        from toypbx.media.mixer import ConferenceBridge
+
+        bridge = ConferenceBridge(frame_size=2)
+        bridge.room("1000").join("a")
+        bridge.room("1001")
+
+        actual = bridge.tick()
+        self.assertEqual(["1000"], list(actual))
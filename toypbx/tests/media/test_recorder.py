@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+import wave
+
+
+class TestRecordingWriter(unittest.TestCase):
+    def test_write(self):
+        from toypbx.media.recorder import RecordingWriter
+
+        with tempfile.TemporaryDirectory() as d:
+            paths = [os.path.join(d, f"{i}.wav") for i in range(3)]
+            with RecordingWriter() as writer:
+                recordings = [writer.open(path, chunk_size=1000) for path in paths]
+                for i in range(50):
+                    for n, recording in enumerate(recordings):
+                        recording.write(bytes([n, i]) * 160)
+                for recording in recordings:
+                    recording.close()
+
+            for n, path in enumerate(paths):
+                with wave.open(path) as w:
+                    self.assertEqual((1, 2, 8000, 50 * 160), w.getparams()[:4])
+                    frames = w.readframes(w.getnframes())
+                self.assertEqual(bytes([n, 49]) * 160, frames[-320:])
+
+    def test_empty(self):
+        from toypbx.media.recorder import RecordingWriter
+
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "empty.wav")
+            with RecordingWriter() as writer:
+                writer.open(path, channels=2).close()
+
+            with wave.open(path) as w:
+                self.assertEqual((2, 0), (w.getnchannels(), w.getnframes()))
+
+    def test_drop_when_full(self):
+        from toypbx.media.recorder import RecordingWriter
+
+        with tempfile.TemporaryDirectory() as d:
+            writer = RecordingWriter(max_pending=1)
+            recording = writer.open(os.path.join(d, "full.wav"), chunk_size=4)
+            writer.stop()
+            writer.submit(lambda: None)
+            recording.write(b"\x00" * 4)
+
+            self.assertEqual(4, recording.dropped)
+
+    def test_close_does_not_wait(self):
+        import threading
+
+        from toypbx.media.recorder import RecordingWriter
+
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "slow.wav")
+            release = threading.Event()
+            with RecordingWriter() as writer:
+                writer.submit(release.wait)
+                recording = writer.open(path)
+                recording.write(b"\x00" * 320)
+                recording.close()
+
+                self.assertFalse(recording.wait(0.01))
+                release.set()
+                self.assertTrue(recording.wait(1))
+
+            with wave.open(path) as w:
+                self.assertEqual(160, w.getnframes())
+
+    def test_writer_survives_failure(self):
+        from toypbx.media.recorder import RecordingWriter
+
+        def fail():
+            raise RuntimeError("boom")
+
+        with tempfile.TemporaryDirectory() as d:
+            with RecordingWriter() as writer:
+                writer.submit(fail)
+                recording = writer.open(os.path.join(d, "after.wav"))
+                recording.close()
+
+                self.assertTrue(recording.wait(1))
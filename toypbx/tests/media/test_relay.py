@@ -0,0 +1,150 @@
+import unittest
+
+
+class TestRewriteSDP(unittest.TestCase):
+    def test_invite_offer(self):
+        from toypbx.media.relay import rewrite_sdp
+        from toypbx.protocols.sdp.session import MediaDescription, SessionDescription
+        from toypbx.protocols.sip.context import Transaction
+        from toypbx.protocols.sip.message import InviteMessage
+
+        invite = InviteMessage.create("100", "un100", "6001", Transaction())
+        offer = SessionDescription.parse("\r\n".join(invite.body) + "\r\n")
+        offer = offer.with_media(*offer.media, MediaDescription(5000, offer.codecs))
+
+        actual = rewrite_sdp(offer, "203.0.113.1", 10002)
+
+        self.assertEqual(("203.0.113.1", 10002), actual.rtp_address)
+        self.assertIn("rtcp:10003 IN IP4 203.0.113.1", actual.media[0].attributes)
+        self.assertEqual(offer.codecs, actual.codecs)
+        self.assertEqual(0, actual.media[1].port)
+        self.assertNotIn("192.168.0.137", "".join(actual.to_lines()[1:]))
+
+
+class TestLeg(unittest.TestCase):
+    def test_rewrite(self):
+        import random
+        import socket
+
+        from toypbx.media.relay import Leg
+        from toypbx.protocols.rtp.packet import RTPHeader, build_packet
+
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            leg = Leg(sock, random.Random(0))
+            headers = []
+            # a second upstream stream starts mid-call with its own numbering and clock
+            for ssrc, seq, timestamp in [
+                (1, 100, 16000),
+                (1, 101, 16160),
+                (1, 103, 16480),
+                (2, 9000, 7),
+                (2, 9001, 167),
+            ]:
+                buf = bytearray(build_packet(0, seq, timestamp, ssrc, b"x" * 160))
+                leg.rewrite(buf)
+                header = RTPHeader.parse(buf)
+                self.assertEqual((leg.ssrc, b"x" * 160), (header.ssrc, bytes(header.payload(buf))))
+                headers.append(header)
+
+        seq, timestamp = headers[0].sequence_number, headers[0].timestamp
+        self.assertEqual(
+            [(seq + delta) % 65536 for delta in (0, 1, 3, 4, 5)],
+            [header.sequence_number for header in headers],
+        )
+        # the new stream resumes one packet interval (the last one seen) later
+        self.assertEqual(
+            [(timestamp + delta) % 2**32 for delta in (0, 160, 480, 800, 960)],
+            [header.timestamp for header in headers],
+        )
+        self.assertEqual([False, False, False, True, False], [header.marker for header in headers])
+
+
+class TestRTPRelay(unittest.TestCase):
+    def test_relay(self):
+        import socket
+
+        from toypbx.media.relay import PortPool, RTPRelay
+        from toypbx.protocols.rtp.packet import RTPHeader, build_packet
+        from toypbx.protocols.sdp.session import SessionDescription
+
+        def endpoint() -> socket.socket:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.bind(("127.0.0.1", 0))
+            sock.settimeout(1)
+            return sock
+
+        relay = RTPRelay("127.0.0.1", PortPool("127.0.0.1", 30000, 31000))
+        with endpoint() as a, endpoint() as b, endpoint() as intruder:
+            session = relay.open()
+            # A's SDP carries its private address; the relay latches on the real one
+            offer = session.rewrite_offer(SessionDescription.offer("192.168.0.137", 4000))
+            answer = session.rewrite_answer(SessionDescription.offer(*b.getsockname()))
+            self.assertEqual(("127.0.0.1", session.callee.port), offer.rtp_address)
+            self.assertEqual(("127.0.0.1", session.caller.port), answer.rtp_address)
+
+            a.sendto(build_packet(0, 1, 160, 0xAAAA, b"from a"), answer.rtp_address)
+            self.assertEqual(1, relay.poll(1))
+            data, source = b.recvfrom(2048)
+            header = RTPHeader.parse(data)
+            self.assertEqual(offer.rtp_address, source)
+            self.assertEqual(
+                (session.callee.ssrc, b"from a"), (header.ssrc, bytes(header.payload(data)))
+            )
+
+            b.sendto(build_packet(0, 1, 160, 0xBBBB, b"from b"), offer.rtp_address)
+            self.assertEqual(1, relay.poll(1))
+            data, _ = a.recvfrom(2048)
+            self.assertEqual(b"from b", data[12:])
+
+            intruder.sendto(build_packet(0, 2, 320, 0xAAAA, b"spoof"), answer.rtp_address)
+            a.sendto(b"not rtp", answer.rtp_address)
+            self.assertEqual(0, relay.poll(1))
+            self.assertEqual((2, 2), (relay.forwarded, relay.dropped))
+
+            free = len(relay.ports)
+            relay.close(session)
+            self.assertEqual(free + 2, len(relay.ports))
+
+    def test_latching(self):
+        import socket
+
+        from toypbx.media.relay import LATCH_TIMEOUT, PortPool, RTPRelay
+        from toypbx.protocols.rtp.packet import build_packet
+        from toypbx.protocols.sdp.session import SessionDescription
+
+        def endpoint() -> socket.socket:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.bind(("127.0.0.1", 0))
+            sock.settimeout(1)
+            return sock
+
+        relay = RTPRelay("127.0.0.1", PortPool("127.0.0.1", 31000, 32000))
+        with endpoint() as a, endpoint() as b, endpoint() as intruder, endpoint() as moved:
+            session = relay.open()
+            session.rewrite_offer(SessionDescription.offer(*a.getsockname()))
+            answer = session.rewrite_answer(SessionDescription.offer(*b.getsockname()))
+
+            # junk sent first does not latch
+            intruder.sendto(b"junk", answer.rtp_address)
+            self.assertEqual(0, relay.poll(1))
+            self.assertFalse(session.caller.latched)
+            # valid RTP sent first does, until the SDP address itself shows up
+            intruder.sendto(build_packet(0, 1, 160, 0xEEEE, b"spoof"), answer.rtp_address)
+            self.assertEqual(1, relay.poll(1))
+            self.assertEqual(intruder.getsockname(), session.caller.remote)
+            a.sendto(build_packet(0, 1, 160, 0xAAAA, b"from a"), answer.rtp_address)
+            self.assertEqual(1, relay.poll(1))
+            self.assertEqual(a.getsockname(), session.caller.remote)
+            intruder.sendto(build_packet(0, 2, 320, 0xEEEE, b"spoof"), answer.rtp_address)
+            self.assertEqual(0, relay.poll(1))
+            self.assertEqual([b"spoof", b"from a"], [b.recv(2048)[12:] for _ in range(2)])
+
+            # another source takes over once the latched one has gone quiet
+            moved.sendto(build_packet(0, 2, 320, 0xAAAA, b"moved"), answer.rtp_address)
+            self.assertEqual(0, relay.poll(1))
+            session.caller.last_seen -= LATCH_TIMEOUT
+            moved.sendto(build_packet(0, 3, 480, 0xAAAA, b"moved"), answer.rtp_address)
+            self.assertEqual(1, relay.poll(1))
+            self.assertEqual(moved.getsockname(), session.caller.remote)
+            self.assertEqual(b"moved", b.recv(2048)[12:])
+            relay.close(session)
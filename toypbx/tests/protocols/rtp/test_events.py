@@ -0,0 +1,34 @@
+import unittest
+
+
+class TestTelephoneEvent(unittest.TestCase):
+    def test_parse(self):
+        from toypbx.protocols.rtp.events import TelephoneEvent
+
+        actual = TelephoneEvent.parse(b"\x0b\x8a\x03\x20")
+        expected = TelephoneEvent(event=11, end=True, volume=10, duration=800)
+        self.assertEqual(expected, actual)
+        self.assertEqual("#", actual.digit)
+        self.assertEqual(b"\x0b\x8a\x03\x20", actual.to_bytes())
+
+
+class TestTelephoneEventReceiver(unittest.TestCase):
+    def test_feed_packet(self):
+        from toypbx.protocols.rtp.events import TelephoneEvent, TelephoneEventReceiver
+        from toypbx.protocols.rtp.packet import build_packet
+
+        digits = []
+        receiver = TelephoneEventReceiver(on_event=lambda event: digits.append(event.digit))
+        packets = [
+            build_packet(0, 1, 0, 1, bytes(160)),
+            build_packet(101, 2, 160, 1, TelephoneEvent.from_digit("1").to_bytes(), marker=True),
+            build_packet(101, 3, 160, 1, TelephoneEvent.from_digit("1", duration=160).to_bytes()),
+        ]
+        packets += [
+            build_packet(101, 4, 160, 1, TelephoneEvent.from_digit("1", end=True).to_bytes())
+        ] * 3
+        packets.append(build_packet(101, 5, 800, 1, TelephoneEvent.from_digit("#").to_bytes()))
+
+        for packet in packets:
+            receiver.feed_packet(packet)
+        self.assertEqual(["1", "#"], digits)
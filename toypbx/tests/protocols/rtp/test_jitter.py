@@ -0,0 +1,78 @@
+import unittest
+
+
+class TestJitterBuffer(unittest.TestCase):
+    def test_reorder(self):
+        from toypbx.protocols.rtp.jitter import JitterBuffer
+
+        buffer = JitterBuffer(capacity=8, max_payload=4, min_depth=3)
+        buffer.push(11, 160, b"b")
+        buffer.push(10, 0, b"a")
+        self.assertIsNone(buffer.pop())
+        buffer.push(12, 320, b"c")
+
+        actual = [bytes(buffer.pop()) for _ in range(3)]
+        self.assertEqual([b"a", b"b", b"c"], actual)
+        self.assertEqual(3, buffer.stats.played)
+
+    def test_sequence_wraparound(self):
+        from toypbx.protocols.rtp.jitter import JitterBuffer
+
+        buffer = JitterBuffer(capacity=8, max_payload=4, min_depth=1)
+        for seq, payload in [(65534, b"a"), (65535, b"b"), (0, b"c"), (1, b"d")]:
+            buffer.push(seq, 0, payload)
+
+        actual = [bytes(buffer.pop()) for _ in range(4)]
+        self.assertEqual([b"a", b"b", b"c", b"d"], actual)
+
+    def test_stats(self):
+        from toypbx.protocols.rtp.jitter import JitterBuffer
+
+        buffer = JitterBuffer(capacity=8, max_payload=4, min_depth=1)
+        buffer.push(1, 0, b"a")
+        buffer.push(1, 0, b"a")
+        buffer.push(3, 320, b"c")
+        self.assertEqual(b"a", bytes(buffer.pop()))
+        self.assertIsNone(buffer.pop())
+        buffer.push(2, 160, b"b")
+        self.assertEqual(b"c", bytes(buffer.pop()))
+
+        stats = buffer.stats
+        self.assertEqual(
+            (4, 2, 1, 1, 1), (stats.received, stats.played, stats.lost, stats.late, stats.duplicate)
+        )
+
+    def test_concealment(self):
+        from toypbx.protocols.rtp.jitter import JitterBuffer, repeat_last
+
+        buffer = JitterBuffer(capacity=8, max_payload=4, min_depth=1, concealment=repeat_last)
+        buffer.push(1, 0, b"a")
+        buffer.push(3, 320, b"c")
+
+        actual = [bytes(buffer.pop()) for _ in range(3)]
+        self.assertEqual([b"a", b"a", b"c"], actual)
+        self.assertEqual(1, buffer.stats.concealed)
+
+    def test_push_packet(self):
+        from toypbx.protocols.rtp.jitter import JitterBuffer
+        from toypbx.protocols.rtp.packet import build_packet
+
+        buffer = JitterBuffer(capacity=8, max_payload=160, min_depth=1)
+        buffer.push_packet(build_packet(0, 7, 1120, 0x1234, b"\xff" * 160))
+        self.assertEqual(b"\xff" * 160, bytes(buffer.pop()))
+
+    def test_late_after_underrun(self):
+        from toypbx.protocols.rtp.jitter import JitterBuffer
+
+        buffer = JitterBuffer(capacity=32, max_payload=4, min_depth=1)
+        for seq in range(10):
+            buffer.push(seq, seq * 160, b"%d" % seq)
+        played = [bytes(buffer.pop()) for _ in range(10)]
+        self.assertIsNone(buffer.pop())
+
+        # rebuffering after the underrun must not rewind to frames already played
+        self.assertFalse(buffer.push(3, 480, b"3"))
+        self.assertTrue(buffer.push(10, 1600, b"10"))
+        self.assertEqual(b"10", bytes(buffer.pop()))
+        self.assertEqual([b"%d" % seq for seq in range(10)], played)
+        self.assertEqual((1, 1), (buffer.stats.late, buffer.stats.underruns))
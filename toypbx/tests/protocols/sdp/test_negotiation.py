@@ -0,0 +1,38 @@
+import unittest
+
+
+class TestNegotiation(unittest.TestCase):
+    def test_answer(self):
+        from toypbx.protocols.sdp.negotiation import answer, select_codecs
+        from toypbx.protocols.sdp.session import (
+            PCMU,
+            TELEPHONE_EVENT_8000,
+            Codec,
+            SessionDescription,
+        )
+
+        offered = (
+            Codec(0, "PCMU", 8000),
+            Codec(97, "iLBC", 8000),
+            Codec(100, "telephone-event", 8000),
+        )
+        offer = SessionDescription.offer(address="10.0.0.1", port=20000, codecs=offered)
+        local = (PCMU, TELEPHONE_EVENT_8000)
+        select_codecs.cache_clear()
+
+        actual = answer(offer, address="10.0.0.2", port=30000, local=local)
+        answer(offer, address="10.0.0.3", port=30002, local=local)
+
+        expected = (PCMU, Codec(100, "telephone-event", 8000, fmtp="0-16"))
+        self.assertEqual(expected, actual.codecs)
+        self.assertEqual(("10.0.0.2", 30000), actual.rtp_address)
+        self.assertEqual(1, select_codecs.cache_info().hits)
+
+    def test_answer_rejects_stream(self):
+        from toypbx.protocols.sdp.negotiation import answer
+        from toypbx.protocols.sdp.session import PCMA, PCMU, SessionDescription
+
+        offer = SessionDescription.offer(address="10.0.0.1", port=20000, codecs=(PCMA,))
+
+        actual = answer(offer, address="10.0.0.2", port=30000, local=(PCMU,))
+        self.assertEqual(0, actual.media[0].port)
@@ -0,0 +1,67 @@
+import unittest
+
+RAW = """v=0
+o=- 3910726507 3910726508 IN IP4 192.168.0.137
+s=pjmedia
+b=AS:117
+t=0 0
+a=X-nat:0
+m=audio 4000 RTP/AVP 96 9 8 0 101 102
+c=IN IP4 192.168.0.137
+b=TIAS:96000
+a=rtcp:4001 IN IP4 192.168.0.137
+a=sendrecv
+a=rtpmap:96 opus/48000/2
+a=fmtp:96 useinbandfec=1
+a=rtpmap:9 G722/8000
+a=rtpmap:8 PCMA/8000
+a=rtpmap:101 telephone-event/48000
+a=fmtp:101 0-16
+a=rtpmap:102 telephone-event/8000
+a=fmtp:102 0-16
+a=ssrc:402436570 cname:7791e39e0af6d766
+"""
+
+
+class TestSessionDescription(unittest.TestCase):
+    def test_parse(self):
+        from toypbx.protocols.sdp.session import (
+            DEFAULT_CODECS,
+            MediaDescription,
+            SessionDescription,
+        )
+
+        actual = SessionDescription.parse(RAW)
+        expected = SessionDescription(
+            address="192.168.0.137",
+            session_id=3910726507,
+            session_version=3910726508,
+            bandwidths=("AS:117",),
+            attributes=("X-nat:0",),
+            media=(
+                MediaDescription(
+                    port=4000,
+                    codecs=DEFAULT_CODECS,
+                    connection="192.168.0.137",
+                    bandwidths=("TIAS:96000",),
+                    attributes=(
+                        "rtcp:4001 IN IP4 192.168.0.137",
+                        "sendrecv",
+                        "ssrc:402436570 cname:7791e39e0af6d766",
+                    ),
+                ),
+            ),
+        )
+        self.assertEqual(expected, actual)
+        self.assertEqual(("192.168.0.137", 4000), actual.rtp_address)
+        self.assertIs(actual, SessionDescription.parse(RAW.encode("utf-8")))
+
+    def test_to_bytes(self):
+        from toypbx.protocols.sdp.session import SessionDescription
+
+        sdp = SessionDescription.offer(address="192.168.0.137", port=4000, session_id=3910726507)
+        actual = sdp.to_bytes()
+
+        self.assertEqual(438, len(actual))
+        self.assertTrue(actual.startswith(b"v=0\r\no=- 3910726507 3910726507 IN IP4"))
+        self.assertEqual(sdp, SessionDescription.parse(actual))
@@ -0,0 +1,55 @@
+import os
+import unittest
+
+
+class TestIDGenerator(unittest.TestCase):
+    def test_tokens(self):
+        from toypbx.protocols.sip.ids import IDGenerator
+
+        generator = IDGenerator(pool_size=96)
+        tokens = [generator.tag() for _ in range(100)]
+
+        self.assertEqual(100, len(set(tokens)))
+        for token in tokens:
+            self.assertEqual(16, len(token))
+            self.assertRegex(token, r"^[A-Za-z0-9_-]+$")
+        self.assertRegex(generator.branch(), r"^z9hG4bK[A-Za-z0-9_-]{22}$")
+
+    def test_c_seq(self):
+        from toypbx.protocols.sip.ids import MAX_C_SEQ, IDGenerator
+
+        generator = IDGenerator(pool_size=64)
+        values = [generator.c_seq() for _ in range(1000)]
+
+        self.assertTrue(all(1 <= value <= MAX_C_SEQ for value in values))
+        self.assertGreater(max(values), 2**24)
+
+    @unittest.skipUnless(hasattr(os, "fork"), "fork")
+    def test_fork(self):
+        from toypbx.protocols.sip.ids import generator
+
+        generator.tag()
+        read, write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read)
+            os.write(write, generator.tag().encode())
+            os._exit(0)
+        os.close(write)
+        with os.fdopen(read, "rb") as f:
+            child = f.read().decode()
+        os.waitpid(pid, 0)
+
+        self.assertEqual(16, len(child))
+        self.assertNotEqual(generator.tag(), child)
+
+    def test_transaction(self):
+        from toypbx.protocols.sip.context import Transaction
+        from toypbx.protocols.sip.headers import Via
+
+        transaction = Transaction()
+
+        self.assertEqual(
+            transaction.branch, Via.parse(f"SIP/2.0/UDP h;branch={transaction.branch}").branch
+        )
+        self.assertNotEqual(transaction.call_id, Transaction().call_id)
@@ -85,6 +85,168 @@ Content-Length:  0
         )
         self.assertEqual(expected, actual)
 
+    def test_from_raw_body(self):
+        from toypbx.protocols.sip.message import ResponseMessage
+
+        raw = """SIP/2.0 200 OK
+CSeq: 46545 INVITE
+Content-Type: application/sdp
+Content-Length: 88
+
+v=0
+o=- 1 2 IN IP4 10.0.0.1
+s=-
+t=0 0
+m=audio 20000 RTP/AVP 0
+c=IN IP4 10.0.0.1
+"""
+
+        actual = ResponseMessage.from_raw(raw)
+        self.assertEqual(6, len(actual.body))
+        self.assertEqual(("10.0.0.1", 20000), actual.sdp.rtp_address)
+        self.assertEqual("PCMU", actual.sdp.codecs[0].encoding)
+
+    def test_from_raw_multi_value(self):
+        from toypbx.protocols.sip.message import ResponseMessage
+
+        raw = """SIP/2.0 200 OK
+Via: SIP/2.0/UDP 10.0.0.1:5060;branch=z9hG4bK1, SIP/2.0/UDP 10.0.0.2:5060;branch=z9hG4bK2
+Via: SIP/2.0/UDP 192.168.0.137:60956;rport;branch=z9hG4bK3
+Record-Route: <sip:10.0.0.1;lr>
+Record-Route: <sip:10.0.0.2;lr>
+Contact: "6001,desk" <sip:6001@10.0.0.3>, <sip:6001@10.0.0.4>
+CSeq: 46544 REGISTER
+Content-Length: 0
+"""
+
+        actual = ResponseMessage.from_raw(raw)
+        vias = actual.headers.get_all("Via")
+        self.assertEqual(["z9hG4bK1", "z9hG4bK2", "z9hG4bK3"], [via.branch for via in vias])
+        self.assertEqual("z9hG4bK1", actual.headers["Via"].branch)
+        self.assertEqual("z9hG4bK3", actual.headers.last("Via").branch)
+        self.assertEqual(
+            ["<sip:10.0.0.1;lr>", "<sip:10.0.0.2;lr>"],
+            [str(route) for route in actual.headers.get_all("Record-Route")],
+        )
+        contacts = actual.headers.get_all("Contact")
+        self.assertEqual(["sip:6001@10.0.0.3", "sip:6001@10.0.0.4"], [c.contact for c in contacts])
+        self.assertEqual([], actual.headers.get_all("Route"))
+
+    def test_from_raw_compact(self):
+        from toypbx.protocols.sip.message import ResponseMessage
+
+        raw = """SIP/2.0 200 OK
+v: SIP/2.0/UDP 10.0.0.1:5060;branch=z9hG4bK1,SIP/2.0/UDP 10.0.0.2:5060;branch=z9hG4bK2
+i: abc
+f: <sip:6001@un100>;tag=1
+t: <sip:100@un100>;tag=2
+CSeq: 1 INVITE
+l: 0
+"""
+
+        actual = ResponseMessage.from_raw(raw)
+        self.assertEqual(2, len(actual.headers.get_all("Via")))
+        self.assertEqual("abc", actual.headers["Call-ID"].call_id)
+        self.assertEqual("2", actual.headers["To"].tag)
+        self.assertEqual(0, actual.headers["Content-Length"].content_length)
+
+
+class TestHeaders(unittest.TestCase):
+    def test_add(self):
+        from toypbx.protocols.sip.headers import Headers, Via
+
+        first = Via("SIP/2.0/UDP 10.0.0.1:5060", branch="z9hG4bK1")
+        second = Via("SIP/2.0/UDP 10.0.0.2:5060", branch="z9hG4bK2")
+        headers = Headers(Via=first)
+        headers.add(second)
+
+        self.assertEqual(first, headers["Via"])
+        self.assertEqual([first, second], list(headers.fields()))
+        self.assertNotEqual(Headers(Via=first), headers)
+        self.assertEqual(headers, headers.copy())
+
+        headers["Via"] = second
+        self.assertEqual([second], headers.get_all("Via"))
+        headers.pop("Via")
+        self.assertIsNone(headers.last("Via"))
+
+    def test_dict_methods(self):
+        from toypbx.protocols.sip.headers import CallID, Headers, Via
+
+        first = Via("SIP/2.0/UDP 10.0.0.1:5060", branch="z9hG4bK1")
+        second = Via("SIP/2.0/UDP 10.0.0.2:5060", branch="z9hG4bK2")
+        call_id = CallID("abc")
+        headers = Headers(first, second)
+        self.assertEqual([first, second], headers.get_all("Via"))
+
+        headers.update({"Via": second}, **{"Call-ID": call_id})
+        self.assertEqual([second], headers.get_all("Via"))
+        self.assertEqual([call_id], headers.get_all("Call-ID"))
+        self.assertIs(call_id, headers.setdefault("Call-ID", CallID("def")))
+
+        headers |= Headers(first, second)
+        self.assertEqual([first, second], headers.get_all("Via"))
+        self.assertEqual(headers, Headers(call_id) | Headers(first, second))
+
+        self.assertEqual(("Call-ID", call_id), headers.popitem())
+        self.assertEqual([], headers.get_all("Call-ID"))
+        headers.clear()
+        self.assertEqual([], list(headers.fields()))
+        self.assertEqual(Headers(), headers)
+
+    def test_split_values(self):
+        from toypbx.protocols.sip.headers import split_values
+
+        self.assertEqual(
+            ['"a, b" <sip:a@b;x=1,2>', "<sip:c@d>"],
+            split_values(' "a, b" <sip:a@b;x=1,2> , <sip:c@d>,'),
+        )
+
+
+class TestInviteMessage(unittest.TestCase):
+    def test_content_length(self):
+        from toypbx.protocols.sip.context import Transaction
+        from toypbx.protocols.sip.message import InviteMessage
+
+        actual = InviteMessage.create("100", "un100", "6001", Transaction()).to_message()
+
+        headers, body = actual.split("\n\n", 1)
+        self.assertIn(f"Content-Length: {len(body.encode('utf-8'))}", headers.splitlines())
+        self.assertIn("Content-Type: application/sdp", headers.splitlines())
+
+    def test_compact(self):
+        from toypbx.protocols.sip.context import Transaction
+        from toypbx.protocols.sip.message import InviteMessage
+
+        request = InviteMessage.create("100", "un100", "6001", Transaction())
+        full = request.to_message()
+        compact = request.to_message(compact=True)
+
+        headers, body = compact.split("\n\n", 1)
+        lines = headers.splitlines()
+        self.assertIn(f"l:{len(body.encode('utf-8'))}", lines)
+        self.assertIn("c:application/sdp", lines)
+        self.assertTrue(any(line.startswith("v:SIP/2.0/UDP") for line in lines))
+        self.assertFalse(any(line.startswith("Allow") for line in lines))
+        self.assertNotIn("a=rtpmap:0 PCMU/8000", body)
+        self.assertIn("a=rtpmap:96 opus/48000/2", body)
+
+        self.assertEqual(full, request.to_datagram(mtu=len(full)))
+        self.assertEqual(compact, request.to_datagram(mtu=len(full) - 1))
+
+    def test_digest_keeps_body(self):
+        from toypbx.protocols.sip.context import Transaction
+        from toypbx.protocols.sip.message import InviteMessage, ResponseMessage
+
+        request = InviteMessage.create("100", "un100", "6001", Transaction())
+        challenge = ResponseMessage.from_raw("""SIP/2.0 401 Unauthorized
+CSeq: 1 INVITE
+WWW-Authenticate: Digest realm="asterisk",nonce="abc",opaque="def",algorithm=MD5,qop="auth"
+""")
+        digest = request.digest("6001", "secret", challenge)
+        self.assertEqual(request.body, digest.body)
+        self.assertIn("Authorization", digest.headers)
+
 
 class TestAuthorization(unittest.TestCase):
     def test_digest_response(self):
@@ -0,0 +1,79 @@
+import unittest
+
+RESPONSE = b"""SIP/2.0 401 Unauthorized\r
+Via: SIP/2.0/UDP 192.168.0.137:60956;rport=64377;received=172.17.0.1;branch=z9hG4bKPjhRHw98trjD05PopYbBL6bj34Hci6DmTU\r
+Via: SIP/2.0/UDP 10.0.0.1:5060;branch=z9hG4bKsecond\r
+Call-ID: 6eCTpQmxGa4gAWjUXhufRd-u0D9u.N5F\r
+From: "6001" <sip:6001@un100>;tag=JRUu-hLceE3P8h2r0RVQKeJRZuviCTLX\r
+To: "6001" <sip:6001@un100>;tag=z9hG4bKPjhRHw98trjD05PopYbBL6bj34Hci6DmTU\r
+CSeq: 46544 REGISTER\r
+Content-Length:  0\r
+\r
+"""
+
+
+class TestScan(unittest.TestCase):
+    def test_response(self):
+        from toypbx.protocols.sip.scanner import Scan, scan
+
+        self.assertEqual(
+            Scan(
+                status_code=401,
+                method=None,
+                call_id=b"6eCTpQmxGa4gAWjUXhufRd-u0D9u.N5F",
+                c_seq=46544,
+                c_seq_method=b"REGISTER",
+                branch=b"z9hG4bKPjhRHw98trjD05PopYbBL6bj34Hci6DmTU",
+            ),
+            scan(RESPONSE),
+        )
+
+    def test_compact_request(self):
+        from toypbx.protocols.sip.scanner import scan
+
+        actual = scan(
+            b"OPTIONS sip:6001@10.0.0.2 SIP/2.0\n"
+            b"v: SIP/2.0/UDP 10.0.0.1;Branch=z9hG4bKAbC\n"
+            b"i: a84b4c76e66710\n"
+            b"CSeq: 1 OPTIONS\n\n"
+        )
+        self.assertFalse(actual.is_response)
+        self.assertEqual(
+            (b"OPTIONS", b"a84b4c76e66710", b"z9hG4bKAbC"),
+            (actual.method, actual.call_id, actual.branch),
+        )
+
+    def test_malformed(self):
+        from toypbx.protocols.sip.scanner import scan
+
+        for data in [
+            b"",
+            b"\r\n\r\n",
+            b"\x00\xff" * 32,
+            b"GET / HTTP/1.1\r\nHost: x\r\n\r\n",
+            b"SIP/2.0 9xx Nope\r\n\r\n",
+            b"SIP/2.0 800 Too High\r\nCall-ID: a\r\nCSeq: 1 X\r\nVia: v\r\n\r\n",
+            RESPONSE.replace(b"CSeq: 46544", b"CSeq: many"),
+            RESPONSE.replace(b"Call-ID:", b"X-Call-ID:"),
+            # headers in the body do not count
+            RESPONSE.replace(b"Call-ID:", b"X-Call-ID:") + b"Call-ID: b\r\n",
+        ]:
+            with self.subTest(data=data):
+                self.assertIsNone(scan(data))
+
+
+class TestScanner(unittest.TestCase):
+    def test_accept(self):
+        from toypbx.protocols.sip.scanner import Scanner
+
+        scanner = Scanner(is_known=lambda call_id: call_id.startswith(b"6eCT"))
+
+        self.assertIsNotNone(scanner.accept(RESPONSE))
+        self.assertIsNone(scanner.accept(b"\x16\x03\x01\x02\x00\x01\x00\x01\xfc\x03\x03"))
+        self.assertIsNone(scanner.accept(RESPONSE.replace(b"6eCT", b"zzzz")))
+        self.assertIsNone(
+            scanner.accept(b"OPTIONS sip:100@x SIP/2.0\r\n" + RESPONSE.split(b"\n", 1)[1])
+        )
+
+        self.assertEqual(1, scanner.accepted)
+        self.assertEqual({"malformed": 1, "unknown_dialog": 1, "request": 1}, scanner.dropped)
@@ -0,0 +1,138 @@
+import unittest
+
+
+def authorization(nonce: str, password: str = "secret", nc: int = 1, **kwargs) -> str:
+    from toypbx.protocols.sip.headers import Authorization
+
+    params = dict(
+        username="6001",
+        password=password,
+        method="REGISTER",
+        request_uri="sip:un100",
+        realm="asterisk",
+        nonce=nonce,
+        algorithm="MD5",
+        opaque="456759f668e20830",
+        qop="auth",
+        nc=nc,
+    )
+    return str(Authorization(**params | kwargs))
+
+
+class TestDigestVerifier(unittest.TestCase):
+    def verifier(self):
+        from toypbx.server.auth import DigestVerifier, HA1Table, NonceIssuer
+
+        table = HA1Table()
+        table.add("6001", "secret")
+        return DigestVerifier(table, NonceIssuer(secret=b"k", lifetime=30))
+
+    def test_verify(self):
+        from toypbx.server.auth import Verdict, parse_authorization
+
+        verifier = self.verifier()
+        challenge = parse_authorization(verifier.challenge(now=1000))
+        nonce = challenge["nonce"]
+
+        self.assertEqual(("asterisk", "auth"), (challenge["realm"], challenge["qop"]))
+        self.assertEqual(
+            Verdict.OK, verifier.verify("REGISTER", "sip:un100", authorization(nonce), now=1001)
+        )
+        self.assertEqual(
+            Verdict.UNAUTHORIZED,
+            verifier.verify("REGISTER", "sip:un100", authorization(nonce, "wrong", nc=2), now=1001),
+        )
+        self.assertEqual(
+            Verdict.UNAUTHORIZED,
+            verifier.verify("INVITE", "sip:un100", authorization(nonce, nc=3), now=1001),
+        )
+        self.assertEqual(
+            Verdict.UNAUTHORIZED,
+            verifier.verify(
+                "REGISTER", "sip:un100", authorization(nonce, username="6002", nc=4), now=1001
+            ),
+        )
+        self.assertEqual(
+            Verdict.STALE, verifier.verify("REGISTER", "sip:un100", authorization(nonce), now=1031)
+        )
+
+    def test_forged_nonce(self):
+        from toypbx.server.auth import NonceIssuer, Verdict
+
+        verifier = self.verifier()
+        issued, _, signed = verifier.nonces.issue(now=1000).partition("/")
+        # a later issue time under the old signature, to dodge the lifetime
+        forged = f"{int(issued) + 60}/{signed}"
+
+        self.assertEqual(
+            Verdict.UNAUTHORIZED,
+            verifier.verify("REGISTER", "sip:un100", authorization(forged), now=1001),
+        )
+        other = NonceIssuer(secret=b"other").issue(now=1000)
+        self.assertEqual(
+            Verdict.UNAUTHORIZED,
+            verifier.verify("REGISTER", "sip:un100", authorization(other), now=1001),
+        )
+
+    def test_replay(self):
+        from toypbx.server.auth import Verdict
+
+        verifier = self.verifier()
+        nonce = verifier.nonces.issue(now=1000)
+
+        verdicts = [
+            verifier.verify("REGISTER", "sip:un100", authorization(nonce, nc=nc), now=1001)
+            for nc in (1, 3, 2, 2, 3, 70, 5, 6)
+        ]
+        self.assertEqual(
+            [Verdict.OK] * 3 + [Verdict.REPLAY] * 2 + [Verdict.OK]
+            # 5 fell out of the 64 wide window when 70 arrived
+            + [Verdict.REPLAY] * 2,
+            verdicts,
+        )
+        self.assertEqual(1, len(verifier.replay))
+        # expired nonces are dropped from the window
+        verifier.verify("REGISTER", "sip:un100", authorization(nonce, nc=71), now=1031)
+        verifier.verify(
+            "REGISTER", "sip:un100", authorization(verifier.nonces.issue(now=1030)), now=1031
+        )
+        self.assertEqual(1, len(verifier.replay))
+
+    def test_request_uri_and_qop(self):
+        from toypbx.server.auth import Verdict, ha1, md5hex, parse_authorization
+
+        verifier = self.verifier()
+        nonce = verifier.nonces.issue(now=1000)
+
+        self.assertEqual(
+            Verdict.UNAUTHORIZED,
+            verifier.verify("REGISTER", "sip:other", authorization(nonce), now=1001),
+        )
+        # an RFC 2069 answer has no nc, so nothing would stop it being replayed
+        params = parse_authorization(authorization(nonce))
+        for key in ("qop", "nc", "cnonce"):
+            del params[key]
+        ha2 = md5hex("REGISTER:sip:un100")
+        params["response"] = md5hex(f"{ha1('6001', 'asterisk', 'secret')}:{nonce}:{ha2}")
+        self.assertEqual(
+            Verdict.UNAUTHORIZED, verifier.verify("REGISTER", "sip:un100", params, now=1001)
+        )
+
+
+class TestHA1Table(unittest.TestCase):
+    def test_read(self):
+        import os
+        import tempfile
+
+        from toypbx.server.auth import HA1Table, ha1
+
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "users.htdigest")
+            with open(path, "w") as f:
+                f.write(f"# users\n6001:asterisk:{ha1('6001', 'asterisk', 'secret')}\n")
+                f.write(f"6002:other:{ha1('6002', 'other', 'secret')}\n")
+            table = HA1Table.read(path)
+
+        self.assertEqual(1, len(table))
+        self.assertIn("6001", table)
+        self.assertEqual(ha1("6001", "asterisk", "secret"), table.get("6001"))
@@ -0,0 +1,82 @@
+import multiprocessing
+import unittest
+
+
+def register_in_worker(table, aor: str, contact: str) -> None:
+    table.register(aor, contact, expires=60)
+
+
+class TestLocationTable(unittest.TestCase):
+    def test_register_lookup(self):
+        from toypbx.server.location import LocationTable
+
+        with LocationTable.create(capacity=8) as table:
+            table.register("sip:6001@un100", "sip:6001@10.0.0.1:5060", expires=60, now=0)
+            table.register("sip:6002@un100", "sip:6002@10.0.0.2:5060", expires=60, now=0)
+
+            self.assertEqual("sip:6001@10.0.0.1:5060", table.lookup("sip:6001@un100", now=1))
+            self.assertIsNone(table.lookup("sip:6001@un100", now=61))
+            self.assertIsNone(table.lookup("sip:6003@un100", now=1))
+
+            table.register("sip:6001@un100", "sip:6001@10.0.0.9:5060", expires=60, now=1)
+            self.assertEqual("sip:6001@10.0.0.9:5060", table.lookup("sip:6001@un100", now=2))
+
+            table.register("sip:6001@un100", "", expires=0)
+            self.assertIsNone(table.lookup("sip:6001@un100", now=2))
+            self.assertEqual("sip:6002@10.0.0.2:5060", table.lookup("sip:6002@un100", now=2))
+
+    def test_full(self):
+        from toypbx.server.location import LocationTable
+
+        with LocationTable.create(capacity=4) as table:
+            for i in range(4):
+                table.register(f"sip:{i}@un100", f"sip:{i}@10.0.0.1", expires=10, now=0)
+            with self.assertRaises(ValueError):
+                table.register("sip:4@un100", "sip:4@10.0.0.1", expires=10, now=5)
+            # expired slots are reused
+            table.register("sip:4@un100", "sip:4@10.0.0.1", expires=10, now=20)
+            self.assertEqual("sip:4@10.0.0.1", table.lookup("sip:4@un100", now=21))
+
+    def test_too_long(self):
+        from toypbx.server.location import LocationTable
+
+        with LocationTable.create(capacity=4) as table:
+            with self.assertRaises(ValueError):
+                table.register("sip:" + "x" * 100, "sip:x", expires=10)
+
+    def test_torn_slot(self):
+        from toypbx.server.location import SEQ, LocationTable
+
+        with LocationTable.create(capacity=4) as table:
+            table.register("sip:6001@un100", "sip:6001@10.0.0.1", expires=60, now=0)
+            offset = next(table._probe(b"sip:6001@un100"))
+            # a writer died between its two counter stores
+            SEQ.pack_into(table._buf, offset, 3)
+
+            self.assertIsNone(table.lookup("sip:6001@un100", now=1))
+            table.register("sip:6001@un100", "sip:6001@10.0.0.2", expires=60, now=1)
+            self.assertEqual("sip:6001@10.0.0.2", table.lookup("sip:6001@un100", now=2))
+
+    def test_attach(self):
+        from toypbx.server.location import LocationTable
+
+        with LocationTable.create(capacity=16) as table:
+            other = LocationTable.attach(table.name, table.lock)
+            other.register("sip:6001@un100", "sip:6001@10.0.0.1", expires=60)
+            self.assertEqual("sip:6001@10.0.0.1", table.lookup("sip:6001@un100"))
+            self.assertEqual(1, len(table))
+            other.close()
+
+    @unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "fork")
+    def test_worker_process(self):
+        from toypbx.server.location import LocationTable
+
+        context = multiprocessing.get_context("fork")
+        with LocationTable.create(capacity=16, lock=context.Lock()) as table:
+            worker = context.Process(
+                target=register_in_worker, args=(table, "sip:6001@un100", "sip:6001@10.0.0.1")
+            )
+            worker.start()
+            worker.join()
+            self.assertEqual(0, worker.exitcode)
+            self.assertEqual("sip:6001@10.0.0.1", table.lookup("sip:6001@un100"))
@@ -0,0 +1,108 @@
+import unittest
+
+REQUEST = b"""REGISTER sip:un100 SIP/2.0\r
+Via: SIP/2.0/UDP 192.168.0.137:60956;rport;branch=z9hG4bKPjhRHw98trjD05PopYbBL6bj34Hci6DmTU\r
+Max-Forwards: 70\r
+From: "6001" <sip:6001@un100>;tag=JRUu-hLceE3P8h2r0RVQKeJRZuviCTLX\r
+To: "6001" <sip:6001@un100>\r
+Call-ID: 6eCTpQmxGa4gAWjUXhufRd-u0D9u.N5F\r
+CSeq: 46544 REGISTER\r
+Expires: 300\r
+Content-Length: 0\r
+\r
+"""
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_take(self):
+        from toypbx.server.overload import TokenBucket
+
+        bucket = TokenBucket(rate=10, burst=2, now=0.0)
+
+        actual = [bucket.take(now) for now in (0.0, 0.0, 0.0, 0.05, 0.1, 0.1)]
+        self.assertEqual([True, True, False, False, True, False], actual)
+
+
+class TestOverloadControl(unittest.TestCase):
+    def test_reject_with_503(self):
+        from toypbx.protocols.sip.message import ResponseMessage
+        from toypbx.server.overload import OverloadControl
+
+        control = OverloadControl(rate=1, burst=1, retry_after=7)
+        source = ("192.168.0.137", 60956)
+        self.assertIsNone(control.admit(REQUEST, source, now=0.0))
+
+        actual = ResponseMessage.from_raw(control.admit(REQUEST, source, now=0.0).decode())
+        self.assertEqual(503, actual.start_line.status_code)
+        self.assertEqual("6eCTpQmxGa4gAWjUXhufRd-u0D9u.N5F", actual.headers["Call-ID"].call_id)
+        self.assertEqual("7", actual.headers["Retry-After"].value)
+        self.assertNotIn("Expires", actual.headers)
+        self.assertEqual(b"", control.admit(b"ACK sip:un100 SIP/2.0\r\n\r\n", source, now=0.0))
+        self.assertIsNone(control.admit(b"SIP/2.0 200 OK\r\n\r\n", source, now=0.0))
+
+    def test_per_source(self):
+        from toypbx.server.overload import OverloadControl
+
+        control = OverloadControl(rate=100, per_source_rate=1, per_source_burst=1, max_sources=1)
+
+        actual = [
+            control.admit(REQUEST, (host, 5060), now=0.0) is None
+            for host in ("10.0.0.1", "10.0.0.1", "10.0.0.2", "10.0.0.1")
+        ]
+        self.assertEqual([True, False, True, True], actual)
+        self.assertEqual({"source": 1}, dict(control.rejected))
+
+    def test_per_source_only(self):
+        from toypbx.server.overload import OverloadControl
+
+        control = OverloadControl(per_source_rate=1, per_source_burst=1)
+
+        actual = [
+            control.admit(REQUEST, (host, 5060), now=0.0) is None
+            for host in ("10.0.0.1", "10.0.0.2", "10.0.0.3", "10.0.0.1")
+        ]
+        self.assertEqual([True, True, True, False], actual)
+
+    def test_queue_depth(self):
+        from toypbx.server.overload import OverloadControl
+
+        depth = [0]
+        control = OverloadControl(rate=100, max_queue_depth=3, queue_depth=lambda: depth[0])
+
+        self.assertIsNone(control.admit(REQUEST, ("10.0.0.1", 5060), now=0.0))
+        depth[0] = 3
+        self.assertTrue(control.admit(REQUEST, ("10.0.0.1", 5060), now=0.0))
+        self.assertEqual({"queue": 1}, dict(control.rejected))
+
+    def test_receive_backlog(self):
+        import socket
+        import time
+
+        from toypbx.server.proxy import receive_backlog
+
+        with (
+            socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as receiver,
+            socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sender,
+        ):
+            receiver.bind(("127.0.0.1", 0))
+            empty = receive_backlog(receiver)
+            for _ in range(5):
+                sender.sendto(REQUEST, receiver.getsockname())
+            for _ in range(100):
+                if receive_backlog(receiver) >= 5 * len(REQUEST):
+                    break
+                time.sleep(0.01)
+            queued = receive_backlog(receiver)
+
+        self.assertEqual(0, empty)
+        self.assertGreaterEqual(queued, 5 * len(REQUEST))
+
+    def test_proxy(self):
+        from toypbx.server.overload import OverloadControl
+        from toypbx.server.proxy import StatelessProxy
+
+        proxy = StatelessProxy("10.0.0.1", overload=OverloadControl(rate=1, burst=0))
+
+        actual = proxy.process(REQUEST, ("192.168.0.137", 60956))
+        self.assertEqual(("192.168.0.137", 60956), actual.destination)
+        self.assertTrue(actual.data.startswith(b"SIP/2.0 503 Service Unavailable\r\n"))
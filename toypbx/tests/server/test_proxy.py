@@ -0,0 +1,155 @@
+import time
+import unittest
+
+REQUEST = """INVITE sip:100@10.0.0.2:5080 SIP/2.0\r
+Via: SIP/2.0/UDP 192.168.0.137:60956;rport;branch=z9hG4bKPjhRHw98trjD05PopYbBL6bj34Hci6DmTU\r
+Max-Forwards: 70\r
+From: "6001" <sip:6001@un100>;tag=JRUu-hLceE3P8h2r0RVQKeJRZuviCTLX\r
+To: <sip:100@un100>\r
+Call-ID: 6eCTpQmxGa4gAWjUXhufRd-u0D9u.N5F\r
+CSeq: 46544 INVITE\r
+Content-Length: 4\r
+\r
+v=0
+"""
+
+RESPONSE = """SIP/2.0 180 Ringing\r
+Via: SIP/2.0/UDP 10.0.0.1:5060;branch=z9hG4bK0123456789abcdef;rport=5060\r
+Via: SIP/2.0/UDP 192.168.0.137:60956;rport=64377;received=172.17.0.1;branch=z9hG4bKPjhRHw98trjD05PopYbBL6bj34Hci6DmTU\r
+Call-ID: 6eCTpQmxGa4gAWjUXhufRd-u0D9u.N5F\r
+CSeq: 46544 INVITE\r
+Content-Length: 0\r
+\r
+"""
+
+
+class TestStatelessProxy(unittest.TestCase):
+    def test_forward_request(self):
+        from toypbx.server.proxy import StatelessProxy
+
+        proxy = StatelessProxy("10.0.0.1")
+
+        actual = proxy.process(REQUEST.encode(), ("172.17.0.1", 64377))
+        lines = actual.data.decode().split("\r\n")
+        self.assertEqual(("10.0.0.2", 5080), actual.destination)
+        self.assertRegex(
+            lines[1], r"^Via: SIP/2.0/UDP 10.0.0.1:5060;branch=z9hG4bK[0-9a-f]{16};rport$"
+        )
+        self.assertEqual(
+            REQUEST.split("\r\n")[1].replace(";rport;", ";rport=64377;received=172.17.0.1;"),
+            lines[2],
+        )
+        self.assertEqual("Max-Forwards: 69", lines[3])
+        self.assertEqual(REQUEST.split("\r\n")[3:], lines[4:])
+        self.assertEqual(actual, proxy.process(REQUEST.encode(), ("172.17.0.1", 64377)))
+
+    def test_forward_request_compact_without_max_forwards(self):
+        from toypbx.server.proxy import StatelessProxy
+
+        proxy = StatelessProxy("10.0.0.1", route=lambda uri: ("10.0.0.3", 5060))
+        request = (
+            b"OPTIONS sip:un100 SIP/2.0\nv: SIP/2.0/UDP 192.168.0.137:60956;branch=z9hG4bKa\n\n"
+        )
+
+        actual = proxy.process(request, ("192.168.0.137", 60956))
+        lines = actual.data.split(b"\n")
+        self.assertEqual(("10.0.0.3", 5060), actual.destination)
+        self.assertEqual(b"Max-Forwards: 69", lines[1])
+        self.assertTrue(lines[2].startswith(b"Via: SIP/2.0/UDP 10.0.0.1:5060;branch=z9hG4bK"))
+        self.assertEqual(b"v: SIP/2.0/UDP 192.168.0.137:60956;branch=z9hG4bKa", lines[3])
+
+    def test_too_many_hops(self):
+        from toypbx.server.proxy import StatelessProxy
+
+        proxy = StatelessProxy("10.0.0.1")
+        request = REQUEST.replace("Max-Forwards: 70", "Max-Forwards: 0").encode()
+
+        actual = proxy.process(request, ("172.17.0.1", 64377))
+        self.assertEqual(("172.17.0.1", 64377), actual.destination)
+        self.assertTrue(
+            actual.data.startswith(b"SIP/2.0 483 Too Many Hops\r\nVia: SIP/2.0/UDP 192")
+        )
+
+    def test_forward_response(self):
+        from toypbx.server.proxy import StatelessProxy
+
+        proxy = StatelessProxy("10.0.0.1")
+
+        actual = proxy.process(RESPONSE.encode(), ("10.0.0.2", 5080))
+        expected = "\r\n".join(line for i, line in enumerate(RESPONSE.split("\r\n")) if i != 1)
+        self.assertEqual(("172.17.0.1", 64377), actual.destination)
+        self.assertEqual(expected.encode(), actual.data)
+
+    def test_response_returns_to_source(self):
+        from toypbx.protocols.sip.context import Transaction
+        from toypbx.protocols.sip.message import InviteMessage
+        from toypbx.server.proxy import StatelessProxy, reply, stamp_via
+
+        proxy = StatelessProxy("10.0.0.1", route=lambda uri: ("10.0.0.2", 5060))
+        # the client reports its private address; the request arrives from its NAT
+        request = InviteMessage.create("100", "un100", "6001", Transaction())
+        source = ("203.0.113.7", 40000)
+
+        forwarded = proxy.process(request.to_message().encode(), source)
+        ringing = proxy.process(reply(forwarded.data, 180, "Ringing"), forwarded.destination)
+        self.assertEqual(source, ringing.destination)
+        self.assertEqual(
+            b"SIP/2.0/UDP 10.0.0.1:5060;received=10.0.0.9",
+            stamp_via(b"SIP/2.0/UDP 10.0.0.1:5060;received=10.0.0.8", ("10.0.0.9", 5060)),
+        )
+        self.assertEqual(
+            b"SIP/2.0/UDP 10.0.0.1:5060",
+            stamp_via(b"SIP/2.0/UDP 10.0.0.1:5060", ("10.0.0.1", 5060)),
+        )
+
+    def test_drop_response_not_ours(self):
+        from toypbx.server.proxy import StatelessProxy
+
+        proxy = StatelessProxy("10.0.0.9")
+
+        self.assertIsNone(proxy.process(RESPONSE.encode(), ("10.0.0.2", 5080)))
+        self.assertIsNone(proxy.process(b"\r\n\r\n", ("10.0.0.2", 5080)))
+        self.assertEqual(2, proxy.dropped)
+
+    def test_bad_ports(self):
+        from toypbx.server.proxy import StatelessProxy, via_destination
+
+        self.assertIsNone(via_destination(b"SIP/2.0/UDP host:abc;branch=z9hG4bK1"))
+        self.assertIsNone(via_destination(b"SIP/2.0/UDP host;rport=x"))
+        self.assertIsNone(via_destination(b"SIP/2.0/UDP host:70000"))
+        self.assertEqual(("host", 5060), via_destination(b"SIP/2.0/UDP host;rport"))
+
+        proxy = StatelessProxy("10.0.0.1")
+        response = RESPONSE.replace("rport=64377", "rport=x").encode()
+        self.assertIsNone(proxy.process(response, ("10.0.0.2", 5080)))
+        request = REQUEST.replace("10.0.0.2:5080", "10.0.0.2:99999").encode()
+        self.assertIsNone(proxy.process(request, ("172.17.0.1", 64377)))
+
+    def test_serve_survives_send_failure(self):
+        import socket
+        import threading
+
+        from toypbx.server.proxy import StatelessProxy
+
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as upstream:
+            upstream.bind(("127.0.0.1", 0))
+            upstream.settimeout(1)
+            destinations = iter([("127.0.0.1", 0), upstream.getsockname()])
+            proxy = StatelessProxy("127.0.0.1", port=0, route=lambda uri: next(destinations))
+            thread = threading.Thread(target=proxy.serve_forever, daemon=True)
+            thread.start()
+            try:
+                while proxy.socket is None:
+                    time.sleep(0.001)
+                address = proxy.socket.getsockname()
+                with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as client:
+                    # the first request cannot be sent (port 0), the second one gets through
+                    client.sendto(REQUEST.encode(), address)
+                    client.sendto(REQUEST.replace("46544", "46545").encode(), address)
+                    data = upstream.recv(65535)
+            finally:
+                proxy.shutdown()
+                thread.join()
+
+        self.assertIn(b"CSeq: 46545 INVITE", data)
+        self.assertEqual(1, proxy.errors)
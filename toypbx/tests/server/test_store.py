@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+
+
+class TestBindingStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "bindings.db")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_put_remove(self):
+        from toypbx.server.store import BindingStore
+
+        with BindingStore(self.path, flush_interval=0.01) as store:
+            for i in range(100):
+                store.put("sip:6001@un100", f"sip:6001@10.0.0.{i}", expires_at=100)
+            store.put("sip:6002@un100", "sip:6002@10.0.0.2", expires_at=100)
+            store.put("sip:6003@un100", "sip:6003@10.0.0.3", expires_at=10)
+            store.remove("sip:6002@un100")
+            store.flush()
+            self.assertLess(store.commits, 10)
+
+            self.assertEqual(
+                [("sip:6001@un100", "sip:6001@10.0.0.99", 100.0)], list(store.load(now=50))
+            )
+            self.assertEqual(1, store.sweep(now=50))
+            self.assertEqual(1, len(list(store.load(now=0))))
+
+    def test_sweep_failure(self):
+        import threading
+        from unittest import mock
+
+        from toypbx.server.store import BindingStore
+
+        with mock.patch("toypbx.server.store.SWEEP", "DELETE FROM missing WHERE ? > 0"):
+            with BindingStore(self.path, flush_interval=0.01, sweep_interval=0) as store:
+                store.put("sip:6001@un100", "sip:6001@10.0.0.1", expires_at=100)
+                flusher = threading.Thread(target=store.flush, daemon=True)
+                flusher.start()
+                flusher.join(2)
+                self.assertFalse(flusher.is_alive())
+
+                store.put("sip:6002@un100", "sip:6002@10.0.0.2", expires_at=100)
+                store.flush()
+                self.assertEqual(2, len(list(store.load(now=0))))
+
+    def test_restart(self):
+        from toypbx.server.location import LocationTable
+        from toypbx.server.store import BindingStore
+
+        with BindingStore(self.path) as store, LocationTable.create(
+            capacity=16, store=store
+        ) as table:
+            table.register("sip:6001@un100", "sip:6001@10.0.0.1", expires=60, now=0)
+            table.register("sip:6002@un100", "sip:6002@10.0.0.2", expires=60, now=0)
+            table.register("sip:6002@un100", "", expires=0)
+
+        with BindingStore(self.path) as store, LocationTable.create(
+            capacity=16, store=store
+        ) as table:
+            self.assertEqual(1, table.load(now=1))
+            self.assertEqual("sip:6001@10.0.0.1", table.lookup("sip:6001@un100", now=1))
+            self.assertIsNone(table.lookup("sip:6002@un100", now=1))
@@ -0,0 +1,247 @@
+import heapq
+import random
+import secrets
+import socket
+import threading
+import time
+from collections import Counter
+
+from toypbx.protocols.sdp.negotiation import answer
+from toypbx.protocols.sdp.session import SessionDescription
+from toypbx.protocols.sip.scanner import head_end, scan
+from toypbx.server.auth import DigestVerifier, HA1Table, Verdict
+
+BUF_SIZE = 65535
+SERVER = "Asterisk PBX 20.4.0"
+RTP_PORT = 10000
+ECHO_NAMES = (b"via", b"v", b"from", b"f", b"to", b"t", b"call-id", b"i", b"cseq")
+TO_NAMES = (b"to", b"t")
+
+Address = tuple[str, int]
+
+
+class AsteriskStandIn:
+    """A loopback UDP server scripting the responses of the Asterisk ``TestE2E`` targets.
+
+    REGISTER, INVITE and BYE are challenged with a 401 until they carry a digest for
+    ``password``; authorized REGISTERs get a 200 with the granted expiry, INVITEs get
+    100 Trying, 180 Ringing (with ``ring``) and a 200 with an SDP answer held back a
+    further ``answer_delay`` seconds, which a CANCEL in the meantime turns into a 487.
+    ACK is absorbed, OPTIONS always gets a 200 and a malformed Expires or SDP body gets a
+    400. Every response leaves ``delay`` seconds after its request arrived and is lost with
+    probability ``loss``. Responses go back to the source address, as Asterisk does with
+    rport, since the client's Via is fake.
+    """
+
+    def __init__(
+        self,
+        username: str = "6001",
+        password: str = "",
+        host: str = "127.0.0.1",
+        port: int = 0,
+        delay: float = 0.0,
+        loss: float = 0.0,
+        ring: bool = True,
+        answer_delay: float = 0.0,
+        max_expires: int = 3600,
+        rng: random.Random | None = None,
+    ) -> None:
+        self.username = username
+        self.password = password
+        self.host = host
+        self.port = port
+        self.delay = delay
+        self.loss = loss
+        self.ring = ring
+        self.answer_delay = answer_delay
+        self.max_expires = max_expires
+        self.rng = rng or random.Random()
+        table = HA1Table()
+        table.add(username, password)
+        self.verifier = DigestVerifier(table)
+        self.received: Counter = Counter()
+        self.sent: Counter = Counter()
+        self.lost = 0
+        self.socket: socket.socket | None = None
+        self._outbox: list[tuple[float, int, bytes, Address]] = []
+        self._sequence = 0
+        self._tags: dict[bytes, bytes] = {}
+        # Call-ID -> outbox entry of a 200 to an INVITE still waiting for answer_delay
+        self._answers: dict[bytes, tuple[float, int, bytes, Address]] = {}
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> "AsteriskStandIn":
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((self.host, self.port))
+        self.port = self.socket.getsockname()[1]
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        sock, self.socket = self.socket, None
+        self._thread.join()
+        sock.close()
+
+    def serve_forever(self) -> None:
+        sock = self.socket
+        while self.socket:
+            timeout = 0.05
+            if self._outbox:
+                timeout = min(timeout, max(0.0, self._outbox[0][0] - time.monotonic()))
+            sock.settimeout(max(timeout, 0.0001))
+            try:
+                data, source = sock.recvfrom(BUF_SIZE)
+            except OSError:
+                pass
+            else:
+                for response in self.handle(data):
+                    self._schedule(response, source)
+            while self._outbox and self._outbox[0][0] <= time.monotonic():
+                entry = heapq.heappop(self._outbox)
+                _, _, response, destination = entry
+                if self._answers:
+                    call_id = scan(response).call_id
+                    if self._answers.get(call_id) is entry:
+                        del self._answers[call_id]
+                sock.sendto(response, destination)
+
+    def _schedule(self, response: bytes, destination: Address) -> None:
+        if self.loss and self.rng.random() < self.loss:
+            self.lost += 1
+            return
+        self.sent[response.split(b" ", 2)[1].decode()] += 1
+        self._sequence += 1
+        delay = self.delay
+        found = scan(response)
+        if self.answer_delay and found.status_code == 200 and found.c_seq_method == b"INVITE":
+            delay += self.answer_delay
+        entry = (time.monotonic() + delay, self._sequence, response, destination)
+        if delay != self.delay:
+            self._answers[found.call_id] = entry
+        heapq.heappush(self._outbox, entry)
+
+    def handle(self, data: bytes) -> list[bytes]:
+        """The responses to one datagram, in the order they go out."""
+        request = scan(data)
+        if request is None or request.is_response:
+            return []
+        method = request.method.decode()
+        self.received[method] += 1
+        try:
+            return self._handle(method, data)
+        except ValueError:
+            # a malformed Expires or SDP body must not take the server thread down
+            return [self.respond(data, 400, "Bad Request")]
+
+    def _handle(self, method: str, data: bytes) -> list[bytes]:
+        if method == "ACK":
+            return []
+        if method == "OPTIONS":
+            return [self.respond(data, 200, "OK")]
+        if method == "CANCEL":
+            return self.cancel(data)
+        if method not in ("REGISTER", "INVITE", "BYE"):
+            return [self.respond(data, 405, "Method Not Allowed")]
+
+        authorization = self.authorization(data)
+        if authorization is None:
+            challenge = f"WWW-Authenticate: {self.verifier.challenge()}"
+            return [self.respond(data, 401, "Unauthorized", [challenge])]
+        if self.verifier.verify(method, self.request_uri(data), authorization) != Verdict.OK:
+            return [self.respond(data, 403, "Forbidden")]
+
+        if method == "REGISTER":
+            expires = min(self.expires(data), self.max_expires)
+            headers = [f"Expires: {expires}"]
+            if expires:
+                headers.insert(0, f"Contact: <sip:{self.username}@{self.host}>;expires={expires}")
+            response = self.respond(data, 200, "OK", headers, tag=True)
+            if not expires:
+                self._tags.pop(scan(data).call_id, None)
+            return [response]
+        if method == "BYE":
+            response = self.respond(data, 200, "OK", tag=True)
+            self._tags.pop(scan(data).call_id, None)
+            return [response]
+
+        responses = [self.respond(data, 100, "Trying")]
+        if self.ring:
+            responses.append(self.respond(data, 180, "Ringing", tag=True))
+        body = data[head_end(data) :].lstrip(b"\r\n")
+        sdp = answer(SessionDescription.parse(body), self.host, RTP_PORT)
+        responses.append(
+            self.respond(
+                data,
+                200,
+                "OK",
+                ["Content-Type: application/sdp"],
+                tag=True,
+                body=str(sdp).encode("utf-8"),
+            )
+        )
+        return responses
+
+    def cancel(self, data: bytes) -> list[bytes]:
+        """Withdraws a pending answer: 200 for the CANCEL, 487 for its INVITE."""
+        entry = self._answers.pop(scan(data).call_id, None)
+        if entry is None:
+            return [self.respond(data, 481, "Call/Transaction Does Not Exist")]
+        self._outbox.remove(entry)
+        heapq.heapify(self._outbox)
+        self.sent["200"] -= 1
+        return [
+            self.respond(data, 200, "OK", tag=True),
+            self.respond(entry[2], 487, "Request Terminated"),
+        ]
+
+    def request_uri(self, data: bytes) -> str:
+        return data[: data.find(b"\n")].split(b" ")[1].decode()
+
+    def authorization(self, data: bytes) -> bytes | None:
+        for line in self._header_lines(data):
+            name, _, value = line.partition(b":")
+            if name.strip().lower() == b"authorization":
+                return value
+        return None
+
+    def expires(self, data: bytes) -> int:
+        for line in self._header_lines(data):
+            name, _, value = line.partition(b":")
+            if name.strip().lower() == b"expires":
+                return int(value)
+        return self.max_expires
+
+    def respond(
+        self,
+        request: bytes,
+        status: int,
+        reason: str,
+        headers: list[str] = (),
+        tag: bool = False,
+        body: bytes = b"",
+    ) -> bytes:
+        """A response echoing the dialog headers, with our To-tag once ``tag`` is set.
+
+        A final failure other than a 401 challenge ends the dialog and forgets its tag.
+        """
+        call_id = scan(request).call_id
+        lines = [f"SIP/2.0 {status} {reason}".encode()]
+        for line in self._header_lines(request):
+            name = line.split(b":", 1)[0].strip().lower()
+            if name not in ECHO_NAMES:
+                continue
+            if tag and name in TO_NAMES and b";tag=" not in line:
+                local_tag = self._tags.setdefault(call_id, secrets.token_hex(4).encode())
+                line += b";tag=" + local_tag
+            lines.append(line)
+        lines.extend(header.encode() for header in headers)
+        lines.append(f"Server: {SERVER}".encode())
+        lines.append(b"Content-Length: %d" % len(body))
+        if status >= 300 and status != 401:
+            self._tags.pop(call_id, None)
+        return b"\r\n".join(lines) + b"\r\n\r\n" + body
+
+    @staticmethod
+    def _header_lines(data: bytes) -> list[bytes]:
+        return [line.rstrip(b"\r") for line in data[: head_end(data)].split(b"\n")[1:]]
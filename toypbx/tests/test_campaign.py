@@ -0,0 +1,127 @@
+import io
+import threading
+import time
+import unittest
+from contextlib import contextmanager
+
+
+class TestCampaign(unittest.TestCase):
+    def test_read_targets(self):
+        from toypbx.campaign import read_targets
+
+        source = io.StringIO("100\n\n  101  \n# comment\n102 # vip\n")
+        self.assertEqual(["100", "101", "102"], list(read_targets(source)))
+
+    def test_limits(self):
+        from toypbx.campaign import Campaign
+
+        lock = threading.Lock()
+        active = peak = 0
+
+        def call(target: str) -> int:
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.05)
+            with lock:
+                active -= 1
+            if target == "boom":
+                raise ValueError()
+            return 486 if target == "busy" else 200
+
+        outcomes = []
+        campaign = Campaign(call, rate=200, max_concurrent=3, on_outcome=outcomes.append)
+        start = time.perf_counter()
+        stats = campaign.run(["100"] * 18 + ["busy", "boom"])
+
+        self.assertEqual(20, stats.placed)
+        self.assertEqual({200: 18, 486: 1}, dict(stats.statuses))
+        self.assertEqual(1, stats.errors)
+        self.assertLessEqual(peak, 3)
+        self.assertEqual(3, stats.peak_concurrency)
+        # three at a time, 50 ms each
+        self.assertGreaterEqual(time.perf_counter() - start, 0.3)
+        self.assertEqual("ValueError", [o.error for o in outcomes if o.error][0])
+
+    def test_rate(self):
+        from toypbx.campaign import Campaign
+
+        campaign = Campaign(lambda target: 200, rate=100, max_concurrent=10)
+        stats = campaign.run(str(i) for i in range(21))
+        self.assertGreaterEqual(stats.elapsed, 0.19)
+        self.assertEqual(21, stats.statuses[200])
+
+    def test_invalid_limits(self):
+        from toypbx.campaign import Campaign
+
+        for rate, max_concurrent in [(0, 1), (-1.0, 1), (1.0, 0)]:
+            with self.assertRaises(ValueError):
+                Campaign(lambda target: 200, rate=rate, max_concurrent=max_concurrent)
+
+    def test_failing_callback(self):
+        from toypbx.campaign import Campaign
+
+        def on_outcome(outcome) -> None:
+            raise RuntimeError("full disk")
+
+        campaign = Campaign(lambda target: 200, rate=1000, max_concurrent=2, on_outcome=on_outcome)
+        stats = campaign.run(str(i) for i in range(5))
+        self.assertEqual(5, stats.statuses[200])
+
+
+class FakeClient:
+    def __init__(self) -> None:
+        from toypbx.protocols.sip.context import Context
+
+        self.context = Context(domain="un100", username="6001", password="")
+
+    @contextmanager
+    def invite(self, target: str, answer_timeout: float):
+        from toypbx.protocols.sip.context import Dialog, Transaction
+
+        dialog = Dialog(transactions=[Transaction()], target=target, status=200)
+        self.context.add_dialog(dialog)
+        yield dialog
+
+
+class TestClientPool(unittest.TestCase):
+    def test_prunes_dialogs(self):
+        from toypbx.campaign import ClientPool
+
+        client = FakeClient()
+        pool = ClientPool([client])
+
+        self.assertEqual([200, 200], [pool.call(target, hold=0) for target in ("100", "101")])
+        self.assertEqual(([], {}), (client.context.dialogs, client.context.calls))
+
+    def test_ringing_and_cancel(self):
+        import contextlib
+        import io
+
+        from toypbx.campaign import ClientPool
+        from toypbx.client import Client
+        from toypbx.tests.standin import AsteriskStandIn
+
+        with AsteriskStandIn(password="secret", answer_delay=0.3) as standin:
+            client = Client(
+                domain="un100",
+                username="6001",
+                password="secret",
+                server=standin.host,
+                port=standin.port,
+            )
+            with contextlib.redirect_stdout(io.StringIO()):
+                with client.register():
+                    # rings longer than the client's default wait, and is answered
+                    answered = ClientPool([client], answer_timeout=1.0).call("100", hold=0)
+                    # the BYE is challenged once, so it arrives twice
+                    self.assertEqual((2, 0), (standin.received["BYE"], standin.received["CANCEL"]))
+                    # never answered in time: CANCELled, not hung up with a BYE
+                    cancelled = ClientPool([client], answer_timeout=0.1).call("101", hold=0)
+
+        self.assertEqual((200, 487), (answered, cancelled))
+        self.assertEqual((2, 1), (standin.received["BYE"], standin.received["CANCEL"]))
+        self.assertEqual(1, standin.sent["487"])
+        self.assertEqual({}, standin._tags)
+        self.assertEqual(([], {}), (client.context.dialogs, client.context.calls))
@@ -0,0 +1,83 @@
+import csv
+import json
+import tempfile
+import unittest
+
+
+def record(i: int = 0):
+    from toypbx.cdr import CallDetailRecord
+
+    return CallDetailRecord(
+        call_id=f"call-{i}",
+        caller="sip:6001@un100",
+        callee="sip:100@un100",
+        invite_time=100.0,
+        answer_time=102.0,
+        end_time=132.5,
+        status=200,
+    )
+
+
+class TestCDRWriter(unittest.TestCase):
+    def test_csv_rotation(self):
+        from toypbx.cdr import CDRWriter
+
+        with tempfile.TemporaryDirectory() as directory:
+            with CDRWriter(directory, max_file_size=200, batch_size=1) as writer:
+                for i in range(5):
+                    writer.write(record(i))
+                writer.flush()
+                self.assertEqual(5, writer.written)
+
+            files = CDRWriter.files(directory)
+            self.assertGreater(len(files), 1)
+            rows = []
+            for path in files:
+                with open(path) as f:
+                    rows.extend(csv.DictReader(f))
+            self.assertEqual([f"call-{i}" for i in range(5)], [row["call_id"] for row in rows])
+            self.assertEqual("30.5", rows[0]["duration"])
+
+    def test_jsonl(self):
+        from toypbx.cdr import CDRWriter, Format
+
+        with tempfile.TemporaryDirectory() as directory:
+            with CDRWriter(directory, format=Format.JSONL) as writer:
+                writer.write(record())
+            (path,) = CDRWriter.files(directory, Format.JSONL)
+            with open(path) as f:
+                row = json.loads(f.readline())
+            self.assertEqual("call-0", row["call_id"])
+            self.assertEqual(200, row["status"])
+
+
+class TestClientCDR(unittest.TestCase):
+    def test_failed_call(self):
+        from toypbx.cdr import CDRWriter
+        from toypbx.client import Client
+        from toypbx.protocols.sip.context import Dialog, Transaction
+        from toypbx.protocols.sip.message import InviteMessage
+
+        with tempfile.TemporaryDirectory() as directory:
+            with CDRWriter(directory) as writer:
+                client = Client(domain="un100", username="6001", password="", cdr=writer)
+                transaction = Transaction()
+                client.context.add_dialog(Dialog(transactions=[transaction], invite_time=1.0))
+                client.send(InviteMessage.create("100", "un100", "6001", transaction))
+                client.on_receive(f"""SIP/2.0 486 Busy Here
+Via: SIP/2.0/UDP 192.168.0.137:60956;rport;branch={transaction.branch}
+From: <sip:6001@un100>;tag={transaction.local_tag}
+To: <sip:100@un100>;tag=abc
+Call-ID: {transaction.call_id}
+CSeq: {transaction.local_c_seq} INVITE
+Content-Length: 0
+""")
+                writer.flush()
+
+            (path,) = CDRWriter.files(directory)
+            with open(path) as f:
+                (row,) = csv.DictReader(f)
+            self.assertEqual(transaction.call_id, row["call_id"])
+            self.assertEqual("486", row["status"])
+            self.assertEqual("sip:100@un100", row["callee"])
+            self.assertEqual("", row["answer_time"])
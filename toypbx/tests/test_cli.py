@@ -0,0 +1,30 @@
+import subprocess
+import sys
+import unittest
+
+
+class TestCLI(unittest.TestCase):
+    def test_lazy_imports(self):
+        code = "import sys, toypbx.cli; print(sorted(m for m in sys.modules if m.startswith('toypbx')))"
+        result = subprocess.run(
+            [sys.executable, "-c", code], check=True, capture_output=True, text=True
+        )
+        self.assertEqual(result.stdout.strip(), "['toypbx', 'toypbx.cli']")
+
+    def test_help(self):
+        result = subprocess.run(
+            [sys.executable, "-m", "toypbx", "server", "proxy", "--help"],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        self.assertIn("--upstream", result.stdout)
+
+    def test_rejects_non_positive_rate(self):
+        result = subprocess.run(
+            [sys.executable, "-m", "toypbx", "client", "campaign", "-", "--rate", "0"],
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(2, result.returncode)
+        self.assertIn("--rate: must be positive: 0", result.stderr)
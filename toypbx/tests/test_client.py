@@ -94,3 +94,243 @@ Content-Length:  0"""
         expected.headers["Via"] = None
         actual.headers["Via"] = None
         self.assertEqual(expected, actual)
+
+
+class TestReceive(unittest.TestCase):
+    def test_scanner_drops_before_parsing(self):
+        from toypbx.client import Client
+        from toypbx.protocols.sip.context import Transaction
+
+        client = Client(domain="un100", username="6001", password="")
+        client.context.register_transaction = Transaction(call_id="known")
+        response = (
+            b"SIP/2.0 100 Trying\r\nVia: SIP/2.0/UDP 10.0.0.1;branch=z9hG4bKa\r\n"
+            b"Call-ID: {call_id}\r\nCSeq: 1 REGISTER\r\nContent-Length: 0\r\n\r\n"
+        )
+
+        client(b"\r\n")
+        client(b"\x00" * 64)
+        client(b"OPTIONS sip:6001@10.0.0.2 SIP/2.0\r\n\r\n")
+        client(response.replace(b"{call_id}", b"stray"))
+        client(
+            b"SIP/2.0 200 OK\r\n" + response.split(b"\n", 1)[1].replace(b"{call_id}", b"known\xff")
+        )
+
+        self.assertIsNotNone(client.last_pong)
+        self.assertEqual({"malformed": 2, "unknown_dialog": 2}, client.scanner.dropped)
+        self.assertEqual([], client.context.register_transaction.response_messages)
+
+    def test_known_call_ids(self):
+        from toypbx.client import Client
+        from toypbx.protocols.sip.context import Dialog, Transaction
+
+        client = Client(domain="un100", username="6001", password="")
+        dialog = Dialog(transactions=[Transaction(call_id="call")])
+
+        client.context.add_dialog(dialog)
+        self.assertTrue(client.is_known_call_id(b"call"))
+        client.context.remove_dialog(dialog)
+        self.assertFalse(client.is_known_call_id(b"call"))
+
+    def test_responses_routed_by_call_id(self):
+        import contextlib
+        import io
+
+        from toypbx.client import Client
+        from toypbx.dispatch import Dispatcher
+        from toypbx.protocols.sip.context import Dialog, Transaction
+
+        response = (
+            "SIP/2.0 {status}\r\nVia: SIP/2.0/UDP 10.0.0.1;branch=z9hG4bK{call_id}\r\n"
+            'From: "6001" <sip:6001@un100>;tag=a\r\nTo: <sip:100@un100>;tag=b\r\n'
+            "Call-ID: {call_id}\r\nCSeq: 1 INVITE\r\nContent-Length: 0\r\n\r\n"
+        )
+        with Dispatcher(workers=2) as dispatcher:
+            client = Client(domain="un100", username="6001", password="", dispatcher=dispatcher)
+            first = Dialog(transactions=[Transaction(call_id="first")])
+            second = Dialog(transactions=[Transaction(call_id="second")])
+            client.context.add_dialog(first)
+            client.context.add_dialog(second)
+            # a late final response for the older dialog among the newer one's
+            with contextlib.redirect_stdout(io.StringIO()):
+                for call_id, status in [
+                    ("second", "100 Trying"),
+                    ("first", "486 Busy Here"),
+                    ("second", "180 Ringing"),
+                    ("first", "486 Busy Here"),
+                ]:
+                    client(response.format(status=status, call_id=call_id).encode())
+                dispatcher.join()
+
+        self.assertEqual((486, None), (first.status, second.status))
+        self.assertIsNotNone(first.end_time)
+        self.assertIsNone(second.end_time)
+        self.assertEqual(
+            ([486, 486], [100, 180]),
+            tuple(
+                [r.start_line.status_code for r in dialog.transactions[-1].response_messages]
+                for dialog in (first, second)
+            ),
+        )
+
+    def test_receive_loop_survives_callback_errors(self):
+        import socket
+        import time
+
+        from toypbx.net import UDPClient
+
+        received = []
+
+        def callback(data: bytes) -> None:
+            if data == b"boom":
+                raise ValueError(data)
+            received.append(data)
+
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as server:
+            server.bind(("127.0.0.1", 0))
+            udp_client = UDPClient("127.0.0.1", server.getsockname()[1], callback)
+            with udp_client.connect():
+                udp_client.send("hello")
+                _, address = server.recvfrom(64)
+                server.sendto(b"boom", address)
+                server.sendto(b"still here", address)
+                for _ in range(100):
+                    if received:
+                        break
+                    time.sleep(0.01)
+
+        self.assertEqual([b"still here"], received)
+        self.assertEqual((2, 1), (udp_client.received, udp_client.errors))
+
+
+class TestStandIn(unittest.TestCase):
+    """The ``TestE2E`` flows against the loopback Asterisk stand-in."""
+
+    def client(self, standin, password: str = "unsecurepassword", **kwargs):
+        from toypbx.client import Client
+
+        return Client(
+            domain="un100",
+            username="6001",
+            password=password,
+            server=standin.host,
+            port=standin.port,
+            **kwargs,
+        )
+
+    def test_register_digest(self):
+        from toypbx.client import Status
+        from toypbx.tests.standin import AsteriskStandIn
+
+        with AsteriskStandIn(password="unsecurepassword", max_expires=60) as standin:
+            client = self.client(standin)
+            with client.register(expires=300):
+                self.assertEqual(Status.AVAILABLE, client.status)
+                self.assertEqual(60, client.expires)
+            self.assertEqual(Status.UNAVAILABLE, client.status)
+
+        # REGISTER(401), REGISTER(200), UNREGISTER(401), UNREGISTER(200)
+        responses = client.context.register_transaction.response_messages
+        self.assertEqual([401, 200, 401, 200], [r.start_line.status_code for r in responses])
+        self.assertIsNotNone(responses[1].headers["To"].tag)
+        self.assertEqual({"REGISTER": 4}, standin.received)
+
+    def test_register_wrong_password(self):
+        from toypbx.tests.standin import AsteriskStandIn
+
+        with AsteriskStandIn(password="unsecurepassword") as standin:
+            client = self.client(standin, password="wrong")
+            with self.assertRaises(ValueError):
+                with client.register(expires=0):
+                    pass
+
+        self.assertEqual({"401": 1, "403": 1}, standin.sent)
+
+    def test_invite(self):
+        import contextlib
+        import io
+
+        from toypbx.client import Status
+        from toypbx.tests.standin import AsteriskStandIn
+
+        with AsteriskStandIn(password="unsecurepassword", delay=0.01) as standin:
+            client = self.client(standin)
+            with contextlib.redirect_stdout(io.StringIO()):
+                with client.register():
+                    with client.invite("100") as dialog:
+                        self.assertEqual(Status.CALLING, client.status)
+                    self.assertEqual(Status.AVAILABLE, client.status)
+
+        statuses = [
+            response.start_line.status_code
+            for transaction in dialog.transactions
+            for response in transaction.response_messages
+        ]
+        # INVITE(401), INVITE(100, 180, 200), BYE(401), BYE(200)
+        self.assertEqual([401, 100, 180, 200, 401, 200], statuses)
+        self.assertEqual(200, dialog.status)
+        self.assertEqual(1, standin.received["ACK"])
+        # the BYE and the unREGISTER let go of their To-tags
+        self.assertEqual({}, standin._tags)
+
+    def test_bad_request(self):
+        import socket
+
+        from toypbx.protocols.sip.context import Transaction
+        from toypbx.protocols.sip.message import RegisterMessage, ResponseMessage
+        from toypbx.tests.standin import AsteriskStandIn
+
+        request = RegisterMessage.create("un100", "6001", Transaction(call_id="bad"))
+        with (
+            AsteriskStandIn(password="secret") as standin,
+            socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock,
+        ):
+            sock.settimeout(1.0)
+            sock.sendto(request.to_message().encode(), (standin.host, standin.port))
+            challenge = ResponseMessage.from_raw(sock.recv(65535).decode())
+            digest = request.digest("6001", "secret", challenge).to_message()
+            malformed = digest.replace("Expires: 300", "Expires: soon")
+            sock.sendto(malformed.encode(), (standin.host, standin.port))
+            bad = sock.recv(65535)
+            # still serving after the malformed request
+            sock.sendto(request.to_message().encode(), (standin.host, standin.port))
+            again = sock.recv(65535)
+
+        self.assertTrue(bad.startswith(b"SIP/2.0 400 Bad Request\r\n"))
+        self.assertTrue(again.startswith(b"SIP/2.0 401 Unauthorized\r\n"))
+        self.assertEqual({"401": 2, "400": 1}, standin.sent)
+
+    def test_dispatcher(self):
+        import contextlib
+        import io
+
+        from toypbx.dispatch import Dispatcher
+        from toypbx.tests.standin import AsteriskStandIn
+
+        with (
+            AsteriskStandIn(password="unsecurepassword") as standin,
+            Dispatcher(workers=2) as dispatcher,
+        ):
+            client = self.client(standin, dispatcher=dispatcher)
+            with contextlib.redirect_stdout(io.StringIO()):
+                with client.register():
+                    with client.invite("100") as dialog:
+                        pass
+
+        self.assertEqual(200, dialog.status)
+        stats = dispatcher.stats()
+        self.assertEqual((10, 10, 0), (stats.submitted, stats.processed, stats.errors))
+
+    def test_loss(self):
+        import random
+
+        from toypbx.tests.standin import AsteriskStandIn
+
+        with AsteriskStandIn(loss=1.0, rng=random.Random(0)) as standin:
+            client = self.client(standin)
+            with self.assertRaises(ValueError):
+                with client.register():
+                    pass
+
+        self.assertEqual(0, sum(standin.sent.values()))
+        self.assertGreater(standin.lost, 0)
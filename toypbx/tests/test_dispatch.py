@@ -0,0 +1,73 @@
+import unittest
+
+
+class TestDispatcher(unittest.TestCase):
+    def test_order_per_key(self):
+        import random
+        import time
+
+        from toypbx.dispatch import Dispatcher
+
+        handled: dict[bytes, list[int]] = {}
+
+        def handle(key: bytes, n: int) -> None:
+            time.sleep(random.random() / 10000)
+            handled.setdefault(key, []).append(n)
+
+        keys = [b"call-%d" % i for i in range(16)]
+        with Dispatcher(workers=4) as dispatcher:
+            for n in range(100):
+                for key in keys:
+                    dispatcher.submit(key, handle, key, n)
+            dispatcher.join()
+            stats = dispatcher.stats()
+
+        self.assertEqual({key: list(range(100)) for key in keys}, handled)
+        self.assertEqual((1600, 1600, 0), (stats.submitted, stats.processed, stats.dropped))
+        self.assertEqual([0] * 4, stats.depths)
+        self.assertTrue(all(depth > 0 for depth in stats.high_water))
+
+    def test_slow_dialog_does_not_stall_others(self):
+        import threading
+
+        from toypbx.dispatch import Dispatcher
+
+        release = threading.Event()
+        done = threading.Event()
+        with Dispatcher(workers=2) as dispatcher:
+            slow = b"slow"
+            fast = next(
+                b"fast-%d" % i
+                for i in range(100)
+                if dispatcher.worker(b"fast-%d" % i) != dispatcher.worker(slow)
+            )
+            dispatcher.submit(slow, release.wait)
+            dispatcher.submit(fast, done.set)
+            self.assertTrue(done.wait(1))
+            release.set()
+
+    def test_full_queue_and_errors(self):
+        import contextlib
+        import io
+        import threading
+
+        from toypbx.dispatch import Dispatcher
+
+        release = threading.Event()
+
+        def fail() -> None:
+            raise ValueError("bad")
+
+        dispatcher = Dispatcher(workers=1, max_depth=2)
+        dispatcher.start()
+        dispatcher.submit(b"a", release.wait)
+        accepted = [dispatcher.submit(b"a", fail) for _ in range(4)]
+        release.set()
+        with contextlib.redirect_stdout(io.StringIO()):
+            dispatcher.stop()
+
+        self.assertIn(False, accepted)
+        stats = dispatcher.stats()
+        self.assertEqual(stats.submitted, stats.processed)
+        self.assertEqual(4 - accepted.count(True), stats.dropped)
+        self.assertEqual(accepted.count(True), stats.errors)
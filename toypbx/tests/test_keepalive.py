@@ -0,0 +1,84 @@
+import unittest
+
+
+class Account:
+    def __init__(self, flow) -> None:
+        self.flow = flow
+        self.pings = 0
+        self.options_sent = 0
+
+    def ping(self) -> None:
+        self.pings += 1
+
+    def options(self) -> None:
+        self.options_sent += 1
+
+
+class TestKeepaliveService(unittest.TestCase):
+    def test_run_tick(self):
+        from toypbx.keepalive import KeepaliveService
+
+        service = KeepaliveService(interval=10, tick=1)
+        accounts = [Account(flow=("10.0.0.1", i)) for i in range(100)]
+        for account in accounts:
+            service.add(account)
+
+        counts = [service.run_tick() for _ in range(10)]
+        self.assertEqual([10] * 10, counts)
+        self.assertTrue(all(account.pings == 1 for account in accounts))
+        self.assertEqual(100, service.sent)
+
+    def test_failure(self):
+        from toypbx.keepalive import KeepaliveService
+
+        class Broken(Account):
+            def ping(self) -> None:
+                raise KeyError("flow")
+
+        service = KeepaliveService(interval=1, tick=1)
+        broken, account = Broken(flow="a"), Account(flow="b")
+        service.add(broken)
+        service.add(account)
+
+        self.assertEqual(2, service.run_tick())
+        self.assertEqual((1, 1), (account.pings, service.failed))
+
+    def test_coalesce_flows(self):
+        from toypbx.keepalive import KeepaliveService, Mode
+
+        service = KeepaliveService(interval=2, tick=1, mode=Mode.OPTIONS)
+        shared = [Account(flow="shared") for _ in range(3)]
+        for account in shared:
+            service.add(account)
+        service.add(Account(flow=None))
+
+        self.assertEqual((3, 1), (len(service), service.flows))
+        self.assertEqual(1, service.run_tick() + service.run_tick())
+        self.assertEqual([1, 0, 0], [account.options_sent for account in shared])
+
+        service.remove(shared[0])
+        service.run_tick()
+        service.run_tick()
+        self.assertEqual([1, 1, 0], [account.options_sent for account in shared])
+
+        for account in shared:
+            service.remove(account)
+        self.assertEqual((0, 0), (len(service), service.flows))
+
+
+class TestClientKeepalive(unittest.TestCase):
+    def test_pong(self):
+        from toypbx.client import Client
+
+        client = Client(domain="un100", username="6001", password="")
+        self.assertIsNone(client.flow)
+        client.on_receive("\r\n")
+        self.assertIsNotNone(client.last_pong)
+
+    def test_options_message(self):
+        from toypbx.protocols.sip.context import Transaction
+        from toypbx.protocols.sip.message import OptionsMessage
+
+        message = OptionsMessage.create("un100", "6001", Transaction()).to_message()
+        self.assertTrue(message.startswith("OPTIONS sip:un100 SIP/2.0\n"))
+        self.assertRegex(message, r"\nCSeq: \d+ OPTIONS\n")
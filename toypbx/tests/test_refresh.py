@@ -0,0 +1,105 @@
+import random
+import time
+import unittest
+
+
+class Account:
+    def __init__(self) -> None:
+        self.refreshes = 0
+
+    def refresh(self) -> None:
+        self.refreshes += 1
+
+
+class TestRefreshScheduler(unittest.TestCase):
+    def test_run_pending(self):
+        from toypbx.refresh import RefreshScheduler
+
+        scheduler = RefreshScheduler(retry_interval=10, rng=random.Random(1))
+        account = Account()
+        due = scheduler.schedule(account, 300, now=0)
+
+        self.assertTrue(150 <= due <= 255)
+        self.assertEqual(0, scheduler.run_pending(now=due - 1))
+        self.assertEqual(1, scheduler.run_pending(now=due))
+        self.assertEqual(1, account.refreshes)
+        # no 200 came back: retried after retry_interval
+        self.assertEqual(due + 10, scheduler.next_due())
+
+        scheduler.schedule(account, 300, now=due)
+        self.assertEqual(1, len(scheduler))
+        scheduler.cancel(account)
+        self.assertEqual(0, scheduler.run_pending(now=due + 1000))
+        self.assertIsNone(scheduler.next_due())
+
+    def test_failure_is_retried(self):
+        from toypbx.refresh import RefreshScheduler
+
+        class Broken(Account):
+            def refresh(self) -> None:
+                super().refresh()
+                raise KeyError("Contact")
+
+        scheduler = RefreshScheduler(retry_interval=10)
+        broken, account = Broken(), Account()
+        scheduler.schedule(broken, 1, now=0)
+        scheduler.schedule(account, 1, now=0)
+
+        self.assertEqual(2, scheduler.run_pending(now=5))
+        self.assertEqual((1, 1, 1), (broken.refreshes, account.refreshes, scheduler.failures))
+        self.assertEqual(15, scheduler.next_due())
+        self.assertEqual(2, scheduler.run_pending(now=15))
+        self.assertEqual(2, broken.refreshes)
+
+    def test_spread(self):
+        from toypbx.refresh import RefreshScheduler
+
+        scheduler = RefreshScheduler(retry_interval=1000, rng=random.Random(1))
+        accounts = [Account() for _ in range(1000)]
+        for account in accounts:
+            scheduler.schedule(account, 300, now=0)
+
+        # refreshes spread over 150..255s: no 10s window holds much more than its share
+        counts = [scheduler.run_pending(now=t) for t in range(10, 300, 10)]
+        self.assertEqual(1000, sum(counts))
+        self.assertLess(max(counts), 150)
+
+    def test_short_expiry(self):
+        from toypbx.refresh import RefreshScheduler
+
+        scheduler = RefreshScheduler(max_fraction=0.99, margin=2)
+        self.assertLessEqual(scheduler.delay(5), 3)
+
+    def test_thread(self):
+        from toypbx.refresh import RefreshScheduler
+
+        account = Account()
+        with RefreshScheduler(retry_interval=60) as scheduler:
+            scheduler.schedule(account, 0.01)
+            for _ in range(100):
+                if account.refreshes:
+                    break
+                time.sleep(0.01)
+        self.assertEqual(1, account.refreshes)
+
+
+class TestGrantedExpires(unittest.TestCase):
+    def test_granted_expires(self):
+        from toypbx.protocols.sip.context import Transaction
+        from toypbx.protocols.sip.message import RegisterMessage, ResponseMessage
+        from toypbx.refresh import granted_expires
+
+        request = RegisterMessage.create("un100", "6001", Transaction(), expires=300)
+        response = ResponseMessage.from_raw("""SIP/2.0 200 OK
+CSeq: 2 REGISTER
+Contact: <sip:6001@10.0.0.4;ob>;expires=30, <sip:6001@192.168.0.137:60956;ob>;expires=120
+Expires: 90
+""")
+        self.assertEqual(120, granted_expires(response, request))
+
+        response.headers.pop("Contact")
+        self.assertEqual(90, granted_expires(response, request))
+        response.headers.pop("Expires")
+        self.assertEqual(300, granted_expires(response, request))
+        with self.assertRaises(ValueError):
+            granted_expires(response)
@@ -0,0 +1,47 @@
+import tempfile
+import unittest
+
+REQUEST = """REGISTER sip:un100 SIP/2.0
+Call-ID: {call_id}
+CSeq: 46544 REGISTER
+Content-Length: 0
+"""
+
+
+class TestJournal(unittest.TestCase):
+    def test_append_and_find(self):
+        from toypbx.trace.journal import Direction, Journal, JournalReader
+
+        with tempfile.TemporaryDirectory() as d:
+            with Journal(d, segment_size=200) as journal:
+                for i in range(10):
+                    message = REQUEST.format(call_id=f"call-{i % 3}")
+                    journal.append(Direction(i % 2), message, timestamp_ns=i)
+
+            self.assertEqual(5, len(Journal.segments(d)))
+            with JournalReader(d) as reader:
+                self.assertEqual(list(range(10)), [r.timestamp_ns for r in reader])
+
+                actual = reader.find("call-1")
+                self.assertEqual([1, 4, 7], [r.timestamp_ns for r in actual])
+                self.assertEqual(Direction.RECEIVED, actual[0].direction)
+                self.assertEqual(REQUEST.format(call_id="call-1").encode(), actual[0].message)
+                self.assertEqual([], reader.find("unknown"))
+
+    def test_reopen(self):
+        from toypbx.trace.journal import Direction, Journal, JournalReader
+
+        with tempfile.TemporaryDirectory() as d:
+            for _ in range(2):
+                with Journal(d) as journal:
+                    journal.append(Direction.SENT, "\r\n\r\n", call_id="")
+
+            with JournalReader(d) as reader:
+                self.assertEqual(2, len(reader.paths))
+                self.assertEqual([b"\r\n\r\n"] * 2, [r.message for r in reader])
+
+    def test_extract_call_id(self):
+        from toypbx.trace.journal import extract_call_id
+
+        self.assertEqual(b"abc", extract_call_id(b"SIP/2.0 200 OK\r\ni: abc\r\n\r\n"))
+        self.assertEqual(b"", extract_call_id(b"\r\n\r\n"))
@@ -0,0 +1,102 @@
+import io
+import struct
+import unittest
+
+RESPONSE = b"""SIP/2.0 200 OK\r
+Via: SIP/2.0/UDP 192.168.0.137:60956;rport=51029;received=172.17.0.1;branch=z9hG4bKPjhRHw98trjD05PopYbBL6bj34Hci6DmTU\r
+Call-ID: 6eCTpQmxGa4gAWjUXhufRd-u0D9u.N5F\r
+From: "6001" <sip:6001@un100>;tag=JRUu-hLceE3P8h2r0RVQKeJRZuviCTLX\r
+To: "6001" <sip:6001@un100>;tag=z9hG4bKPjhRHw98trjD05PopYbBL6bj34Hci6DmTU\r
+CSeq: 46545 REGISTER\r
+Content-Length:  0\r
+\r
+"""
+
+
+def udp_frame(payload: bytes, source_port: int = 5060, destination_port: int = 60956) -> bytes:
+    udp = struct.pack("!HHHH", source_port, destination_port, 8 + len(payload), 0) + payload
+    ip = struct.pack(
+        "!BBHHHBBH4s4s",
+        0x45,
+        0,
+        20 + len(udp),
+        0,
+        0,
+        64,
+        17,
+        0,
+        bytes([172, 17, 0, 2]),
+        bytes([192, 168, 0, 137]),
+    )
+    ethernet = b"\x00" * 12 + b"\x08\x00"
+    return ethernet + ip + udp
+
+
+def pcap_file(frames: list[bytes], order: str = "<") -> io.BytesIO:
+    f = io.BytesIO()
+    f.write(struct.pack(order + "IHHiIII", 0xA1B2C3D4, 2, 4, 0, 0, 65535, 1))
+    for i, frame in enumerate(frames):
+        f.write(struct.pack(order + "IIII", 1694335639 + i, 500000, len(frame), len(frame)))
+        f.write(frame)
+    f.seek(0)
+    return f
+
+
+class TestReadPcap(unittest.TestCase):
+    def test_read_pcap(self):
+        from toypbx.trace.pcap import Datagram, read_pcap
+
+        for order in "<>":
+            f = pcap_file([udp_frame(RESPONSE), udp_frame(b"\r\n\r\n", 5061, 5061)], order)
+
+            actual = list(read_pcap(f, ports={5060}))
+            expected = [
+                Datagram(
+                    timestamp=1694335639.5,
+                    payload=RESPONSE,
+                    source=("172.17.0.2", 5060),
+                    destination=("192.168.0.137", 60956),
+                )
+            ]
+            self.assertEqual(expected, actual)
+
+    def test_truncated(self):
+        from collections import Counter
+
+        from toypbx.trace.pcap import read_pcap
+
+        frame = udp_frame(RESPONSE)
+        # Ethernet header cut short, IP header cut short, UDP header cut short
+        f = pcap_file([frame[:10], frame[:20], frame[:38], frame])
+        stats = Counter()
+
+        actual = list(read_pcap(f, stats=stats))
+        self.assertEqual([RESPONSE], [datagram.payload for datagram in actual])
+        self.assertEqual(3, stats["truncated"])
+
+    def test_read_text(self):
+        from toypbx.trace.pcap import read_text
+
+        trace = io.StringIO(
+            "<--- Transmitting SIP response (300 bytes) to UDP:172.17.0.1:51029 --->\n"
+            + RESPONSE.decode().replace("\r\n", "\n")
+            + "\n<--- Received SIP request (500 bytes) from UDP:172.17.0.1:51029 --->\n"
+            + "OPTIONS sip:un100 SIP/2.0\nCSeq: 1 OPTIONS\n\n"
+        )
+
+        actual = list(read_text(trace))
+        self.assertEqual(2, len(actual))
+        self.assertEqual(RESPONSE.rstrip(b"\r\n") + b"\r\n", actual[0].payload)
+        self.assertFalse(actual[1].is_response)
+
+
+class TestReplay(unittest.TestCase):
+    def test_replay(self):
+        from toypbx.trace.pcap import read_pcap
+        from toypbx.trace.replay import replay
+
+        f = pcap_file([udp_frame(RESPONSE), udp_frame(b"SIP/2.0 garbage"), udp_frame(b"\r\n\r\n")])
+
+        actual = replay(read_pcap(f))
+        self.assertEqual((2, 1), (actual.messages, actual.skipped))
+        self.assertEqual({"ValueError": 1}, dict(actual.errors))
@@ -0,0 +1,73 @@
+import tempfile
+import unittest
+
+
+class TestStageTimer(unittest.TestCase):
+    def test_sample(self):
+        from toypbx.trace.profile import StageTimer
+
+        draws = iter([0.05, 0.5, 0.09, 0.99])
+        timer = StageTimer(sample_rate=0.1, rng=lambda: next(draws))
+
+        sampled = [timer.sample() is not None for _ in range(4)]
+        self.assertEqual([True, False, True, False], sampled)
+        self.assertEqual(2, timer.samples)
+        self.assertIsNone(StageTimer(sample_rate=0).sample())
+
+    def test_record(self):
+        from toypbx.trace.profile import StageTimer
+
+        timer = StageTimer(sample_rate=1)
+        timer.record("parse", 3000)
+        timer.record("scan", 1000)
+        timer.record("parse", 1000)
+
+        self.assertEqual(["parse", "scan"], list(timer.stages))
+        parse = timer.stages["parse"]
+        self.assertEqual((2, 4000, 3000, 2000), (*vars(parse).values(), parse.mean_ns))
+        self.assertIn("parse", str(timer))
+
+    def test_client_stages(self):
+        from toypbx.client import Client
+        from toypbx.protocols.sip.context import Transaction
+        from toypbx.trace.profile import StageTimer
+
+        timer = StageTimer(sample_rate=1)
+        client = Client(domain="un100", username="6001", password="", timer=timer)
+        client.context.register_transaction = Transaction(call_id="known")
+        client(
+            b"SIP/2.0 200 OK\r\nVia: SIP/2.0/UDP 10.0.0.1;branch=z9hG4bKa\r\n"
+            b"Call-ID: known\r\nCSeq: 1 OPTIONS\r\nContent-Length: 0\r\n\r\n"
+        )
+
+        self.assertEqual(["scan", "decode", "parse", "context", "dispatch"], list(timer.stages))
+
+
+class TestProfiler(unittest.TestCase):
+    def test_dump(self):
+        import contextlib
+        import io
+        import pstats
+        import threading
+        import tracemalloc
+        from pathlib import Path
+
+        from toypbx.trace.profile import Profiler
+
+        def work():
+            return [str(i) for i in range(1000)]
+
+        with tempfile.TemporaryDirectory() as d:
+            prefix = Path(d) / "run"
+            with contextlib.redirect_stdout(io.StringIO()):
+                with Profiler(prefix):
+                    thread = threading.Thread(target=work)
+                    thread.start()
+                    thread.join()
+
+            stats = pstats.Stats(f"{prefix}.prof")
+            functions = {name for _, _, name in stats.stats}
+            self.assertIn("work", functions)
+            snapshot = tracemalloc.Snapshot.load(f"{prefix}.tracemalloc")
+            self.assertTrue(snapshot.traces)
+        self.assertFalse(tracemalloc.is_tracing())
@@ -0,0 +1,194 @@
+import mmap
+import os
+import struct
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from enum import IntEnum
+from pathlib import Path
+
+MAGIC = b"TPBXJRN1"
+# record length (excluding this field), timestamp ns, direction, Call-ID length
+RECORD = struct.Struct("<IQBH")
+SEGMENT_SIZE = 64 * 1024 * 1024
+WRITE_BUFFER = 1024 * 1024
+CALL_ID_HEADERS = (b"\nCall-ID:", b"\ncall-id:", b"\nCall-Id:", b"\ni:")
+
+
+class Direction(IntEnum):
+    SENT = 0
+    RECEIVED = 1
+
+
+@dataclass(frozen=True)
+class JournalRecord:
+    timestamp_ns: int
+    direction: Direction
+    call_id: str
+    message: bytes
+
+    @property
+    def timestamp(self) -> float:
+        return self.timestamp_ns / 1e9
+
+
+def extract_call_id(message: bytes) -> bytes:
+    for name in CALL_ID_HEADERS:
+        if (start := message.find(name)) >= 0:
+            start += len(name)
+            end = message.find(b"\n", start)
+            return message[start : end if end >= 0 else len(message)].strip()
+    return b""
+
+
+class Journal:
+    """Appends every sent/received SIP message to length-prefixed segment files.
+
+    Writes go through a large userspace buffer and are never fsync'ed, so a record costs
+    one struct pack and a buffered write; segments rotate at ``segment_size`` bytes.
+    """
+
+    def __init__(self, directory: str | os.PathLike, segment_size: int = SEGMENT_SIZE) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_size = segment_size
+        self._lock = threading.Lock()
+        self._file = None
+        self._size = 0
+        self._segment = max((int(p.stem) for p in self.segments(self.directory)), default=0)
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    @staticmethod
+    def segments(directory: str | os.PathLike) -> list[Path]:
+        return sorted(Path(directory).glob("[0-9]" * 8 + ".journal"))
+
+    def append(
+        self,
+        direction: Direction,
+        message: str | bytes,
+        call_id: str | bytes | None = None,
+        timestamp_ns: int | None = None,
+    ) -> None:
+        if isinstance(message, str):
+            message = message.encode("utf-8")
+        if timestamp_ns is None:
+            timestamp_ns = time.time_ns()
+        if call_id is None:
+            call_id = extract_call_id(message)
+        elif isinstance(call_id, str):
+            call_id = call_id.encode("utf-8")
+        header = RECORD.pack(
+            RECORD.size - 4 + len(call_id) + len(message),
+            timestamp_ns,
+            direction,
+            len(call_id),
+        )
+        with self._lock:
+            if self._file is None or self._size >= self.segment_size:
+                self._rotate()
+            self._file.write(header)
+            self._file.write(call_id)
+            self._file.write(message)
+            self._size += len(header) + len(call_id) + len(message)
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._file:
+                self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def _rotate(self) -> None:
+        if self._file:
+            self._file.close()
+        self._segment += 1
+        path = self.directory / f"{self._segment:08}.journal"
+        self._file = open(path, "wb", buffering=WRITE_BUFFER)
+        self._file.write(MAGIC)
+        self._size = len(MAGIC)
+
+
+class JournalReader:
+    """Reads journal segments through ``mmap`` and finds messages by Call-ID.
+
+    ``index`` only walks the record headers, keeping ``(segment, offset)`` per Call-ID;
+    message bodies are sliced out of the mapping on demand.
+    """
+
+    def __init__(self, directory: str | os.PathLike) -> None:
+        self.paths = Journal.segments(directory)
+        self._maps: list[mmap.mmap] = []
+        for path in self.paths:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size <= len(MAGIC):
+                    continue
+                m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if m[: len(MAGIC)] != MAGIC:
+                m.close()
+                raise ValueError(f"{path} is not a journal segment")
+            self._maps.append(m)
+        self._index: dict[bytes, list[tuple[int, int]]] | None = None
+
+    def __enter__(self) -> "JournalReader":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[JournalRecord]:
+        for segment, m in enumerate(self._maps):
+            for offset in self._offsets(m):
+                yield self.read(segment, offset)
+
+    def close(self) -> None:
+        for m in self._maps:
+            m.close()
+        self._maps = []
+
+    def read(self, segment: int, offset: int) -> JournalRecord:
+        m = self._maps[segment]
+        length, timestamp_ns, direction, call_id_length = RECORD.unpack_from(m, offset)
+        start = offset + RECORD.size
+        return JournalRecord(
+            timestamp_ns=timestamp_ns,
+            direction=Direction(direction),
+            call_id=m[start : start + call_id_length].decode("utf-8", "replace"),
+            message=m[start + call_id_length : offset + 4 + length],
+        )
+
+    def index(self) -> dict[bytes, list[tuple[int, int]]]:
+        if self._index is None:
+            self._index = {}
+            for segment, m in enumerate(self._maps):
+                for offset in self._offsets(m):
+                    call_id_length = RECORD.unpack_from(m, offset)[3]
+                    start = offset + RECORD.size
+                    call_id = m[start : start + call_id_length]
+                    self._index.setdefault(call_id, []).append((segment, offset))
+        return self._index
+
+    def find(self, call_id: str) -> list[JournalRecord]:
+        locations = self.index().get(call_id.encode("utf-8"), [])
+        return [self.read(segment, offset) for segment, offset in locations]
+
+    @staticmethod
+    def _offsets(m: mmap.mmap) -> Iterator[int]:
+        offset = len(MAGIC)
+        end = len(m)
+        while offset + RECORD.size <= end:
+            (length,) = struct.unpack_from("<I", m, offset)
+            if offset + 4 + length > end:
+                # torn write at the tail of a crashed segment
+                break
+            yield offset
+            offset += 4 + length
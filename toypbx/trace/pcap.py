@@ -0,0 +1,199 @@
+import re
+import struct
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import BinaryIO, TextIO
+
+GLOBAL_HEADER = struct.Struct("IHHiIII")
+RECORD_HEADER = struct.Struct("IIII")
+UDP_HEADER = struct.Struct("!HHHH")
+
+MAGIC_MICROSECONDS = 0xA1B2C3D4
+MAGIC_NANOSECONDS = 0xA1B23C4D
+
+PCAP_MAGICS = {
+    struct.pack(order, magic)
+    for order in ("<I", ">I")
+    for magic in (MAGIC_MICROSECONDS, MAGIC_NANOSECONDS)
+}
+
+ETHERTYPE_IPV4 = 0x0800
+ETHERTYPE_IPV6 = 0x86DD
+ETHERTYPE_VLAN = (0x8100, 0x88A8)
+IPPROTO_UDP = 17
+
+START_LINE = re.compile(r"^(SIP/2\.0 \d{3} |[A-Z]+ \S+ SIP/2\.0$)")
+SEPARATOR = re.compile(r"^(<-+|-{3,}|={3,}|#)")
+
+
+@dataclass(frozen=True)
+class Datagram:
+    timestamp: float | None
+    payload: bytes
+    source: tuple[str, int] | None = None
+    destination: tuple[str, int] | None = None
+
+    @property
+    def is_response(self) -> bool:
+        return self.payload.startswith(b"SIP/2.0 ")
+
+
+@contextmanager
+def _open(source: str | BinaryIO, mode: str = "rb"):
+    if isinstance(source, str):
+        with open(source, mode) as f:
+            yield f
+    else:
+        yield source
+
+
+class _Truncated(Exception):
+    pass
+
+
+def _need(frame: bytes, size: int) -> None:
+    if len(frame) < size:
+        raise _Truncated
+
+
+def read_pcap(
+    source: str | BinaryIO, ports: set[int] | None = None, stats: Counter | None = None
+) -> Iterator[Datagram]:
+    """Yields the UDP payloads of a classic libpcap file one record at a time.
+
+    Only the current record is held in memory. Non-UDP packets and non-initial IP
+    fragments are skipped; with ``ports`` only datagrams from or to those ports are kept.
+    Frames too short for their link, IP or UDP headers are skipped and counted in
+    ``stats["truncated"]``.
+    """
+    with _open(source) as f:
+        header = f.read(GLOBAL_HEADER.size)
+        if len(header) < GLOBAL_HEADER.size:
+            raise ValueError("not a pcap file")
+        for order in "<>":
+            magic, _, _, _, _, _, linktype = struct.unpack(order + GLOBAL_HEADER.format, header)
+            if magic in (MAGIC_MICROSECONDS, MAGIC_NANOSECONDS):
+                break
+        else:
+            raise ValueError("not a pcap file (pcapng is not supported)")
+        record = struct.Struct(order + RECORD_HEADER.format)
+        divisor = 1e9 if magic == MAGIC_NANOSECONDS else 1e6
+
+        while len(raw := f.read(record.size)) == record.size:
+            seconds, fraction, length, _ = record.unpack(raw)
+            frame = f.read(length)
+            if len(frame) < length:
+                break
+            try:
+                datagram = _decode(frame, linktype, seconds + fraction / divisor)
+            except _Truncated:
+                if stats is not None:
+                    stats["truncated"] += 1
+                continue
+            if datagram:
+                if ports is None or datagram.source[1] in ports or datagram.destination[1] in ports:
+                    yield datagram
+
+
+def _decode(frame: bytes, linktype: int, timestamp: float) -> Datagram | None:
+    match linktype:
+        case 0:
+            # BSD loopback: 4-byte address family in the capturing host's byte order
+            _need(frame, 4)
+            family = frame[0] or frame[3]
+            offset, ethertype = 4, ETHERTYPE_IPV4 if family == 2 else ETHERTYPE_IPV6
+        case 1:
+            # Ethernet, possibly VLAN tagged
+            _need(frame, 14)
+            offset, (ethertype,) = 14, struct.unpack_from("!H", frame, 12)
+            while ethertype in ETHERTYPE_VLAN:
+                _need(frame, offset + 4)
+                (ethertype,) = struct.unpack_from("!H", frame, offset + 2)
+                offset += 4
+        case 113:
+            # Linux cooked capture
+            _need(frame, 16)
+            offset, (ethertype,) = 16, struct.unpack_from("!H", frame, 14)
+        case 276:
+            # Linux cooked capture v2
+            _need(frame, 20)
+            offset, (ethertype,) = 20, struct.unpack_from("!H", frame, 0)
+        case 101 | 228 | 229:
+            # raw IP
+            _need(frame, 1)
+            offset, ethertype = 0, ETHERTYPE_IPV6 if frame[0] >> 4 == 6 else ETHERTYPE_IPV4
+        case _:
+            return None
+
+    if ethertype == ETHERTYPE_IPV4:
+        _need(frame, offset + 20)
+        ihl = (frame[offset] & 0x0F) * 4
+        if ihl < 20:
+            raise _Truncated
+        fragment = struct.unpack_from("!H", frame, offset + 6)[0] & 0x1FFF
+        if frame[offset + 9] != IPPROTO_UDP or fragment:
+            return None
+        source = ".".join(map(str, frame[offset + 12 : offset + 16]))
+        destination = ".".join(map(str, frame[offset + 16 : offset + 20]))
+        offset += ihl
+    elif ethertype == ETHERTYPE_IPV6:
+        _need(frame, offset + 40)
+        if frame[offset + 6] != IPPROTO_UDP:
+            return None
+        source = _ipv6(frame[offset + 8 : offset + 24])
+        destination = _ipv6(frame[offset + 24 : offset + 40])
+        offset += 40
+    else:
+        return None
+
+    _need(frame, offset + UDP_HEADER.size)
+    source_port, destination_port, length, _ = UDP_HEADER.unpack_from(frame, offset)
+    payload = frame[offset + UDP_HEADER.size : offset + max(length, UDP_HEADER.size)]
+    return Datagram(
+        timestamp=timestamp,
+        payload=payload,
+        source=(source, source_port),
+        destination=(destination, destination_port),
+    )
+
+
+def _ipv6(raw: bytes) -> str:
+    return ":".join(f"{group:x}" for group in struct.unpack("!8H", raw))
+
+
+def read_text(source: str | TextIO) -> Iterator[Datagram]:
+    """Yields SIP messages from a plain text trace, e.g. an Asterisk ``pjsip set logger`` dump.
+
+    A message starts at a SIP start line and ends at the next start line or at a
+    separator line such as ``<--- Received SIP response ... --->``.
+    """
+    with _open(source, "r") as f:
+        lines: list[str] = []
+        for line in f:
+            line = line.rstrip("\r\n")
+            if START_LINE.match(line) or SEPARATOR.match(line):
+                if message := _text_datagram(lines):
+                    yield message
+                lines = [line] if START_LINE.match(line) else []
+            elif lines:
+                lines.append(line)
+        if message := _text_datagram(lines):
+            yield message
+
+
+def _text_datagram(lines: list[str]) -> Datagram | None:
+    while lines and not lines[-1]:
+        lines.pop()
+    if not lines:
+        return None
+    return Datagram(timestamp=None, payload=("\r\n".join(lines) + "\r\n").encode("utf-8"))
+
+
+def read(path: str, stats: Counter | None = None) -> Iterator[Datagram]:
+    with open(path, "rb") as f:
+        magic = f.read(4)
+    if magic in PCAP_MAGICS:
+        return read_pcap(path, stats=stats)
+    return read_text(path)
@@ -0,0 +1,153 @@
+import cProfile
+import io
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass
+
+SAMPLE_RATE = 0.01
+TOP = 20
+
+
+@dataclass
+class StageStats:
+    count: int = 0
+    total_ns: int = 0
+    max_ns: int = 0
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.count if self.count else 0.0
+
+
+class Timing:
+    """Timestamps one sampled message as it moves from stage to stage."""
+
+    __slots__ = ("timer", "last")
+
+    def __init__(self, timer: "StageTimer") -> None:
+        self.timer = timer
+        self.last = time.perf_counter_ns()
+
+    def mark(self, stage: str) -> None:
+        """Charges the time since the previous mark to ``stage``."""
+        now = time.perf_counter_ns()
+        self.timer.record(stage, now - self.last)
+        self.last = now
+
+
+class StageTimer:
+    """Per-stage latency of the receive pipeline, measured on a sample of messages.
+
+    ``sample`` returns a ``Timing`` for about ``sample_rate`` of the calls and None
+    otherwise, so unsampled messages cost one random draw. Stages appear in the order
+    they were first recorded.
+    """
+
+    def __init__(
+        self, sample_rate: float = SAMPLE_RATE, rng: Callable[[], float] = random.random
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.rng = rng
+        self.samples = 0
+        self.stages: dict[str, StageStats] = {}
+        self._lock = threading.Lock()
+
+    def sample(self) -> Timing | None:
+        if self.sample_rate <= 0 or self.rng() >= self.sample_rate:
+            return None
+        self.samples += 1
+        return Timing(self)
+
+    def record(self, stage: str, elapsed_ns: int) -> None:
+        with self._lock:
+            stats = self.stages.get(stage)
+            if stats is None:
+                stats = self.stages[stage] = StageStats()
+            stats.count += 1
+            stats.total_ns += elapsed_ns
+            stats.max_ns = max(stats.max_ns, elapsed_ns)
+
+    def __str__(self) -> str:
+        lines = [f"sampled: {self.samples}", f"{'stage':<12}{'count':>10}{'mean':>12}{'max':>12}"]
+        lines.extend(
+            f"{stage:<12}{stats.count:>10}"
+            f"{stats.mean_ns / 1000:>10.1f}us{stats.max_ns / 1000:>10.1f}us"
+            for stage, stats in self.stages.items()
+        )
+        return "\n".join(lines)
+
+
+class Profiler:
+    """cProfile on every thread plus tracemalloc, dumped next to ``prefix`` on exit.
+
+    Writes ``<prefix>.prof`` (load with ``pstats`` or snakeviz) and
+    ``<prefix>.tracemalloc`` (``tracemalloc.Snapshot.load``), and prints the top
+    functions by cumulative time and the top allocation sites. cProfile only sees the
+    thread that enables it, so threads started while profiling get their own profile,
+    merged into the dump.
+    """
+
+    def __init__(
+        self, prefix: str | os.PathLike, memory: bool = True, frames: int = 1, top: int = TOP
+    ) -> None:
+        self.prefix = os.fspath(prefix)
+        self.memory = memory
+        self.frames = frames
+        self.top = top
+        self._profiles: list[cProfile.Profile] = []
+        self._snapshot: tracemalloc.Snapshot | None = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "Profiler":
+        if self.memory:
+            tracemalloc.start(self.frames)
+        threading.setprofile(self._profile_thread)
+        self._main = self._new_profile()
+        self._main.enable()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self._main.disable()
+        threading.setprofile(None)
+        if self.memory:
+            # before pstats allocates anything, and without the profiler's own traces
+            self._snapshot = tracemalloc.take_snapshot().filter_traces(
+                [
+                    tracemalloc.Filter(False, tracemalloc.__file__),
+                    tracemalloc.Filter(False, cProfile.__file__),
+                ]
+            )
+            tracemalloc.stop()
+        self.dump()
+
+    def _new_profile(self) -> cProfile.Profile:
+        profile = cProfile.Profile()
+        with self._lock:
+            self._profiles.append(profile)
+        return profile
+
+    def _profile_thread(self, frame, event, arg) -> None:
+        # runs once, as the first profile event of a new thread, and hands over
+        sys.setprofile(None)
+        self._new_profile().enable()
+
+    def dump(self) -> None:
+        with self._lock:
+            profiles = list(self._profiles)
+        output = io.StringIO()
+        stats = pstats.Stats(*profiles, stream=output)
+        stats.dump_stats(f"{self.prefix}.prof")
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+        print(output.getvalue())
+
+        if self._snapshot is not None:
+            self._snapshot.dump(f"{self.prefix}.tracemalloc")
+            print(f"top {self.top} allocation sites")
+            for statistic in self._snapshot.statistics("lineno")[: self.top]:
+                print(statistic)
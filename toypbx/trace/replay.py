@@ -0,0 +1,82 @@
+import time
+from collections import Counter
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from toypbx.protocols.sip.context import Dialog, Transaction
+from toypbx.protocols.sip.message import ResponseMessage
+
+from .pcap import Datagram
+
+if TYPE_CHECKING:
+    from toypbx.client import Client
+
+
+@dataclass
+class ReplayStats:
+    messages: int = 0
+    skipped: int = 0
+    errors: Counter = field(default_factory=Counter)
+    elapsed: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        return self.messages / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self) -> str:
+        lines = [
+            f"messages: {self.messages}",
+            f"skipped: {self.skipped}",
+            f"elapsed: {self.elapsed:.3f}s",
+            f"rate: {self.rate:,.0f} msg/s",
+        ]
+        lines.extend(f"error: {name} x{count}" for name, count in self.errors.most_common())
+        return "\n".join(lines)
+
+
+def client_handler(client: "Client") -> Callable[[str], None]:
+    # captured responses belong to transactions this client never started, so their
+    # Call-IDs are unknown and every dialog response goes to one catch-all dialog
+    client.context.register_transaction = Transaction()
+    dialog = Dialog(transactions=[Transaction()])
+    client.context.add_dialog(dialog)
+
+    def handle(response: str) -> None:
+        client.on_receive(response, client.timer.sample() if client.timer else None, dialog)
+
+    return handle
+
+
+def replay(
+    datagrams: Iterable[Datagram],
+    handler: Callable[[str], object] = ResponseMessage.from_raw,
+    realtime: bool = False,
+    speed: float = 1.0,
+) -> ReplayStats:
+    """Feeds captured SIP responses to ``handler`` as fast as possible or at capture timing.
+
+    Requests are skipped since only responses can be parsed. Handler exceptions are
+    counted by type and do not stop the replay.
+    """
+    stats = ReplayStats()
+    first: float | None = None
+    start = time.perf_counter()
+    for datagram in datagrams:
+        if not datagram.is_response:
+            stats.skipped += 1
+            continue
+        if realtime and datagram.timestamp is not None:
+            if first is None:
+                first = datagram.timestamp
+            delay = (datagram.timestamp - first) / speed - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+
+        stats.messages += 1
+        try:
+            handler(datagram.payload.decode("utf-8"))
+        except Exception as e:
+            stats.errors[type(e).__name__] += 1
+    stats.elapsed = time.perf_counter() - start
+    return stats